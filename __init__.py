@@ -14,6 +14,13 @@ from . import result
 from . import logfile
 from . import pkginfo
 from . import result
+from . import module_registry
+from . import search_path
+from . import summary
+from . import recursion
+from . import budget
+from .search_path import SearchPath
+from .lazy_module import LazyModule
 from .coordinator.getAst import getASTS
 
 # checker entry function that handles the options.
@@ -22,6 +29,32 @@ def main() -> None:
     parser.add_argument('-v', '--verbose', action='store_true')
     parser.add_argument('file')
     parser.add_argument('-d', '--debug', action='store_true')
+    parser.add_argument('--eager-imports', action='store_true',
+            help='check every definition of the imported modules instead of the accessed ones')
+    parser.add_argument('--import-depth', type=int, default=-1, metavar='N',
+            help="don't check the imported sources more than N imports away from the checked files")
+    parser.add_argument('--project-imports', action='store_true',
+            help="don't check the imported sources outside the checked project")
+    parser.add_argument('--skip-package', action='append', default=[], metavar='NAME',
+            help="don't check the modules of the package NAME")
+    parser.add_argument('--reachable-only', action='store_true',
+            help='check only the functions called from the module top levels, not every annotated function')
+    parser.add_argument('--max-function-nodes', type=int, default=-1, metavar='N',
+            help='degrade a function call to Any after checking N expression nodes of it')
+    parser.add_argument('--max-call-depth', type=int, default=-1, metavar='N',
+            help='degrade the function calls nested more than N deep to Any')
+    parser.add_argument('--file-timeout', type=float, default=-1, metavar='SECONDS',
+            help='degrade the rest of a file to Any after checking it for SECONDS')
+    parser.add_argument('--union-top-k', type=int, default=-1, metavar='K',
+            help='keep only the K most probable members of a probabilistic type')
+    parser.add_argument('--union-min-prob', type=float, default=0.0, metavar='P',
+            help='drop the members of a probabilistic type less probable than P')
+    parser.add_argument('--max-element-types', type=int, default=8, metavar='N',
+            help='widen the element types of a container to a probabilistic type past N distinct ones, -1 keeps all of them')
+    parser.add_argument('--summarize-literals', type=int, default=64, metavar='N',
+            help='check only a sample of the literal containers of constants with more than N elements, -1 checks all of them')
+    parser.add_argument('--summary-size', type=int, default=8, metavar='N',
+            help='keep the call results of the N most recent argument signatures per function')
     args = parser.parse_args()
     log_level = logging.DEBUG \
             if args.verbose \
@@ -29,16 +62,29 @@ def main() -> None:
 
     try:
         from . import builtinpkgs
-        builtinpkgs.setBuiltinPkg(sys.path[1:])
+        builtinpkgs.setBuiltinPkg(SearchPath(sys.path[1:]))
         sys.setrecursionlimit(10000)
         path = default_lib_path()
-        sys.path[1:1] = path
         config.setDebug(args.debug)
+        config.setLazyImports(not args.eager_imports)
+        config.setImportDepth(args.import_depth)
+        config.setReachableOnly(args.reachable_only)
+        summary.setSummarySize(args.summary_size)
+        budget.setMaxNodes(args.max_function_nodes)
+        budget.setMaxCallDepth(args.max_call_depth)
+        budget.setMaxFileSeconds(args.file_timeout)
+        from . import types
+        types.setUnionTopK(args.union_top_k)
+        types.setUnionMinProb(args.union_min_prob)
+        types.setMaxElementTypes(args.max_element_types)
+        from . import nodes
+        nodes.setMinSummarizedElements(args.summarize_literals)
+        config.setProjectImports(args.project_imports)
+        config.setSkipPackages(args.skip_package)
         from . import sitepkgs
         sitepackages = sitepkgs.getsitepackages()
-        for path in sitepackages:
-            if not path in sys.path:
-                sys.path.append(path)
+        # the typeshed stubs are searched before the interpreter's modules.
+        search_path.setBasePath(SearchPath(sys.path[:1] + path + sys.path[1:] + sitepackages))
         config.setRootDir(os.path.abspath(args.file) + os.path.sep)
 
         if os.path.isdir(args.file):
@@ -48,6 +94,12 @@ def main() -> None:
             file_check(args.file)
         else:
             logging.error("Error! What we check is not project nor file. Please input again!")
+        # the skipped modules are listed in the results with their reasons.
+        skipped = module_registry.getSkipped()
+        if skipped:
+            result.writeFileName("Skipped {} imported modules by the import policies.".format(len(skipped)))
+        if args.debug:
+            print_stats()
 
         from .imports_handler import imports_cache, BUILTIN_FLAGS
         typeshed_pkd = {}
@@ -63,6 +115,33 @@ def main() -> None:
     finally:
         result.closeFile()
 
+# return the statistics of the caches, the budgets and the fast paths, they're printed in the debug mode.
+def getDebugStats() -> List:
+    from . import nodes, util, util1, types, namespace
+    from .builtins import data_types
+    return [
+        ('registered modules', module_registry.getStats()),
+        ('function summaries', summary.getStats()),
+        ('recursive components', recursion.getStats()),
+        ('name lookups', namespace.getLookupStats()),
+        ('node conversions', nodes.getConvertStats()),
+        ('summarized literals', nodes.getSummaryStats()),
+        ('check driver', nodes.getCheckStats()),
+        ('exceeded budgets', budget.getStats()),
+        ('binary operator checks', util.getBinopStats()),
+        ('subtype checks', util1.getSubtypeStats()),
+        ('interned unions', types.getUnionStats()),
+        ('pruned unions', types.getPruneStats()),
+        ('union member attributes', types.getMemberAttributeStats()),
+        ('container element types', types.getElementStats()),
+        ('class attribute lookups', types.getClassStats()),
+        ('builtin flyweights', data_types.getFlyweightStats()),
+    ]
+
+def print_stats() -> None:
+    for name, stats in getDebugStats():
+        print("{}: {}".format(name, stats))
+
 # check a python project.
 def dir_check(path: str) -> None:
     logFName = path.split(os.path.sep)
@@ -77,8 +156,7 @@ def dir_check(path: str) -> None:
         if lfname:
             logfile.setFileName(lfname, False)
             break
-    sys.path.append(os.path.abspath(path))
-    sys.path.insert(1, '')
+    search_path.setBasePath(search_path.getBasePath().extend([os.path.abspath(path)]))
     asts = getASTS(path)
     from .coordinator.ExtractStaticTypes import getAllTypes
     getAllTypes()
@@ -90,11 +168,19 @@ def dir_check(path: str) -> None:
                 file = os.path.join(os.path.abspath(dir), fname)
             else:
                 continue
+            # the module was checked when it was imported, only its pending definitions are left.
+            record = module_registry.getRecord(file)
+            if record is not None \
+                and record.state != module_registry.PENDING:
+                if isinstance(record.module_type, LazyModule):
+                    record.module_type.resolve_all()
+                continue
             config.setFileName(file)
             imports_flags[file] = False
-            sys.path.pop(1)
-            sys.path.insert(1, os.path.sep.join(os.path.abspath(file).split(os.path.sep)[:-1]))
-            checker.check(asts[file], None, file)
+            search_path.setSearchPath(search_path.forDirectory(os.path.dirname(file)))
+            module_registry.begin(file, search_path.getSearchPath())
+            # the checker keeps the converted nodes, the ast tree isn't retained.
+            checker.check(asts.pop(file), None, file)
             result.writeFileName(file)
             result.writeFileName('Checked!')
 
@@ -116,12 +202,14 @@ def file_check(path: str) -> None:
     result.setPkg(m_name)
     from .imports_helper import imports_flags
     imports_flags[path] = False
-    sys.path.insert(1, os.path.sep.join(os.path.abspath(path).split(os.path.sep)[:-1]))
-    checker.check(asts[path], None, path)
+    search_path.setSearchPath(search_path.forDirectory(os.path.dirname(os.path.abspath(path))))
+    module_registry.begin(path, search_path.getSearchPath())
+    # the checker keeps the converted nodes, the ast tree isn't retained.
+    checker.check(asts.pop(path), None, path)
     result.writeFileName(fname)
     result.writeFileName("Checked!")
 
-# add python's library path into sys.path. so we can search for some standard modules.
+# return python's library path for the search path. so we can search for some standard modules.
 def default_lib_path() -> List:
     """Return default standard library search paths."""
     path = []  # type: List[str]
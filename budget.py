@@ -0,0 +1,126 @@
+# work budgets of the checking. A pathological function or file shouldn't stall the checker,
+# the work beyond a budget degrades to Any and a budget exceeded note is logged once.
+import logging
+import time
+from typing import Dict, List, Set, Any as AnyType
+
+# the budgets, -1 means unlimited.
+# expression nodes checked per function call.
+MAX_NODES: int = -1
+# nested function calls being checked.
+MAX_CALL_DEPTH: int = -1
+# seconds of checking per file, the time of the imported files isn't counted.
+MAX_FILE_SECONDS: float = -1
+# the clock is read once per these nodes.
+CLOCK_INTERVAL: int = 256
+# whether any budget is set, the nodes aren't counted otherwise.
+ACTIVE: bool = False
+
+BUDGET_STATS: Dict[str, int] = {'nodes': 0, 'calls': 0, 'files': 0}
+
+# the function calls being checked, [name, location, lineno, nodes, exceeded].
+calls: List[List] = []
+# the files being checked, [name, start], their checking seconds and the files beyond the budget.
+files: List[List] = []
+file_seconds: Dict[str, float] = {}
+exceeded_files: Set[str] = set()
+ticks: int = 0
+# the budgets exceeded by the functions and modules, their notes are logged.
+noted: Set = set()
+
+def _update() -> None:
+    global ACTIVE
+    ACTIVE = MAX_NODES >= 0 or MAX_CALL_DEPTH >= 0 or MAX_FILE_SECONDS >= 0
+
+def setMaxNodes(nodes: int) -> None:
+    global MAX_NODES
+    MAX_NODES = nodes
+    _update()
+
+def getMaxNodes() -> int:
+    return MAX_NODES
+
+def setMaxCallDepth(depth: int) -> None:
+    global MAX_CALL_DEPTH
+    MAX_CALL_DEPTH = depth
+    _update()
+
+def getMaxCallDepth() -> int:
+    return MAX_CALL_DEPTH
+
+def setMaxFileSeconds(seconds: float) -> None:
+    global MAX_FILE_SECONDS
+    MAX_FILE_SECONDS = seconds
+    _update()
+
+def getMaxFileSeconds() -> float:
+    return MAX_FILE_SECONDS
+
+def getStats() -> Dict[str, int]:
+    return dict(BUDGET_STATS)
+
+# log the structured note of an exceeded budget, once per budget and function or module.
+def _note(budget: str, limit: AnyType, scope: str, name: AnyType, location: AnyType, lineno: AnyType) -> None:
+    key = (budget, name, location, lineno)
+    if key in noted:
+        return
+    noted.add(key)
+    BUDGET_STATS[budget] += 1
+    logging.warning("[BudgetExceeded] budget:%s limit:%r %s:%r degraded to Any in file: [[%r:%r]]",
+        budget, limit, scope, name, location, lineno)
+
+# enter the call of the function, it returns False if the call is too deep to be checked.
+def enterCall(func: AnyType) -> bool:
+    name = getattr(func, 'name', None)
+    location = getattr(func, 'location', None)
+    lineno = getattr(func, 'lineno', None)
+    if MAX_CALL_DEPTH >= 0 and len(calls) >= MAX_CALL_DEPTH:
+        _note('calls', MAX_CALL_DEPTH, 'function', name, location, lineno)
+        return False
+    calls.append([name, location, lineno, 0, False])
+    return True
+
+# exit the call, it returns whether the function exceeded its nodes budget.
+def exitCall() -> bool:
+    return calls.pop()[4]
+
+# enter the checking of the file.
+def enterFile(name: str) -> None:
+    now = time.monotonic()
+    if files:
+        _pause(files[-1], now)
+    files.append([name, now])
+
+def exitFile() -> None:
+    now = time.monotonic()
+    _pause(files.pop(), now)
+    if files:
+        files[-1][1] = now
+
+def _pause(file_: List, now: float) -> None:
+    file_seconds[file_[0]] = file_seconds.get(file_[0], 0.0) + now - file_[1]
+    file_[1] = now
+
+# count the checked node, it returns whether the node is beyond a budget and degrades to Any.
+def exceeded() -> bool:
+    global ticks
+    if calls:
+        call = calls[-1]
+        if call[4]:
+            return True
+        call[3] += 1
+        if MAX_NODES >= 0 and call[3] > MAX_NODES:
+            call[4] = True
+            _note('nodes', MAX_NODES, 'function', call[0], call[1], call[2])
+            return True
+    if MAX_FILE_SECONDS >= 0 and files:
+        name, start = files[-1]
+        if name in exceeded_files:
+            return True
+        ticks += 1
+        if ticks % CLOCK_INTERVAL == 0 \
+            and file_seconds.get(name, 0.0) + time.monotonic() - start > MAX_FILE_SECONDS:
+            exceeded_files.add(name)
+            _note('files', MAX_FILE_SECONDS, 'module', name, name, -1)
+            return True
+    return False
@@ -6,12 +6,14 @@ Python being executed, this module should not use *any* dependencies outside of
 library found in Python 2. This file is run each mypy run, so it should be kept as fast as
 possible.
 """
-BUILT_IN_PKG = []
+from .search_path import SearchPath
+
+BUILT_IN_PKG = SearchPath()
 # set builtin pkg path.
-def setBuiltinPkg(path: str) -> None:
+def setBuiltinPkg(path: SearchPath) -> None:
     global BUILT_IN_PKG
     BUILT_IN_PKG = path
 # get builtin pkg path.
-def getBuiltinPkg() -> str:
+def getBuiltinPkg() -> SearchPath:
     return BUILT_IN_PKG
 
@@ -4,12 +4,65 @@ from typing import Any as AnyType, Union as UnionType
 from ..exceptions import NoSuchAttribute, CantSetBuiltinAttribute
 from ..types import BaseType, Instance
 from ..builtins.functions import BuiltinFunction as Fun
-from ..types import (Dict, List, Set, Tuple, Union, Class, BaseType, _get_prob)
-
-
-
-class BuiltinDataType(BaseType):
+from ..types import (Dict, List, Set, Tuple, Union, Class, BaseType, _get_prob, Attributes)
+
+
+
+# attribute tables of the builtin data types, built once per type and shared by its objects.
+ATTRIBUTE_TABLES: Dict = {}
+# the shared object of each builtin data type.
+FLYWEIGHTS: Dict = {}
+FLYWEIGHT_STATS: Dict = {'hits': 0, 'created': 0, 'mutable': 0, 'dropped': 0}
+
+def getFlyweightStats() -> Dict:
+    return dict(FLYWEIGHT_STATS)
+
+# metaclass of the builtin data types, calling a type returns its shared object.
+# The shared objects don't keep written attributes, mutable() creates a private object.
+class Flyweight(type):
+    def __call__(cls: 'Flyweight', *args: AnyType) -> AnyType:
+        if args:
+            return cls.mutable(*args)
+        obj = FLYWEIGHTS.get(cls)
+        if obj is not None:
+            FLYWEIGHT_STATS['hits'] += 1
+            return obj
+        obj = super().__call__()
+        # every read of the shared attribute table gets its own builtin functions.
+        if isinstance(getattr(obj, 'attributes', None), Attributes):
+            obj.attributes.memo = False
+        FLYWEIGHTS[cls] = obj
+        FLYWEIGHT_STATS['created'] += 1
+        return obj
+
+    def mutable(cls: 'Flyweight', *args: AnyType) -> AnyType:
+        FLYWEIGHT_STATS['mutable'] += 1
+        return super().__call__(*args)
+
+# return whether the object is the shared object of its builtin data type.
+def isFlyweight(obj: AnyType) -> bool:
+    return FLYWEIGHTS.get(type(obj)) is obj
+
+# drop the write of the attribute on the shared object, the other holders of the type would see it.
+def _drop_write(obj: AnyType, name: str) -> None:
+    FLYWEIGHT_STATS['dropped'] += 1
+    debug('dropped the write of %s on the shared %s object', name, type(obj).__name__)
+
+class BuiltinDataType(BaseType, metaclass=Flyweight):
     def __init__(self: 'BuiltinDataType') -> None:
+        cls = type(self)
+        if cls not in ATTRIBUTE_TABLES:
+            self._init_attributes()
+            ATTRIBUTE_TABLES[cls] = self.attributes
+        self.attributes = Attributes((ATTRIBUTE_TABLES[cls], ), True)
+
+    # the builtin types are the same wherever they're used, they're identified by their classes.
+    @property
+    def site(self: 'BuiltinDataType') -> str:
+        return type(self).__name__
+
+    # build the attributes of the type, the subtypes add theirs.
+    def _init_attributes(self: 'BuiltinDataType') -> None:
         self.attributes: Dict = {
             # '__class__': BaseType(),
             # '__delattr__',
@@ -103,8 +156,8 @@ class BuiltinDataType(BaseType):
 
 # IntType, and add many int fileds.
 class IntType(BuiltinDataType):
-    def __init__(self: 'IntType') -> None:
-        super().__init__()
+    def _init_attributes(self: 'IntType') -> None:
+        super()._init_attributes()
         self.attributes.update({
             '__abs__': Fun('__abs__', [], Int),
             '__add__': Fun('__add__', [Int], Int),
@@ -169,8 +222,8 @@ class IntType(BuiltinDataType):
         return 'inttype'
 # builtin float type.
 class FloatType(BuiltinDataType):
-    def __init__(self: 'FloatType') -> None:
-        super().__init__()
+    def _init_attributes(self: 'FloatType') -> None:
+        super()._init_attributes()
         self.attributes.update({
             '__abs__': Fun('__abs__', [], Float),
             '__add__': Fun('__add__', [Float], Float),
@@ -236,8 +289,8 @@ class FloatType(BuiltinDataType):
         return 'floattype'
 # builtin complex type.
 class ComplexType(BuiltinDataType):
-    def __init__(self: 'ComplexType') -> None:
-        super().__init__()
+    def _init_attributes(self: 'ComplexType') -> None:
+        super()._init_attributes()
         self.attributes.update({
             '__abs__': Fun('__abs__', [], Complex),
             '__add__': Fun('__add__', [Complex], Complex),
@@ -302,8 +355,8 @@ class ComplexType(BuiltinDataType):
         return 'complextype'
 # builtin bool type.
 class BoolType(IntType):
-    def __init__(self: 'BoolType') -> None:
-        super().__init__()
+    def _init_attributes(self: 'BoolType') -> None:
+        super()._init_attributes()
         self.attributes.update({
             '__abs__': Fun('__abs__', [], Int),
             '__add__': Fun('__add__', [Union(None, [Int, Bool])], Int),
@@ -369,8 +422,8 @@ class BoolType(IntType):
 
 # builtin string type.
 class StrType(BuiltinDataType):
-    def __init__(self: 'StrType') -> None:
-        super().__init__()
+    def _init_attributes(self: 'StrType') -> None:
+        super()._init_attributes()
         # TODO
         self.attributes.update({
             '__add__': Fun('__add__', [Str], Str),
@@ -446,8 +499,8 @@ class StrType(BuiltinDataType):
 
 # builtin bytes type.
 class BytesType(BuiltinDataType):
-    def __init__(self: 'BytesType') -> None:
-        super().__init__()
+    def _init_attributes(self: 'BytesType') -> None:
+        super()._init_attributes()
         # TODO
         self.attributes.update({
             '__add__': Fun('__add__', [Bytes], Bytes),
@@ -525,8 +578,8 @@ class BytesType(BuiltinDataType):
 
 # builtin constant None type.
 class NoneType(BuiltinDataType):
-    def __init__(self: 'NoneType') -> None:
-        super().__init__()
+    def _init_attributes(self: 'NoneType') -> None:
+        super()._init_attributes()
         self.attributes.update({
             '__bool__': Fun('__bool__', [], Bool),
         })
@@ -549,8 +602,8 @@ class NoneType(BuiltinDataType):
     
 # dynamic type Any.
 class Any(BuiltinDataType):  # Not really builtin type, but behaves like it
-    def __init__(self: 'Any') -> None:
-        super().__init__()
+    def _init_attributes(self: 'Any') -> None:
+        super()._init_attributes()
         self.attributes.update({
             '__add__': Fun('__add__', [Any], Any),
             '__mul__': Fun('__mul__', [Int], Any),
@@ -574,6 +627,9 @@ class Any(BuiltinDataType):  # Not really builtin type, but behaves like it
             return Any()
 
     def set_attribute(self: 'Any', name: str, value: AnyType) -> None:
+        if isFlyweight(self):
+            _drop_write(self, name)
+            return
         try:
             self.attributes[name] = value
         except KeyError:
@@ -612,9 +668,6 @@ class Any(BuiltinDataType):  # Not really builtin type, but behaves like it
 
 # auxiliary type undefined. Before checking, all symbols we collected is UnDefined type in all visitors.
 class UnDefined(BuiltinDataType):  # Not really builtin type, but behaves like it
-    def __init__(self: 'UnDefined') -> None:
-        super().__init__()
-
     def get_attribute(self: 'UnDefined', name: str, *probs: List) -> 'UnDefined':
         return self
 
@@ -637,8 +690,11 @@ class UnDefined(BuiltinDataType):  # Not really builtin type, but behaves like i
         return 'undefined'
 
 
-class BuiltinDataInstance(Instance):
+class BuiltinDataInstance(Instance, metaclass=Flyweight):
     def set_attribute(self: 'BuilintDataInstance', name: str, value: AnyType) -> None:
+        if isFlyweight(self):
+            _drop_write(self, name)
+            return
         self.attributes[name] = value
     
     def __eq__(self: 'BuiltinDataInstance', other: AnyType) -> bool:
@@ -3,7 +3,7 @@
 import logging
 from logging import debug, warn
 import inspect
-from typing import  Dict, List, Tuple, Any as AnyType
+from typing import  Dict, List, Set, Tuple, Any as AnyType
 
 from ..types import BaseType, Instance
 from ..exceptions import WrongBuiltinArgument, WrongArgumentsLength
@@ -32,8 +32,13 @@ def builtin_attr(para_types: str, arg_len: int) -> Tuple[bool, AnyType]:
 
     return (False, None)
 
+# the builtin operator methods checked as binary operators.
+binop_list: Set[str] = {'__add__', '__sub__', '__mul__', '__div__', '__truediv__', '__mod__', '__pow__'}
+
 # Builtin function class definition, represents print, str and so on.
 class BuiltinFunction(BaseType):
+    __slots__ = ('name', 'param_types', 'return_type', 'prob')
+
     def __init__(self: 'BaseType', name: str, param_types: List, return_type: AnyType) -> None:
         self.name = name
         self.param_types = param_types
@@ -57,7 +62,6 @@ class BuiltinFunction(BaseType):
                 logging.warning(f"[WrongArgsLen] builtin func:{self.name} is called with wrong number of arguments, expected:{len(self.param_types)}, actually is {len(args)}")
                 self._ckd_result = self.return_type
                 return self._ckd_result
-        binop_list = ['__add__', '__sub__', '__mul__', '__div__', '__truediv__', '__mod__', '__pow__']
         if isinstance(args, list):
             tmp = []
             p = []
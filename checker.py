@@ -1,3 +1,4 @@
+import functools
 import traceback
 import logging
 import sys
@@ -5,30 +6,29 @@ import os
 from typing import Dict, List, Any as AnyType
 
 from . import result
-from . import insuline, namespace, builtins, nodes
+from . import insuline, namespace, builtins, nodes, budget
 
 from .coordinator.ExtractStaticTypes import staDict, probDict
 from .coordinator.extractOneFileTypes import getOriginTypes
 from .coordinator.fixnode import fixASTNode
-from .coordinator.typemap import setTypeMap
-from .imports_helper import imports_flags, imports_cache
+from .coordinator.typemap import setTypeMap, getTypeMap
+from .imports_helper import imports_flags
+from . import module_registry
+from . import search_path
 
 import ast
 AST = ast.AST
 
 debug = logging.debug
 
-# return module symbol table.
+# return module symbol table, a view of the module namespace instead of a copy.
 def getModuleType(ns: Dict) -> Dict:
-    data = {}
     if ns is None:
         return None
     from .builtins.data_types import Any
     if isinstance(ns, Any):
-        return data
-    for key in ns.keys():
-        data[key] = ns[key]
-    return data
+        return {}
+    return namespace.ModuleView(ns)
 
 # add inferenced types and probabilities to ast nodes.
 def fixNodeType(file_: str, asttree: AnyType) -> AST:
@@ -41,48 +41,59 @@ def fixNodeType(file_: str, asttree: AnyType) -> AST:
     
     return asttree
 
+# add the inferred types to a function body of the module, it's converted after the module.
+def fixBodyTypes(file_: str, type_map: Dict, body: List) -> None:
+    tmp_map = getTypeMap()
+    setTypeMap(type_map)
+    try:
+        fixNodeType(file_, body)
+        from .modulevisitor import ModuleVisitor
+        visitor = ModuleVisitor()
+        for stmt in body:
+            visitor.generic_visit(stmt)
+    finally:
+        setTypeMap(tmp_map)
+
 # type checking one module, and add the module type into the caches.
 def check(module: AnyType, type_map: Dict, file_: str = '') -> Dict:
-    from . import recursion
+    from . import recursion, types
     recursion.clear()
+    types.clearMemberAttributes()
     import ast
     
     if type_map is None:
         type_map = namespace.build_type_map()
         builtins.add_to_type_map(type_map)
     insuline.replace_syntactic_sugar(module)
-    module = nodes.convert(type_map, module)
-    mod = {}
-    setTypeMap(type_map)
-    module = fixNodeType(file_, module)
-    from .modulevisitor import ModuleVisitor
-    visitor = ModuleVisitor()
-    visitor.visit(module)
+    from . import config
+    recursion.analyze(config.getFileName(), module)
+    # the converting and checking time of the module is in its file budget.
+    budget.enterFile(config.getFileName())
     try:
-        mod = module.check()
-    except Exception as err:
-        import traceback
-        traceback.print_exc()
+        # the function bodies are converted on their first use, the inferred types are added to them then.
+        nodes.setBodyPass(functools.partial(fixBodyTypes, file_, type_map))
+        try:
+            module = nodes.convert(type_map, module)
+        finally:
+            nodes.setBodyPass(None)
+        mod = {}
+        setTypeMap(type_map)
+        module = fixNodeType(file_, module)
+        from .modulevisitor import ModuleVisitor
+        visitor = ModuleVisitor()
+        visitor.visit(module)
+        try:
+            mod = module.check()
+        except Exception as err:
+            import traceback
+            traceback.print_exc()
+    finally:
+        budget.exitFile()
     from . import config
-    import os
-    root_dir = config.getRootDir()
     file = config.getFileName()
     imports_flags[file] = True
-    file = os.path.abspath(file)
-    if file.startswith(config.getRootDir()):
-        filename = file.replace(root_dir, \
-                                root_dir.split(os.path.sep)[-2] + os.path.sep)
-    else:
-        filename = file.split(os.path.sep)[-1]
-    if '/__init__.' in file:
-        from . import pkginfo
-        filename = file.split(os.path.sep)[-2]
-
-    filename = file.replace(".pyi", "")
-    filename = filename.replace(".py", "")
-    filename = filename.replace("/__init__", "")
-    
-    if filename not in imports_cache:
-        imports_cache[filename] = getModuleType(mod)
-        return imports_cache[filename]
-    return getModuleType(mod)
+    record = module_registry.getRecord(file)
+    if record is not None \
+        and record.state == module_registry.DONE:
+        return getModuleType(mod)
+    return module_registry.finish(file, getModuleType(mod), search_path.getSearchPath()).module_type
@@ -1,5 +1,6 @@
 # Global variables for our checker. We set these variables before type checking.
 import ast
+from typing import Set
 AST = ast.AST
 
 FILE_NAME: str = ""
@@ -12,6 +13,14 @@ TYPE_ERROR: bool = False
 DEBUG: bool = False
 B_NAME: str = ""
 IMPORT_FROM: bool = False
+LAZY_IMPORTS: bool = True
+# import policies, -1 means the imports are followed at any depth.
+IMPORT_DEPTH: int = -1
+IMPORT_LEVEL: int = 0
+PROJECT_IMPORTS: bool = False
+SKIP_PACKAGES: Set[str] = set()
+# only the functions called from the checked code are checked, not the annotated ones at their definition.
+REACHABLE_ONLY: bool = False
 
 def setBName(name: str) -> None:
     global B_NAME
@@ -82,3 +91,46 @@ def setImportFrom(imp: bool) -> bool:
 
 def getImportFrom() -> bool:
     return IMPORT_FROM
+
+def setLazyImports(lazy: bool) -> None:
+    global LAZY_IMPORTS
+    LAZY_IMPORTS = lazy
+
+def getLazyImports() -> bool:
+    return LAZY_IMPORTS
+
+def setImportDepth(depth: int) -> None:
+    global IMPORT_DEPTH
+    IMPORT_DEPTH = depth
+
+def getImportDepth() -> int:
+    return IMPORT_DEPTH
+
+# the import level of the module being checked, the checked files are level 0.
+def setImportLevel(level: int) -> None:
+    global IMPORT_LEVEL
+    IMPORT_LEVEL = level
+
+def getImportLevel() -> int:
+    return IMPORT_LEVEL
+
+def setProjectImports(project_only: bool) -> None:
+    global PROJECT_IMPORTS
+    PROJECT_IMPORTS = project_only
+
+def getProjectImports() -> bool:
+    return PROJECT_IMPORTS
+
+def setReachableOnly(reachable: bool) -> None:
+    global REACHABLE_ONLY
+    REACHABLE_ONLY = reachable
+
+def getReachableOnly() -> bool:
+    return REACHABLE_ONLY
+
+def setSkipPackages(packages: Set[str]) -> None:
+    global SKIP_PACKAGES
+    SKIP_PACKAGES = set(packages)
+
+def getSkipPackages() -> Set[str]:
+    return SKIP_PACKAGES
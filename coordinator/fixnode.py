@@ -22,5 +22,10 @@ def fixASTNode(asttree: AnyType, typeDict: Dict, absfile: str, isProb: bool = Tr
         types = typeDict  
     setTypes(types.copy(), isProb, isSingle)
     visitor = CodeVisitor()
-    visitor.visit(asttree)
+    # the statements of a function body converted after its module.
+    if isinstance(asttree, list):
+        for stmt in asttree:
+            visitor.generic_visit(stmt)
+    else:
+        visitor.visit(asttree)
     return asttree
@@ -95,20 +95,13 @@ class CodeVisitor(NodeVisitor):
         self.generic_visit(node)
     
     def visit_AsyncFunctionDef(self: Visitor, node: ast.AsyncFunctionDef) -> None:
-        self.generic_visit(node)
-        self.generic_visit(node.args)
-        self.generic_visit(node)
         addTypesForAST(node, node.name)
-        self.generic_visit(node.args)
-        for stat in node.body:
+        for stat in node.converted_body():
             self.generic_visit(stat)
     
     def visit_AsyncWith(self: Visitor, node: ast.AsyncWith) -> None:
         self.generic_visit(node)
     
-    def visit_Attribute(self: Visitor, node: ast.Attribute) -> None:
-        self.generic_visit(node)
-    
     def visit_AugAssign(self: Visitor, node: ast.AugAssign) -> None:
         self.generic_visit(node)
     
@@ -118,12 +111,6 @@ class CodeVisitor(NodeVisitor):
     def visit_AugStore(self: Visitor, node: ast.AugStore) -> None:
         self.generic_visit(node)
     
-    def visit_Await(self: Visitor, node: ast.Await) -> None:
-        self.generic_visit(node)
-    
-    def visit_BinOp(self: Visitor, node: ast.BinOp) -> None:
-        self.generic_visit(node)
-    
     def visit_BitAnd(self: Visitor, node: ast.BitAnd) -> None:
         self.generic_visit(node)
     
@@ -133,24 +120,15 @@ class CodeVisitor(NodeVisitor):
     def visit_BitXor(self: Visitor, node: ast.BitXor) -> None:
         self.generic_visit(node)
     
-    def visit_BoolOp(self: Visitor, node: ast.BoolOp) -> None:
-        self.generic_visit(node)
-    
     def visit_Break(self: Visitor, node: ast.Break) -> None:
         self.generic_visit(node)
     
     def visit_Bytes(self: Visitor, node: ast.Bytes) -> None:
         self.generic_visit(node)
     
-    def visit_Call(self: Visitor, node: ast.Call) -> None:
-        self.generic_visit(node)
-    
     def visit_ClassDef(self: Visitor, node: ast.ClassDef) -> None:
         self.generic_visit(node)
     
-    def visit_Compare(self: Visitor, node: ast.Compare) -> None:
-        self.generic_visit(node)
-    
     def visit_ConstDecl(self: Visitor, node: AST) -> None:
         self.generic_visit(node)
     
@@ -166,9 +144,6 @@ class CodeVisitor(NodeVisitor):
     def visit_Delete(self: Visitor, node: ast.Delete) -> None:
         self.generic_visit(node)
     
-    def visit_Dict(self: Visitor, node: ast.Dict) -> None:
-        self.generic_visit(node)
-    
     def visit_DictComp(self: Visitor, node: ast.DictComp) -> None:
         self.generic_visit(node)
     
@@ -184,9 +159,6 @@ class CodeVisitor(NodeVisitor):
     def visit_ExceptHandler(self: Visitor, node: ast.ExceptHandler) -> None:
         self.generic_visit(node)
     
-    def visit_Expr(self: Visitor, node: ast.Expr) -> None:
-        self.generic_visit(node)
-    
     def visit_Expression(self: Visitor, node: ast.Expression) -> None:
         self.generic_visit(node)
     
@@ -196,16 +168,12 @@ class CodeVisitor(NodeVisitor):
     def visit_FloorDiv(self: Visitor, node: ast.FloorDiv) -> None:
         self.generic_visit(node)
     
-    def visit_For(self: Visitor, node: ast.For) -> None:
-        self.generic_visit(node)
-    
     def visit_FormattedValue(self: Visitor, node: ast.FormattedValue) -> None:
         self.generic_visit(node)
     
     def visit_FunctionDef(self: Visitor, node: ast.FunctionDef) -> None:
         addTypesForAST(node, node.name)
-        self.generic_visit(node.args)
-        for stat in node.body:
+        for stat in node.converted_body():
             self.generic_visit(stat)
     
     def visit_GeneratorExp(self: Visitor, node: ast.GeneratorExp) -> None:
@@ -220,12 +188,6 @@ class CodeVisitor(NodeVisitor):
     def visit_GtE(self: Visitor, node: ast.GtE) -> None:
         self.generic_visit(node)
     
-    def visit_If(self: Visitor, node: ast.If) -> None:
-        self.generic_visit(node)
-    
-    def visit_IfExp(self: Visitor, node: ast.IfExp) -> None:
-        self.generic_visit(node)
-    
     def visit_Import(self: Visitor, node: ast.Import) -> None:
         self.generic_visit(node)
     
@@ -235,9 +197,6 @@ class CodeVisitor(NodeVisitor):
     def visit_In(self: Visitor, node: ast.In) -> None:
         self.generic_visit(node)
     
-    def visit_Index(self: Visitor, node: ast.Index) -> None:
-        self.generic_visit(node)
-    
     def visit_Interactive(self: Visitor, node: ast.Interactive) -> None:
         self.generic_visit(node)
     
@@ -259,9 +218,6 @@ class CodeVisitor(NodeVisitor):
     def visit_Lambda(self: Visitor, node: ast.Lambda) -> None:
         self.generic_visit(node)
     
-    def visit_List(self: Visitor, node: ast.List) -> None:
-        self.generic_visit(node)
-    
     def visit_ListComp(self: Visitor, node: ast.ListComp) -> None:
         self.generic_visit(node)
     
@@ -333,21 +289,12 @@ class CodeVisitor(NodeVisitor):
     def visit_Raise(self: Visitor, node: ast.Raise) -> None:
         self.generic_visit(node)
     
-    def visit_Return(self: Visitor, node: ast.Return) -> None:
-        self.generic_visit(node)
-    
-    def visit_Set(self: Visitor, node: ast.Set) -> None:
-        self.generic_visit(node)
-    
     def visit_SetComp(self: Visitor, node: ast.SetComp) -> None:
         self.generic_visit(node)
     
     def visit_Slice(self: Visitor, node: ast.Slice) -> None:
         self.generic_visit(node)
     
-    def visit_Starred(self: Visitor, node: ast.Starred) -> None:
-        self.generic_visit(node)
-    
     def visit_Store(self: Visitor, node: ast.Store) -> None:
         self.generic_visit(node)
     
@@ -357,18 +304,9 @@ class CodeVisitor(NodeVisitor):
     def visit_Sub(self: Visitor, node: ast.Sub) -> None:
         self.generic_visit(node)
     
-    def visit_Subscript(self: Visitor, node: ast.Subscript) -> None:
-        self.generic_visit(node)
-    
     def visit_Suite(self: Visitor, node: ast.Suite) -> None:
         self.generic_visit(node)
     
-    def visit_Try(self: Visitor, node: ast.Try) -> None:
-        self.generic_visit(node)
-    
-    def visit_Tuple(self: Visitor, node: ast.Tuple) -> None:
-        self.generic_visit(node)
-    
     def visit_TypeDef(self: Visitor, node: AST) -> None:
         self.generic_visit(node)
     
@@ -378,18 +316,9 @@ class CodeVisitor(NodeVisitor):
     def visit_USub(self: Visitor, node: ast.USub) -> None:
         self.generic_visit(node)
     
-    def visit_UnaryOp(self: Visitor, node: ast.UnaryOp) -> None:
-        self.generic_visit(node)
-    
     def visit_VarDecl(self: Visitor, node: AST) -> None:
         self.generic_visit(node)
     
-    def visit_While(self: Visitor, node: ast.While) -> None:
-        self.generic_visit(node)
-    
-    def visit_With(self: Visitor, node: ast.With) -> None:
-        self.generic_visit(node)
-    
     def visit_Yield(self: Visitor, node: ast.Yield) -> None:
         self.generic_visit(node)
     
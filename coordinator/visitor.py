@@ -44,11 +44,23 @@ class NodeVisitor(object):
         return visitor(node)
 
     def generic_visit(self: Visitor, node: AST) -> None:
-        """Called if no explicit visitor function exists for a node."""
-        for field, value in iter_fields(node):
-            if isinstance(value, list):
-                for item in value:
-                    if isinstance(item, Node):
-                        self.visit(item)
-            elif isinstance(value, Node):
-                self.visit(value)
+        """
+        Called if no explicit visitor function exists for a node.
+        The nested nodes without visitor functions are walked with an explicit
+        stack, in the same order as visiting them one by one.
+        """
+        todo = [node]
+        while todo:
+            children = []
+            for field, value in iter_fields(todo.pop()):
+                if isinstance(value, list):
+                    children.extend(item for item in value if isinstance(item, Node))
+                elif isinstance(value, Node):
+                    children.append(value)
+            for child in reversed(children):
+                todo.append(child)
+            while todo:
+                visitor = getattr(self, 'visit_' + todo[-1].__class__.__name__, None)
+                if visitor is None:
+                    break
+                visitor(todo.pop())
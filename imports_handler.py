@@ -1,13 +1,18 @@
 # imports handler for the checker, and handle the import recursion.
 
 import ast
+import importlib.machinery
+import importlib.util
 import sys
 import os
-from typing import Union, Any as AnyType, Dict, List
+from typing import Union, Optional, Any as AnyType, Dict, List, Tuple
 
 from .checker import check
 from .exceptions import NotYetSupported
 from .builtins.data_types import Any
+from .lazy_module import LazyModule
+from . import module_registry
+from .search_path import SearchPath
 
 from .imports_helper import BUILTIN_IMPORTS, BUILTIN_FLAGS, imports_cache, imports_flags
 
@@ -33,11 +38,89 @@ def getMTypeFromFile(file: AnyType, type_map: Dict) -> Dict:
     m_type = check(asttree, type_map)
     return m_type
 
+# get the lazy module symbol table of the file, definitions are checked on access.
+def getLazyMTypeFromFile(file: AnyType) -> LazyModule:
+    asttree = ast.parse(file.read())
+    return LazyModule(file.name, asttree)
+
+# module files found for the module name, keyed by the search path and the name.
+RESOLVED_FILES: Dict[Tuple[SearchPath, str], List[str]] = {}
+
+# return the files that define the module name in the search order.
+def resolveFiles(filename: str, syspath: SearchPath) -> List[str]:
+    key = (syspath, filename)
+    if key not in RESOLVED_FILES:
+        files = []
+        for path in syspath:
+            full_path = os.path.sep.join([path, filename]) \
+                if len(filename.split(os.path.sep)) == 1\
+                else filename
+            file = getfiledefinitions(full_path)
+            if file and file not in files:
+                files.append(file)
+        RESOLVED_FILES[key] = files
+    return RESOLVED_FILES[key]
+
+# return why the import policies skip the module file, None if it's checked.
+# The depth and project policies only apply to sources, stub files are always checked.
+def skipReason(record: module_registry.ModuleRecord) -> Optional[str]:
+    from . import config
+    for pkg in config.getSkipPackages():
+        if record.name == pkg \
+            or record.name.startswith(pkg + '.'):
+            return 'package {}'.format(pkg)
+    if record.path.endswith('.pyi'):
+        return None
+    depth = config.getImportDepth()
+    if depth >= 0 \
+        and config.getImportLevel() + 1 > depth:
+        return 'import depth {}'.format(depth)
+    if config.getProjectImports():
+        project = module_registry.realPath(config.getRootDir())
+        if os.path.isfile(project):
+            project = os.path.dirname(project)
+        if not record.path.startswith(project + os.path.sep):
+            return 'outside project'
+    return None
+
+# return the module table of the skipped module, the top-level names are Any.
+def getSkippedMType(file: str) -> Dict:
+    from .lazy_module import _bound_names
+    module_type = {}
+    try:
+        with open(file, 'r') as f:
+            asttree = ast.parse(f.read())
+    except Exception:
+        return module_type
+    for stmt in asttree.body:
+        for name in _bound_names(stmt) or ():
+            module_type[name] = Any()
+    return module_type
+
+# import the interpreter's module for its names, like __import__ it returns the top-level package.
+# The module is found on the search path, the interpreter's sys.path is neither read nor changed.
+def importModule(filename: str, syspath: SearchPath) -> AnyType:
+    name = filename.split('.')[0]
+    module = sys.modules.get(name)
+    if module is None:
+        spec = importlib.machinery.BuiltinImporter.find_spec(name) \
+            or importlib.machinery.FrozenImporter.find_spec(name) \
+            or importlib.machinery.PathFinder.find_spec(name, list(syspath))
+        if spec is None:
+            raise ModuleNotFoundError('No module named {!r}'.format(name), name=name)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        try:
+            spec.loader.exec_module(module)
+        except BaseException:
+            del sys.modules[name]
+            raise
+    if name != filename:
+        importlib.import_module(filename)
+    return module
+
 # check the import statements of the filename.
-def checkimport(filename: str, syspath: List) -> AnyType:
-    tmp = list(set(syspath))
-    tmp.sort(key=syspath.index)
-    syspath = tmp
+def checkimport(filename: str, syspath: SearchPath) -> AnyType:
     check_stub = True
     # Some builtin modules such as sys, typing, are imported from typeshed and cached.
     if filename in BUILTIN_IMPORTS:
@@ -60,22 +143,20 @@ def checkimport(filename: str, syspath: List) -> AnyType:
             or filename in BUILTIN_IMPORTS:
 
             from . import builtinpkgs
-            tmp_syspath = sys.path
-            sys.path = builtinpkgs.getBuiltinPkg() \
+            # the builtin imports are found without the directory of the checked script.
+            path = builtinpkgs.getBuiltinPkg() \
                     if filename in BUILTIN_IMPORTS \
                     and not BUILTIN_FLAGS[filename] \
-                    else sys.path
+                    else SearchPath(sys.path)
             try:
                 # For _frozenModuleName, we just need to get all the symbols defined in the module. If they were annoted in the typeshed, we import stub file.
-                mod = __import__(filename)
+                mod = importModule(filename, path)
                 module_type = {var: Any() for var in dir(mod)}
             except ModuleNotFoundError:
                 module_type = {}
                 imports_flags[filename] = 'not found'
             except ImportError:
                 flag = False
-            finally:
-                sys.path = tmp_syspath
             module_type.update(module_attributes)
             if flag:
                 imports_cache[filename] = module_type
@@ -83,37 +164,47 @@ def checkimport(filename: str, syspath: List) -> AnyType:
 
         from . import config
         from . import result
-        for path in syspath:
-            full_path = os.path.sep.join([path, filename]) \
-                if len(filename.split(os.path.sep)) == 1\
-                else filename
-            file = getfiledefinitions(full_path)
+        for file in resolveFiles(filename, syspath):
             if file:
-                # Remove the suffix in the filename.
-                filename = filename.replace(".pyi", "")
-                filename = filename.replace(".py", "")
-                filename = filename.replace("/__init__", "")
-                if filename in imports_cache:
-                    return imports_cache[filename]
-                else:
-                    imports_cache[filename] = {}
+                # the module may be reached by several names and by the directory walk,
+                # the registry keeps one record per real path.
+                record = module_registry.register(file, syspath)
+                if record.state != module_registry.PENDING:
+                    return record.module_type
+                reason = skipReason(record)
+                if reason is not None:
+                    module_type = getSkippedMType(file)
+                    module_type.update(module_attributes)
+                    module_registry.skip(file, module_type, reason)
+                    result.writeFileName(file)
+                    result.writeFileName("Skipped! ({})".format(reason))
+                    return module_type
+                module_registry.begin(file, syspath)
                 tmpFileName = config.getFileName()
                 tmpLineNo = config.getLineNo()
+                tmpLevel = config.getImportLevel()
                 config.setFileName(file)
+                config.setImportLevel(tmpLevel + 1)
                 imports_flags[file] = False
                 from . import recursion
                 tmp_rec = recursion.get()
                 try:
                  with open(file, 'r') as f:
-                     module_type = getMTypeFromFile(f, None)
+                     if config.getLazyImports():
+                         module_type = getLazyMTypeFromFile(f)
+                     else:
+                         module_type = getMTypeFromFile(f, None)
                      module_type.update(module_attributes)
                      result.writeFileName(file)
                      result.writeFileName("Checked!")
                      config.setFileName(tmpFileName)
                      config.setLineNo(tmpLineNo)
                      imports_flags[file] = True
-                     imports_cache[filename] = module_type
+                     module_registry.finish(file, module_type)
                      if filename in BUILTIN_IMPORTS:
+                         # the builtin imports are looked up by name before the registry,
+                         # their next imports get the checked module type instead of the interpreter's names.
+                         imports_cache[filename] = module_type
                          BUILTIN_FLAGS[filename] = True
                      recursion.set(tmp_rec)
                      return module_type
@@ -122,4 +213,9 @@ def checkimport(filename: str, syspath: List) -> AnyType:
                 finally:
                  config.setFileName(tmpFileName)
                  config.setLineNo(tmpLineNo)
+                 config.setImportLevel(tmpLevel)
+                 # the module whose checking raised isn't left in progress, the later imports
+                 # get Any like this one instead of its partial module type.
+                 if record.state == module_registry.IN_PROGRESS:
+                     module_registry.fail(file, Any())
         return Any()
@@ -0,0 +1,191 @@
+# lazy module symbol table for the imports handler.
+# The module is parsed and indexed once, but a top-level definition is only
+# converted and checked when it's accessed through ImportFrom or attribute access.
+import ast
+from typing import Dict, List, Set, Optional, Any as AnyType
+
+AST = ast.AST
+
+# nodes with their own scope, names bound inside them are not module names.
+SCOPE_NODES: tuple = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef,
+                      ast.Lambda, ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp)
+
+# return the names bound by the import statement, None for star imports.
+def _import_names(node: AST) -> Optional[Set[str]]:
+    names = set()
+    for alias in node.names:
+        if alias.name == '*':
+            return None
+        if alias.asname is not None:
+            names.add(alias.asname)
+        else:
+            names.add(alias.name.split('.')[0])
+    return names
+
+# collect the module-level names bound by a top-level statement.
+# None means the names can't be known statically, such as star imports.
+def _bound_names(stmt: AST) -> Optional[Set[str]]:
+    names = set()
+    todo = [stmt]
+    while todo:
+        node = todo.pop()
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            imported = _import_names(node)
+            if imported is None:
+                return None
+            names.update(imported)
+            continue
+        if isinstance(node, SCOPE_NODES):
+            if hasattr(node, 'name'):
+                names.add(node.name)
+            continue
+        if isinstance(node, ast.Name) \
+            and isinstance(node.ctx, ast.Store):
+            names.add(node.id)
+        todo.extend(ast.iter_child_nodes(node))
+    return names
+
+# Module symbol table, it's stored in the module registry as the module type of a lazily checked module.
+class LazyModule(dict):
+    def __init__(self: 'LazyModule', file: str, asttree: AST) -> None:
+        super().__init__()
+        from . import namespace, builtins, insuline, config, search_path, recursion
+        from . import import_visitor
+        from .comp_types_attrs import module_attributes
+        from .util1 import getModuleName
+
+        self.file = file
+        # the imports of the module are resolved with the search path it was imported with.
+        self.search_path = search_path.getSearchPath()
+        self.import_level = config.getImportLevel()
+        self._pending: Dict[str, List[int]] = {}
+        self._checked: Set[int] = set()
+        insuline.replace_syntactic_sugar(asttree)
+        recursion.analyze(file, asttree)
+        self._stmts = asttree.body
+
+        tmpFileName = config.getFileName()
+        config.setFileName(file)
+        try:
+            self.type_map = namespace.build_type_map()
+            builtins.add_to_type_map(self.type_map)
+            self.namespace = self.type_map.enter_namespace(getModuleName())
+            # the module namespace stores its names in the lazy module directly.
+            self.namespace.data = self
+            # pre-add the module identifiers with undefined types, same as nodes.Module.
+            tmp_map = import_visitor.getTypeMap()
+            import_visitor.setTypeMap(self.type_map)
+            import_visitor.ImportVisitor().visit(asttree)
+            import_visitor.setTypeMap(tmp_map)
+        finally:
+            config.setFileName(tmpFileName)
+        dict.update(self, module_attributes)
+
+        eager = []
+        for idx, stmt in enumerate(self._stmts):
+            names = _bound_names(stmt)
+            if names is None:
+                eager.append(idx)
+                continue
+            for name in names:
+                self._pending.setdefault(name, []).append(idx)
+        # star imports may bind any name, so we check them before any lookup.
+        for idx in eager:
+            self._check_stmt(idx)
+
+    # convert and check one top-level statement in the module namespace.
+    def _check_stmt(self: 'LazyModule', idx: int) -> None:
+        if idx in self._checked:
+            return
+        self._checked.add(idx)
+        from . import config, nodes, recursion, search_path, budget
+        from .coordinator.typemap import getTypeMap, setTypeMap
+
+        tmpFileName = config.getFileName()
+        tmpLineNo = config.getLineNo()
+        tmp_rec = recursion.get()
+        tmp_map = getTypeMap()
+        tmp_path = search_path.getSearchPath()
+        tmpLevel = config.getImportLevel()
+        # the lookup may come from a function scope of this module, the definition
+        # is checked in the module namespace.
+        tmp_ns = self.type_map.current_namespace
+        self.type_map.current_namespace = self.namespace
+        config.setFileName(self.file)
+        setTypeMap(self.type_map)
+        search_path.setSearchPath(self.search_path)
+        config.setImportLevel(self.import_level)
+        recursion.clear()
+        budget.enterFile(self.file)
+        try:
+            stmt = nodes.convert(self.type_map, self._stmts[idx])
+            stmt.check()
+        except Exception:
+            nodes._except_handler()
+        finally:
+            budget.exitFile()
+            self.type_map.current_namespace = tmp_ns
+            config.setFileName(tmpFileName)
+            config.setLineNo(tmpLineNo)
+            recursion.set(tmp_rec)
+            setTypeMap(tmp_map)
+            search_path.setSearchPath(tmp_path)
+            config.setImportLevel(tmpLevel)
+
+    # check the statements that define the name.
+    def resolve(self: 'LazyModule', name: str) -> None:
+        idxs = self._pending.pop(name, None)
+        if idxs:
+            for idx in idxs:
+                self._check_stmt(idx)
+
+    # check all the pending definitions, used when the whole table is needed.
+    def resolve_all(self: 'LazyModule') -> None:
+        while self._pending:
+            self.resolve(next(iter(self._pending)))
+
+    def __getitem__(self: 'LazyModule', name: str) -> AnyType:
+        if name in self._pending:
+            self.resolve(name)
+        return dict.__getitem__(self, name)
+
+    def __contains__(self: 'LazyModule', name: str) -> bool:
+        if name in self._pending:
+            self.resolve(name)
+        return dict.__contains__(self, name)
+
+    def get(self: 'LazyModule', name: str, default: AnyType = None) -> AnyType:
+        if name in self._pending:
+            self.resolve(name)
+        return dict.get(self, name, default)
+
+    def __iter__(self: 'LazyModule') -> AnyType:
+        self.resolve_all()
+        return dict.__iter__(self)
+
+    # the module attributes always exist, don't resolve the table for truth testing.
+    def __bool__(self: 'LazyModule') -> bool:
+        return True
+
+    def __len__(self: 'LazyModule') -> int:
+        self.resolve_all()
+        return dict.__len__(self)
+
+    def keys(self: 'LazyModule') -> AnyType:
+        self.resolve_all()
+        return dict.keys(self)
+
+    def values(self: 'LazyModule') -> AnyType:
+        self.resolve_all()
+        return dict.values(self)
+
+    def items(self: 'LazyModule') -> AnyType:
+        self.resolve_all()
+        return dict.items(self)
+
+    def copy(self: 'LazyModule') -> Dict:
+        self.resolve_all()
+        return dict(dict.items(self))
+
+    def __repr__(self: 'LazyModule') -> str:
+        return 'LazyModule({!r}, pending:{})'.format(self.file, len(self._pending))
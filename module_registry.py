@@ -0,0 +1,111 @@
+# canonical module registry, every checked file is registered once by its real path and dotted name.
+# The directory walk, the imports handler and the checker share the registry,
+# so a module reached by several of them is only checked once.
+import os
+from typing import Dict, List, Optional, Any as AnyType
+
+PENDING: str = 'pending'
+IN_PROGRESS: str = 'in-progress'
+DONE: str = 'done'
+# the checking of the module raised, its module type has no checked types.
+FAILED: str = 'failed'
+
+# the registry entry of one module file.
+class ModuleRecord(object):
+    def __init__(self: 'ModuleRecord', path: str, name: str) -> None:
+        self.path = path
+        self.name = name
+        self.state = PENDING
+        self.module_type = None
+        # why the module wasn't checked, None for the checked modules.
+        self.skipped = None
+
+    def __repr__(self: 'ModuleRecord') -> str:
+        return 'ModuleRecord({}, {}, {})'.format(self.name, self.path, self.state)
+
+# registered modules indexed by real path and by dotted name.
+MODULES_BY_PATH: Dict[str, ModuleRecord] = {}
+MODULES_BY_NAME: Dict[str, ModuleRecord] = {}
+
+# return the canonical path of the file.
+def realPath(file: str) -> str:
+    return os.path.realpath(os.path.abspath(file))
+
+# return the dotted module name of the file. Files of the checked project are named
+# from the project directory, others from the nearest search path.
+# The suffix is split off as a whole, so 'pyramid/py_helpers.py' becomes 'pyramid.py_helpers'.
+def moduleName(file: str, syspath: List[str]) -> str:
+    from . import config
+    path = realPath(file)
+    base, _ = os.path.splitext(path)
+    if os.path.basename(base) == '__init__':
+        base = os.path.dirname(base)
+    project = realPath(config.getRootDir())
+    if base.startswith(project + os.path.sep):
+        syspath = [os.path.dirname(project)]
+    root = ''
+    for dir in syspath:
+        if not dir:
+            continue
+        dir = realPath(dir)
+        if base.startswith(dir + os.path.sep) \
+            and len(dir) > len(root):
+            root = dir
+    rel = base[len(root) + 1:] if root else os.path.basename(base)
+    return rel.replace(os.path.sep, '.')
+
+# return the record of the file, None if the file isn't registered.
+def getRecord(file: str) -> Optional[ModuleRecord]:
+    return MODULES_BY_PATH.get(realPath(file))
+
+# return the record of the dotted module name, None if the module isn't registered.
+def getRecordByName(name: str) -> Optional[ModuleRecord]:
+    return MODULES_BY_NAME.get(name)
+
+# register the file as pending if it's new, and return its record.
+def register(file: str, syspath: Optional[List[str]] = None) -> ModuleRecord:
+    path = realPath(file)
+    record = MODULES_BY_PATH.get(path)
+    if record is None:
+        record = ModuleRecord(path, moduleName(path, syspath or []))
+        MODULES_BY_PATH[path] = record
+        MODULES_BY_NAME.setdefault(record.name, record)
+    return record
+
+# mark the module as being checked, imports of it will get the partial module type.
+def begin(file: str, syspath: List[str]) -> ModuleRecord:
+    record = register(file, syspath)
+    record.state = IN_PROGRESS
+    if record.module_type is None:
+        record.module_type = {}
+    return record
+
+# mark the module as skipped by the import policies, its module type has no checked types.
+def skip(file: str, module_type: AnyType, reason: str, syspath: Optional[List[str]] = None) -> ModuleRecord:
+    record = finish(file, module_type, syspath)
+    record.skipped = reason
+    return record
+
+# return the records of the modules skipped by the import policies.
+def getSkipped() -> List[ModuleRecord]:
+    return [record for record in MODULES_BY_PATH.values() if record.skipped]
+
+# return the numbers of the registered modules by their states, they're printed in the debug mode.
+def getStats() -> Dict[str, int]:
+    stats = {PENDING: 0, IN_PROGRESS: 0, DONE: 0, FAILED: 0}
+    for record in MODULES_BY_PATH.values():
+        stats[record.state] += 1
+    return stats
+
+# mark the module as checked and store its module type.
+def finish(file: str, module_type: AnyType, syspath: Optional[List[str]] = None) -> ModuleRecord:
+    record = register(file, syspath)
+    record.state = DONE
+    record.module_type = module_type
+    return record
+
+# mark the module as failed, the later imports get the module type instead of the partial one.
+def fail(file: str, module_type: AnyType, syspath: Optional[List[str]] = None) -> ModuleRecord:
+    record = finish(file, module_type, syspath)
+    record.state = FAILED
+    return record
@@ -83,19 +83,12 @@ class ModuleVisitor(NodeVisitor):
         self.generic_visit(node)
     
     def visit_AsyncFunctionDef(self: Visitor, node: ast.AsyncFunctionDef) -> None:
-        self.generic_visit(node)
-        self.generic_visit(node.args)
-        self.generic_visit(node)
-        self.generic_visit(node.args)
-        for stat in node.body:
+        for stat in node.converted_body():
             self.generic_visit(stat)
     
     def visit_AsyncWith(self: Visitor, node: ast.AsyncWith) -> None:
         self.generic_visit(node)
     
-    def visit_Attribute(self: Visitor, node: ast.Attribute) -> None:
-        self.generic_visit(node)
-    
     def visit_AugAssign(self: Visitor, node: ast.AugAssign) -> None:
         self.generic_visit(node)
     
@@ -105,12 +98,6 @@ class ModuleVisitor(NodeVisitor):
     def visit_AugStore(self: Visitor, node: ast.AugStore) -> None:
         self.generic_visit(node)
     
-    def visit_Await(self: Visitor, node: ast.Await) -> None:
-        self.generic_visit(node)
-    
-    def visit_BinOp(self: Visitor, node: ast.BinOp) -> None:
-        self.generic_visit(node)
-    
     def visit_BitAnd(self: Visitor, node: ast.BitAnd) -> None:
         self.generic_visit(node)
     
@@ -120,24 +107,15 @@ class ModuleVisitor(NodeVisitor):
     def visit_BitXor(self: Visitor, node: ast.BitXor) -> None:
         self.generic_visit(node)
     
-    def visit_BoolOp(self: Visitor, node: ast.BoolOp) -> None:
-        self.generic_visit(node)
-    
     def visit_Break(self: Visitor, node: ast.Break) -> None:
         self.generic_visit(node)
     
     def visit_Bytes(self: Visitor, node: ast.Bytes) -> None:
         self.generic_visit(node)
     
-    def visit_Call(self: Visitor, node: ast.Call) -> None:
-        self.generic_visit(node)
-    
     def visit_ClassDef(self: Visitor, node: ast.ClassDef) -> None:
         self.generic_visit(node)
     
-    def visit_Compare(self: Visitor, node: ast.Compare) -> None:
-        self.generic_visit(node)
-    
     def visit_ConstDecl(self: Visitor, node: AST) -> None:
         self.generic_visit(node)
     
@@ -153,9 +131,6 @@ class ModuleVisitor(NodeVisitor):
     def visit_Delete(self: Visitor, node: ast.Delete) -> None:
         self.generic_visit(node)
     
-    def visit_Dict(self: Visitor, node: ast.Dict) -> None:
-        self.generic_visit(node)
-    
     def visit_DictComp(self: Visitor, node: ast.DictComp) -> None:
         self.generic_visit(node)
     
@@ -171,9 +146,6 @@ class ModuleVisitor(NodeVisitor):
     def visit_ExceptHandler(self: Visitor, node: ast.ExceptHandler) -> None:
         self.generic_visit(node)
     
-    def visit_Expr(self: Visitor, node: ast.Expr) -> None:
-        self.generic_visit(node)
-    
     def visit_Expression(self: Visitor, node: ast.Expression) -> None:
         self.generic_visit(node)
     
@@ -183,15 +155,11 @@ class ModuleVisitor(NodeVisitor):
     def visit_FloorDiv(self: Visitor, node: ast.FloorDiv) -> None:
         self.generic_visit(node)
     
-    def visit_For(self: Visitor, node: ast.For) -> None:
-        self.generic_visit(node)
-    
     def visit_FormattedValue(self: Visitor, node: ast.FormattedValue) -> None:
         self.generic_visit(node)
     
     def visit_FunctionDef(self: Visitor, node: ast.FunctionDef) -> None:
-        self.generic_visit(node.args)
-        for stat in node.body:
+        for stat in node.converted_body():
             self.generic_visit(stat)
     
     def visit_GeneratorExp(self: Visitor, node: ast.GeneratorExp) -> None:
@@ -206,12 +174,6 @@ class ModuleVisitor(NodeVisitor):
     def visit_GtE(self: Visitor, node: ast.GtE) -> None:
         self.generic_visit(node)
     
-    def visit_If(self: Visitor, node: ast.If) -> None:
-        self.generic_visit(node)
-    
-    def visit_IfExp(self: Visitor, node: ast.IfExp) -> None:
-        self.generic_visit(node)
-    
     def visit_Import(self: Visitor, node: ast.Import) -> None:
         self.generic_visit(node)
     
@@ -221,9 +183,6 @@ class ModuleVisitor(NodeVisitor):
     def visit_In(self: Visitor, node: ast.In) -> None:
         self.generic_visit(node)
     
-    def visit_Index(self: Visitor, node: ast.Index) -> None:
-        self.generic_visit(node)
-    
     def visit_Interactive(self: Visitor, node: ast.Interactive) -> None:
         self.generic_visit(node)
     
@@ -245,9 +204,6 @@ class ModuleVisitor(NodeVisitor):
     def visit_Lambda(self: Visitor, node: ast.Lambda) -> None:
         self.generic_visit(node)
     
-    def visit_List(self: Visitor, node: ast.List) -> None:
-        self.generic_visit(node)
-    
     def visit_ListComp(self: Visitor, node: ast.ListComp) -> None:
         self.generic_visit(node)
     
@@ -318,21 +274,12 @@ class ModuleVisitor(NodeVisitor):
     def visit_Raise(self: Visitor, node: ast.Raise) -> None:
         self.generic_visit(node)
     
-    def visit_Return(self: Visitor, node: ast.Return) -> None:
-        self.generic_visit(node)
-    
-    def visit_Set(self: Visitor, node: ast.Set) -> None:
-        self.generic_visit(node)
-    
     def visit_SetComp(self: Visitor, node: ast.SetComp) -> None:
         self.generic_visit(node)
     
     def visit_Slice(self: Visitor, node: ast.Slice) -> None:
         self.generic_visit(node)
     
-    def visit_Starred(self: Visitor, node: ast.Starred) -> None:
-        self.generic_visit(node)
-    
     def visit_Store(self: Visitor, node: ast.Store) -> None:
         self.generic_visit(node)
     
@@ -342,18 +289,9 @@ class ModuleVisitor(NodeVisitor):
     def visit_Sub(self: Visitor, node: ast.Sub) -> None:
         self.generic_visit(node)
     
-    def visit_Subscript(self: Visitor, node: ast.Subscript) -> None:
-        self.generic_visit(node)
-    
     def visit_Suite(self: Visitor, node: ast.Suite) -> None:
         self.generic_visit(node)
     
-    def visit_Try(self: Visitor, node: ast.Try) -> None:
-        self.generic_visit(node)
-    
-    def visit_Tuple(self: Visitor, node: ast.Tuple) -> None:
-        self.generic_visit(node)
-    
     def visit_TypeDef(self: Visitor, node: AST) -> None:
         self.generic_visit(node)
     
@@ -363,18 +301,9 @@ class ModuleVisitor(NodeVisitor):
     def visit_USub(self: Visitor, node: ast.USub) -> None:
         self.generic_visit(node)
     
-    def visit_UnaryOp(self: Visitor, node: ast.UnaryOp) -> None:
-        self.generic_visit(node)
-    
     def visit_VarDecl(self: Visitor, node: AST) -> None:
         self.generic_visit(node)
     
-    def visit_While(self: Visitor, node: ast.While) -> None:
-        self.generic_visit(node)
-    
-    def visit_With(self: Visitor, node: ast.With) -> None:
-        self.generic_visit(node)
-    
     def visit_Yield(self: Visitor, node: ast.Yield) -> None:
         self.generic_visit(node)
     
@@ -4,9 +4,11 @@ namespace during each step of the type checking process as it browses through
 the code.
 """
 
-from collections import UserDict
+from collections.abc import KeysView, ItemsView, ValuesView
+import itertools
 import logging
-from typing import Dict, List, Tuple, Set, Union as UnionType, Any as AnyType
+import weakref
+from typing import Dict, List, Tuple, Set, Optional, Union as UnionType, Any as AnyType
 
 from .exceptions import NoSuchName
 debug = logging.debug
@@ -14,23 +16,297 @@ warn = logging.warn
 from .util1 import issub, _get_type_from_ns, _same_type
 from . import config
 
+# every change of a scope gets a new epoch, the cached lookups of the scope are keyed on it.
+_EPOCHS = itertools.count()
+
+LOOKUP_STATS: Dict[str, int] = {'hits': 0, 'misses': 0}
+
+# the default of pop, None may be the popped value.
+_MISSING = object()
+
+def getLookupStats() -> Dict[str, int]:
+    return dict(LOOKUP_STATS)
+
 # Symbol table for the module.
-class Namespace(UserDict):
+class Namespace(dict):
     """A namespace is a mapping of names to types"""
 
     def __init__(self: 'Namespace', name: str, parent: 'Namespace') -> None:
         super().__init__()
         self.name = name
+        # the names of the namespace are stored in the namespace itself,
+        # the module namespace of a lazily checked module stores them in the module table.
+        self.data = self
+        # tables looked up after the namespace's own names, the module tables of
+        # the star imports and the shared names of copy-on-write scopes.
+        self.fallbacks = []
+        # the namespaces whose names are shared by the copy-on-write scope.
+        self.sources = []
+        # the epoch changes when the namespace or a namespace it reads gets or loses a name.
+        # A stale namespace takes a new epoch when it's read, the writes mark the scopes
+        # reading the namespace stale, which stops at the scopes already marked.
+        self.epoch = next(_EPOCHS)
+        self._stale = False
+        # the readers of the namespace are all stale since the last write.
+        self._notified = False
+        # id of the reader -> weak reference, the namespaces aren't hashable.
+        self._readers = {}
+        # name -> (depth of the defining scope in the scope chain or -1, epoch of the namespace).
+        self.lookup_cache = {}
+        self._scopes = None
+        self._scopes_epoch = -1
+        self._parent = None
         self.parent = parent
 
+    @property
+    def parent(self: 'Namespace') -> 'Namespace':
+        return self._parent
+
+    @parent.setter
+    def parent(self: 'Namespace', parent: 'Namespace') -> None:
+        self._parent = parent
+        self._read(parent)
+        self._changed()
+
+    # register the namespace as a reader of the names of the other namespace.
+    def _read(self: 'Namespace', other: Optional['Namespace']) -> None:
+        if other is None:
+            return
+        readers = other._readers
+        key = id(self)
+        readers[key] = weakref.ref(self, lambda _ref: readers.pop(key, None))
+        if other._stale:
+            self._stale = True
+        else:
+            other._notified = False
+
+    # the namespaces whose names are read after the names of the namespace.
+    def _upstream(self: 'Namespace') -> List['Namespace']:
+        upstream = [self.sources[-1]] if self.sources else []
+        if self._parent is not None:
+            upstream.append(self._parent)
+        return upstream
+
+    # a new epoch for the namespace, the readers are marked stale.
+    def _changed(self: 'Namespace') -> None:
+        self.epoch = next(_EPOCHS)
+        if self._notified:
+            return
+        todo = list(self._readers.values())
+        while todo:
+            reader = todo.pop()()
+            if reader is not None \
+                and not reader._stale:
+                reader._stale = True
+                todo.extend(reader._readers.values())
+        self._notified = True
+
+    # give the stale namespace and its stale upstream namespaces new epochs.
+    def _refresh(self: 'Namespace') -> None:
+        todo = [self]
+        while todo:
+            namespace = todo.pop()
+            if not namespace._stale:
+                continue
+            namespace._stale = False
+            namespace.epoch = next(_EPOCHS)
+            for other in namespace._upstream():
+                other._notified = False
+                todo.append(other)
+
+    # return the scope chain of the namespace, the namespace first. The index of a scope is its depth.
+    def scopes(self: 'Namespace') -> Tuple['Namespace', ...]:
+        if self._stale:
+            self._refresh()
+        if self._scopes_epoch != self.epoch:
+            scopes = []
+            namespace = self
+            while namespace is not None:
+                scopes.append(namespace)
+                namespace = namespace._parent
+            self._scopes = tuple(scopes)
+            self._scopes_epoch = self.epoch
+        return self._scopes
+
+    # return the epoch of the namespace, it changes whenever the names the namespace reads do.
+    def stamp(self: 'Namespace') -> int:
+        if self._stale:
+            self._refresh()
+        return self.epoch
+
+    # only new names change the scope chains, updating a name keeps the cached lookups.
+    def __setitem__(self: 'Namespace', name: str, value: AnyType) -> None:
+        if dict.__contains__(self.data, name):
+            dict.__setitem__(self.data, name, value)
+        else:
+            dict.__setitem__(self.data, name, value)
+            self._changed()
+
+    # a shared name is deleted from the materialized copy of the scope.
+    def __delitem__(self: 'Namespace', name: str) -> None:
+        if not dict.__contains__(self.data, name) \
+            and name in self:
+            self.materialize()
+        dict.__delitem__(self.data, name)
+        self._changed()
+
+    # add the table looked up after the names of the namespace.
+    def add_fallback(self: 'Namespace', table: AnyType) -> None:
+        self.fallbacks.append(table)
+        self._changed()
+
+    # copy the names of the fallback tables into the namespace.
+    def materialize(self: 'Namespace') -> None:
+        for name in list(self):
+            if not dict.__contains__(self.data, name):
+                dict.__setitem__(self.data, name, self[name])
+        self.fallbacks = []
+        self.sources = []
+        self._changed()
+
+    # return the namespace that defines the name, searching this namespace and its parents.
+    # The names of the namespace are checked first, the function scopes are copied per call
+    # and the lookups in the enclosing scopes are cached by them.
+    def lookup(self: 'Namespace', name: str) -> Optional['Namespace']:
+        if name in self:
+            return self
+        if self._parent is None:
+            return None
+        return self._parent.cached_lookup(name)
+
+    # return the namespace that defines the name, the depth of the defining scope is cached
+    # with the epoch of the namespace, the cached lookup is used while the epoch is the same.
+    def cached_lookup(self: 'Namespace', name: str) -> Optional['Namespace']:
+        if self._stale:
+            self._refresh()
+        entry = self.lookup_cache.get(name)
+        if entry is not None \
+            and entry[1] == self.epoch:
+            LOOKUP_STATS['hits'] += 1
+            return self.scopes()[entry[0]] if entry[0] >= 0 else None
+        LOOKUP_STATS['misses'] += 1
+        epoch = self.epoch
+        scopes = self.scopes()
+        depth = -1
+        for index, scope in enumerate(scopes):
+            if name in scope:
+                depth = index
+                break
+        # a lazy module may check its definitions during the search, don't cache it then.
+        if not self._stale \
+            and self.epoch == epoch:
+            self.lookup_cache[name] = (depth, epoch)
+        return scopes[depth] if depth >= 0 else None
+
+    def __getitem__(self: 'Namespace', name: str) -> AnyType:
+        if self.data is self:
+            return dict.__getitem__(self, name)
+        if name in self.data:
+            return self.data[name]
+        return self.__missing__(name)
+
+    # the names defined in the namespace shadow the fallback names, the later tables shadow the earlier.
+    def __missing__(self: 'Namespace', name: str) -> AnyType:
+        for table in reversed(self.fallbacks):
+            if name in table:
+                return table[name]
+        raise KeyError(name)
+
+    def __contains__(self: 'Namespace', name: str) -> bool:
+        if dict.__contains__(self, name) if self.data is self else name in self.data:
+            return True
+        for table in self.fallbacks:
+            if name in table:
+                return True
+        return False
+
+    def __iter__(self: 'Namespace') -> AnyType:
+        names = list(dict.__iter__(self) if self.data is self else self.data)
+        yield from names
+        if self.fallbacks:
+            seen = set(names)
+            for table in reversed(self.fallbacks):
+                for name in table:
+                    if name not in seen:
+                        seen.add(name)
+                        yield name
+
+    def __len__(self: 'Namespace') -> int:
+        if not self.fallbacks:
+            return dict.__len__(self) if self.data is self else len(self.data)
+        return sum(1 for _ in self)
+
+    # the mapping methods see the fallback names like the lookups.
+    def get(self: 'Namespace', name: str, default: AnyType = None) -> AnyType:
+        return self[name] if name in self else default
+
+    def keys(self: 'Namespace') -> KeysView:
+        return KeysView(self)
+
+    def values(self: 'Namespace') -> ValuesView:
+        return ValuesView(self)
+
+    def items(self: 'Namespace') -> ItemsView:
+        return ItemsView(self)
+
+    def update(self: 'Namespace', *args: AnyType, **kwargs: AnyType) -> None:
+        for name, value in dict(*args, **kwargs).items():
+            self[name] = value
+
+    def setdefault(self: 'Namespace', name: str, default: AnyType = None) -> AnyType:
+        if name not in self:
+            self[name] = default
+        return self[name]
+
+    def pop(self: 'Namespace', name: str, default: AnyType = _MISSING) -> AnyType:
+        if name not in self:
+            if default is _MISSING:
+                raise KeyError(name)
+            return default
+        value = self[name]
+        del self[name]
+        return value
+
+    def __eq__(self: 'Namespace', other: AnyType) -> bool:
+        if other is self:
+            return True
+        if isinstance(other, dict):
+            return dict(self.items()) == dict(other.items())
+        return NotImplemented
+
+    def __ne__(self: 'Namespace', other: AnyType) -> bool:
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    __hash__ = None
+
+    def copy(self: 'Namespace') -> 'Namespace':
+        ns = Namespace(self.name, self.parent)
+        dict.update(ns, dict.items(self) if self.data is self else self.data.copy().items())
+        ns.fallbacks = list(self.fallbacks)
+        ns.sources = list(self.sources)
+        ns._read(ns.sources[-1] if ns.sources else None)
+        return ns
+
+    # return a copy that shares the names of the namespace and keeps its own writes.
+    # The names added to the namespace later are visible in the copy.
+    def copy_on_write(self: 'Namespace') -> 'Namespace':
+        ns = Namespace(self.name, self.parent)
+        ns.fallbacks = self.fallbacks + [self.data]
+        # the new names of the namespace drop the cached lookups of the copy.
+        ns.sources = self.sources + [self]
+        ns._read(self)
+        return ns
+
     def __repr__(self: 'Namespace') -> str:
         '''
         Don't print global namespace
         :return 'global namespace' instead.
         '''
         #return '{}({!r},{!r})'.format(self.name, self.data, self.parent)
+        data = dict.__repr__(self) if self.data is self else repr(self.data)
         return 'global namespace' if self.name is 'global' or self.parent == None else\
-                '{}({!r},{!r})'.format(self.name, self.data, self.parent)
+                '{}({},{!r})'.format(self.name, data, self.parent)
     
     # return the string fromat of the namespace.
     def fqn(self: 'Namespace') -> str:
@@ -45,6 +321,84 @@ class Namespace(UserDict):
         while namespace is not None:
             yield namespace
             namespace = namespace.parent
+# Module table view shared by the importers, the module table isn't copied on import.
+# Writes are stored in the view and shadow the module names.
+class ModuleView(dict):
+    def __init__(self: 'ModuleView', table: AnyType) -> None:
+        super().__init__()
+        self.table = table
+
+    def __getitem__(self: 'ModuleView', name: str) -> AnyType:
+        if dict.__contains__(self, name):
+            return dict.__getitem__(self, name)
+        return self.table[name]
+
+    def __contains__(self: 'ModuleView', name: str) -> bool:
+        return dict.__contains__(self, name) or name in self.table
+
+    def get(self: 'ModuleView', name: str, default: AnyType = None) -> AnyType:
+        return self[name] if name in self else default
+
+    # deleting a module name materializes the view.
+    def __delitem__(self: 'ModuleView', name: str) -> None:
+        if not dict.__contains__(self, name) \
+            and name in self.table:
+            self.materialize()
+        dict.__delitem__(self, name)
+
+    def pop(self: 'ModuleView', name: str, *default: AnyType) -> AnyType:
+        if not dict.__contains__(self, name) \
+            and name in self.table:
+            self.materialize()
+        return dict.pop(self, name, *default)
+
+    # copy the module names into the view and detach it from the module table.
+    def materialize(self: 'ModuleView') -> None:
+        data = {name: self.table[name] for name in self.table}
+        data.update(dict.items(self))
+        dict.update(self, data)
+        self.table = {}
+
+    def __iter__(self: 'ModuleView') -> AnyType:
+        yield from dict.__iter__(self)
+        for name in self.table:
+            if not dict.__contains__(self, name):
+                yield name
+
+    def __len__(self: 'ModuleView') -> int:
+        return sum(1 for _ in self)
+
+    # the module attributes always exist, don't count the table for truth testing.
+    def __bool__(self: 'ModuleView') -> bool:
+        return True
+
+    def keys(self: 'ModuleView') -> List[str]:
+        return list(self)
+
+    def values(self: 'ModuleView') -> List:
+        return [self[name] for name in self]
+
+    def items(self: 'ModuleView') -> List[Tuple]:
+        return [(name, self[name]) for name in self]
+
+    def copy(self: 'ModuleView') -> Dict:
+        return dict(self.items())
+
+    def __eq__(self: 'ModuleView', other: AnyType) -> bool:
+        if isinstance(other, ModuleView) \
+            and other.table is self.table:
+            return dict.__eq__(self, other)
+        if isinstance(other, dict):
+            return self.copy() == other
+        return NotImplemented
+
+    def __ne__(self: 'ModuleView', other: AnyType) -> bool:
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    def __repr__(self: 'ModuleView') -> str:
+        return 'ModuleView({!r})'.format(self.table)
+
 # When we check one object is an instance or type,
 # we can use isinstance(obj, type). False if obj is an instance,
 # True if obj is a type object.
@@ -100,6 +454,14 @@ def _is_null_value(value):
 
     return False
 
+# dotted names split into their parts, the same names are looked up many times.
+DOTTED_NAMES: Dict[str, List[str]] = {}
+
+def _split_name(name: str) -> List[str]:
+    if name not in DOTTED_NAMES:
+        DOTTED_NAMES[name] = name.split(".")
+    return DOTTED_NAMES[name]
+
 def _recursive_find(names, mod):
     idx = 0
     while idx < len(names):
@@ -131,16 +493,15 @@ class TypeMap:
         if not isinstance(name, str):
             name = repr(name)
         if "." in name:
-            names = name.split(".")
+            names = _split_name(name)
             mod = self.current_namespace
             result = _recursive_find(names, mod)
             if result is not False:
                 return result
 
-        for super_namespace in self.current_namespace.iter_super_namespaces():
-            if name in super_namespace:
-                logging.info("%s found in %s namespace", name, super_namespace.name)
-                return super_namespace[name]
+        owner = self.current_namespace.lookup(name)
+        if owner is not None:
+            return owner[name]
         
         # Ignore the name error reporting.
         ## Check the module exists in the cache.   
@@ -175,7 +536,7 @@ class TypeMap:
     def enter_function_scope(self: 'TypeMap', context: Namespace, initial_mapping: Dict = None) -> None:
         self.stack.append(self.current_namespace)
 
-        function_namespace = context.copy()
+        function_namespace = context.copy_on_write()
         if initial_mapping is not None:
             function_namespace.update(initial_mapping)
         self.current_namespace = function_namespace
@@ -186,6 +547,7 @@ class TypeMap:
     # add variable to current namespace including types and optional probability.
     def add_variable(self: 'TypeMap', name: str, object_: AnyType, *probs: List) -> None:
         from .builtins.data_types import UnDefined, Any
+        from .types import Union as UnionType
         _type = Any()
         # Judge name exists in the namespace instead of current namespace. Or there may be exists many identifiers.
         if name in self.current_namespace:
@@ -194,7 +556,9 @@ class TypeMap:
         if not isinstance(_type, (UnDefined, Any)) \
             and _type is not None:
             _obj = _get_type_from_ns(object_)
-            if isinstance(_obj, (UnDefined, Any)):
+            # the empty type of a recursive call whose summary isn't computed yet keeps the name's type.
+            if isinstance(_obj, (UnDefined, Any)) \
+                or isinstance(_obj, UnionType) and not _obj.elts:
                 return _type
             if not is_type_of(_type, object_):
                 id_type = _get_type_repr(_type)
@@ -279,15 +643,27 @@ class TypeMap:
             self.current_namespace[temp] = import_map.data
 
     def add_module(self: 'TypeMap', mod_name: str, ns: Dict) -> Dict:
-        data = {}
         if ns is None:
             return None
         from .builtins.data_types import Any
         if isinstance(ns, Any):
             return {}
-        for key in ns.keys():
-            data[key] = ns[key]
+        data = ModuleView(ns)
         self.current_namespace[mod_name] = data
+        return data
+
+    # add the names of the star import. The names already defined are checked and overridden,
+    # other names are looked up in the module table.
+    def add_star_import(self: 'TypeMap', ns: Dict) -> None:
+        namespace = self.current_namespace
+        namespace.add_fallback(ns)
+        for key in list(namespace.data):
+            if key in ns:
+                value = ns[key]
+                if isinstance(value, list) \
+                    and len(value) == 2:
+                    value = value[0]
+                self.add_variable(key, value, 1.0)
     
     # check if the identifier exists in the namespace.
     def in_global(self: 'TypeMap', name: str, value: AnyType) -> bool:
@@ -299,9 +675,9 @@ class TypeMap:
     
     # check the identifier exists in the namespace and return the type of the namespace.
     def in_typemap(self: 'TypeMap', name: str) -> Tuple:
-        for super_namespace in self.current_namespace.iter_super_namespaces():
-            if name in super_namespace:
-                return True, super_namespace[name] 
+        owner = self.current_namespace.lookup(name)
+        if owner is not None:
+            return True, owner[name]
         return False, None
 
 # return a simple representation of the complex types.
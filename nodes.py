@@ -1,20 +1,21 @@
 """
 Our own implementation of an abstract syntax tree (AST).
 
-The convert function recursively converts a Python AST (from the module `ast`)
-to our own AST (of the class `Node`).
+The convert function converts a Python AST (from the module `ast`)
+to our own AST (of the class `Node`), the nested expressions from the innermost one.
 """
 
 import ast
 import logging
 import os
 import sys
-from typing import Dict, List, Set, Any as AnyType, Tuple, Union as UnionType
+from typing import Dict, List, Set, Any as AnyType, Tuple, Union as UnionType, Generator
 
 from .builtins import data_types
 
 from .exceptions import (NotYetSupported, NoSuchAttribute, NotIterable, NoSuchName)
 from . import types
+from . import budget
 from .types import Union, BaseType, _get_type
 from .result import writeTypes
 import __main__
@@ -22,6 +23,9 @@ import re
 from .util1 import (getName, gettype, convertType, issub, mergeTypes, getModuleName, _get_type_from_ns)
 from .util import (anno_type, binop_check, function_check)
 from .config import (setCurNode, setTypeProb, getCurNode, getDebug)
+from .search_path import getSearchPath
+from .insuline import UNARYOP_TRANSLATION
+from . import insuline
 
 AST = ast.AST
 
@@ -71,10 +75,19 @@ tempArgs: List = []
 sub_arg_names: List = []
 
 # Node is the base class of our ast nodes with common interface and fields.
-class Node:
+# The common fields are slots, the field names are shared by the nodes of a class,
+# and the nodes keep the converted children instead of the ast nodes.
+# The marks the parent nodes set on any statement or expression are slots too, such as
+# _class_ on the statements of a class body and _not on the operand of not.
+# The frequent node classes list their fields in slots, the other ones keep them in a dict.
+class Node(types.Checkable):
+    __slots__ = ('lineno', 'start', 'prob_type', 'prob', '_orelse', '_class_', '_class', '_not')
+    _fields: Tuple = ()
+    _ast_fields: Tuple = ()
+
     def __init__(self: 'Node', type_map: Dict, ast_node: AST) -> None:
         self.type_map = type_map
-        self._ast_fields = ast_node._fields
+        _set_fields(self, ast_node._fields)
         self.lineno = ast_node.lineno if hasattr(ast_node, 'lineno') \
             else -1
         self.start = ast_node.start if hasattr(ast_node, 'start') \
@@ -83,7 +96,6 @@ class Node:
             else data_types.Any()
         self.prob = ast_node.prob if hasattr(ast_node, 'prob') \
             else 0.5
-        self._fields = ast_node._fields
 
         # cache the checked result for subclass nodes.
         self._ckd_result = None
@@ -108,6 +120,96 @@ class Node:
                     if isinstance(item, Node):
                         yield item
 
+# set the field names of the node class from the first ast node converted to it.
+# The classes listing their checked fields keep them.
+def _set_fields(node: Node, fields: Tuple) -> None:
+    cls = node.__class__
+    if '_fields' not in cls.__dict__:
+        cls._fields = fields
+        if '_ast_fields' not in cls.__dict__:
+            cls._ast_fields = fields
+    elif cls._fields != fields:
+        node._fields = fields
+        if cls._ast_fields == cls._fields:
+            node._ast_fields = fields
+
+# the context and operator ast nodes carry no data, one object per class is kept for all the nodes.
+AST_SINGLETONS: Dict = {}
+
+def _singleton(value: AST) -> AST:
+    return AST_SINGLETONS.setdefault(value.__class__, value)
+
+# clear the cached results of the node and its children, the node is checked as a new one.
+def _uncached(node: Node) -> Node:
+    todo = [node]
+    while todo:
+        child = todo.pop()
+        child._ckd_result = None
+        todo.extend(child.iter_child_nodes())
+    return node
+
+# the nodes checked by the worklist driver. Their check steps yield the operand nodes instead of
+# calling check on them, so the nested expressions don't nest the interpreter frames.
+class StepNode(Node):
+    __slots__ = ()
+
+    def check(self: 'StepNode') -> BaseType:
+        # For Performance, we cache the node's return result. 
+        # If the checked result self._ckd_result is not None, then we return it directly.
+        if self._ckd_result is not None:
+            return self._ckd_result
+        return evaluate(self)
+
+    # the check of the node as a generator, the yielded node is checked and its result is sent back.
+    def steps(self: 'StepNode') -> Generator:
+        raise NotYetSupported('check steps of', self)
+
+CHECK_STATS: AnyType = {'evaluations': 0, 'max_depth': 0}
+
+def getCheckStats() -> AnyType:
+    return dict(CHECK_STATS)
+
+# check the node with an explicit stack of the check steps, the depth is bounded by the heap
+# instead of the interpreter stack. An exception of a step is raised in the step that yielded it.
+# The nodes beyond the work budgets degrade to Any.
+def evaluate(node: StepNode) -> BaseType:
+    CHECK_STATS['evaluations'] += 1
+    if budget.ACTIVE and budget.exceeded():
+        return data_types.Any()
+    stack = [node.steps()]
+    value, error = None, None
+    while True:
+        try:
+            if error is None:
+                child = stack[-1].send(value)
+            else:
+                child = stack[-1].throw(error)
+        except StopIteration as stop:
+            stack.pop()
+            if not stack:
+                return stop.value
+            value, error = stop.value, None
+            continue
+        except Exception as exc:
+            stack.pop()
+            if not stack:
+                raise
+            value, error = None, exc
+            continue
+        if isinstance(child, StepNode) and child._ckd_result is None:
+            if budget.ACTIVE and budget.exceeded():
+                value, error = data_types.Any(), None
+                continue
+            stack.append(child.steps())
+            if len(stack) > CHECK_STATS['max_depth']:
+                CHECK_STATS['max_depth'] = len(stack)
+            value, error = None, None
+            continue
+        try:
+            value, error = child.check(), None
+        except Exception as exc:
+            value, error = None, exc
+
 # self-defined module node.
 class Module(Node, types.BaseType):
     def __init__(self: 'Module', type_map: Dict, ast_node: AST):
@@ -150,7 +252,14 @@ class Module(Node, types.BaseType):
             types.BaseType.get_attribute(self, name)
 
 # check function definition including variaous arguments.
+# The body is converted on its first use, a function that is never checked isn't converted.
 class FunctionDef(Node):
+    __slots__ = ('defaults', 'ptargs', 'kwoargs', 'kwarg', 'kw_defaults', 'kwonlyargs', 'vararg',
+        'dec_list', 'name', 'location', 'col_offset', 'params', 'anno_args', 'return_anno_type',
+        'return_type', 'return_flag', 'stmts_return_flag', 'lastReturn', '_body', '_body_stmts',
+        '_body_state', '_body_defs', '_body_signature', '_classname')
+    _ast_fields = ('name', 'params', '_body')
+
     def __init__(self: 'FunctionDef', type_map: Dict, ast_node: AST) -> None:
         super().__init__(type_map, ast_node)
         from .return_visitor import ReturnVisitor, getReturnFlag,restoreReturnFlag, getBranch
@@ -158,7 +267,6 @@ class FunctionDef(Node):
         from .error_condition import _return_value_checking
         from .return_visitor import isLastReturn
         
-        self.args = ast_node.args
         self.defaults = None
         # function parameters:
         # default, positional, variable, keyword#
@@ -166,8 +274,10 @@ class FunctionDef(Node):
         if len(ast_node.args.defaults) > 0:
             self.defaults = [convert(type_map, default) \
                 for default in ast_node.args.defaults]
-        self.ptargs = ast_node.args.args
-        self.kwoargs = ast_node.args.kwonlyargs
+        self.ptargs = [convert(type_map, arg) \
+            for arg in ast_node.args.args]
+        self.kwoargs = [convert(type_map, kwarg) \
+            for kwarg in ast_node.args.kwonlyargs]
         self.kwarg = ast_node.args.kwarg.arg if ast_node.args.kwarg else None
         self.kw_defaults = [convert(type_map, default) \
             for default in ast_node.args.kw_defaults]
@@ -189,6 +299,7 @@ class FunctionDef(Node):
         
         self.name = ast_node.name
         self.location = config.getFileName()
+        self.col_offset = ast_node.col_offset
         self.params = [arg.arg \
             for arg in ast_node.args.args]
         return_anno_type = data_types.None_()
@@ -217,10 +328,11 @@ class FunctionDef(Node):
             visitor.visit(stmt)
             self.stmts_return_flag[idx] = getReturnFlag()
             restoreReturnFlag()
-        self.body = [convert(type_map, stmt) \
-            for stmt in ast_node.body]
+        self._body = None
+        self._body_stmts = ast_node.body
+        self._body_state = _conversion_state(type_map)
+        self._body_defs = _convert_definitions(type_map, ast_node.body)
         self.return_type = data_types.None_()
-        self.returns = ast_node.returns
         self.return_anno_type = return_anno_type
         if ast_node.returns is not None \
             and return_anno_type is data_types.None_ \
@@ -229,10 +341,22 @@ class FunctionDef(Node):
             self.return_type = convertAnnotation(return_anno_type, type_map)
             self.return_anno_type = self.return_type
             
-        self._ast_fields = ('name', 'params', 'body')
         function = types.Function(self, type_map)
         type_map.add_variable(self.name, function, 1.0)
 
+    # the body statements, converted on the first use in the state of the definition.
+    @property
+    def body(self: 'FunctionDef') -> List:
+        if self._body is None:
+            CONVERT_STATS['bodies'] += 1
+            self._body = _convert_body(self.type_map, self._body_stmts, self._body_state, self._body_defs)
+            self._body_stmts = self._body_state = self._body_defs = None
+        return self._body
+
+    # the converted body statements, the body isn't converted by the visitors.
+    def converted_body(self: 'FunctionDef') -> List:
+        return self._body or []
+
     def check(self: 'FunctionDef') -> BaseType:
         # For Performance, we cache the node's return result. 
         # If the checked result self._ckd_result is not None, then we return it directly.
@@ -258,13 +382,13 @@ class FunctionDef(Node):
                 annoArgsMap[arg.arg] = args[index]
                 if arg.annotation is not None \
                     and args[index] is data_types.Any:
-                    arg_type = convert(self.type_map, arg.annotation)
+                    arg_type = _uncached(arg.annotation)
                     args[index] = arg_type
                     index += 1
                     annoArgsMap[arg.arg] = convertAnnotation(arg_type, self.type_map)
             for kwarg in self.kwoargs:
                 if kwarg.annotation is not None:
-                    kwarg_type = convert(self.type_map, kwarg.annotation)
+                    kwarg_type = _uncached(kwarg.annotation)
                     annoArgsMap[kwarg.arg] = convertAnnotation(kwarg_type, self.type_map)
             self.anno_args = annoArgsMap
         rlts = self.type_map.in_typemap(self.name)
@@ -283,16 +407,18 @@ class FunctionDef(Node):
                 tmp_anno_args[key] = value
         for arg in self.ptargs:
             if arg.annotation is not None \
-                and isinstance(arg.annotation, ast.Subscript):
-                arg_type = convert(self.type_map, arg.annotation)
+                and isinstance(arg.annotation, Subscript):
+                arg_type = _uncached(arg.annotation)
                 tmp_anno_args[arg.arg] = convertAnnotation(arg_type, self.type_map)
         self.anno_args = tmp_anno_args
         function = types.Function(self, self.type_map)
         self.type_map.add_variable(self.name, function, 1.0)
         
+        # the annotated function is checked at its definition, unless only the called functions are checked.
         if self.anno_args \
             and len(self.anno_args) == len(self.params)\
-            and not 'self' in self.params:
+            and not 'self' in self.params \
+            and not config.getReachableOnly():
             for arg, arg_type in self.anno_args.items():
                 if isinstance(arg_type, types.Class):
                     arg_ins = arg_type.check_call([])
@@ -309,19 +435,21 @@ class FunctionDef(Node):
         return 'def ' + self.name + '()'
 # check async function definition same as function definition.
 class AsyncFunctionDef(Node):
+    _ast_fields = ('name', 'params', '_body')
+
     def __init__(self: 'AsyncFunctionDef', type_map: Dict, ast_node: AST) -> None:
         super().__init__(type_map, ast_node)
         from .return_visitor import ReturnVisitor, getReturnFlag,isLastReturn, restoreReturnFlag, getBranch 
         from . import error_cache, config
         from .error_condition import _return_value_checking
         
-        self.args = ast_node.args
         self.defaults = None
         if len(ast_node.args.defaults) > 0:
             self.defaults = [convert(type_map, default) \
                 for default in ast_node.args.defaults]
 
-        self.ptargs = ast_node.args.args
+        self.ptargs = [convert(type_map, arg) \
+            for arg in ast_node.args.args]
         self.kwarg = ast_node.args.kwarg.arg \
             if ast_node.args.kwarg else None
         self.kw_defaults = [convert(type_map, default) \
@@ -346,6 +474,7 @@ class AsyncFunctionDef(Node):
         #    to get ast_node.lineno, and then read the raw source file lineno - 1
         #    and lineno - 2.
         self.location = config.getFileName()
+        self.col_offset = ast_node.col_offset
         self.name = ast_node.name
         self.params = [arg.arg \
             for arg in ast_node.args.args]
@@ -390,20 +519,32 @@ class AsyncFunctionDef(Node):
             visitor.visit(stmt) 
             self.stmts_return_flag[idx] = getReturnFlag() 
             restoreReturnFlag()
-        self.body = [convert(type_map, stmt) \
-            for stmt in ast_node.body]
+        self._body = None
+        self._body_stmts = ast_node.body
+        self._body_state = _conversion_state(type_map)
+        self._body_defs = _convert_definitions(type_map, ast_node.body)
         self.return_type = data_types.Any()
-        self.returns = ast_node.returns
         self.return_anno_type = return_anno_type
         if ast_node.returns is not None \
             and return_anno_type is data_types.None_:
             return_anno_type = convert(type_map, ast_node.returns)
             self.return_type = convertAnnotation(return_anno_type, type_map)
             self.return_anno_type = self.return_type
-        self._ast_fields = ('name', 'params', 'body')
         # add async function definition before type checking.
         self.check()
 
+    # the body statements, converted on the first use like the body of a function definition.
+    @property
+    def body(self: 'AsyncFunctionDef') -> List:
+        if self._body is None:
+            CONVERT_STATS['bodies'] += 1
+            self._body = _convert_body(self.type_map, self._body_stmts, self._body_state, self._body_defs)
+            self._body_stmts = self._body_state = self._body_defs = None
+        return self._body
+
+    def converted_body(self: 'AsyncFunctionDef') -> List:
+        return self._body or []
+
     def check(self: 'AsyncFunctionDef') -> BaseType:
         # For Performance, we cache the node's return result. 
         # If the checked result self._ckd_result is not None, then we return it directly.
@@ -482,10 +623,8 @@ class ClassDef(Node):
             class_type = self.type_map.find(self.name)
             #class_type = _get_type_from_ns(class_type)
             class_type = _get_type_from_ns(class_type)
-            if not self.BASES:
-                from .util1 import _update_class_attributes_from_bases
-                _update_class_attributes_from_bases(class_type, self.bases, self.type_map)
-                self.BASES = True
+            # the inherited attributes are resolved through the MRO of the class.
+            self.BASES = True
 
             self._ckd_result = class_type
             return class_type
@@ -528,7 +667,7 @@ class BinOp(Node):
         if hasattr(ast_node, 'value'):
             self.value = convert(type_map, ast_node.value)
             self.attr = ast_node.attr
-            self.ctx = ast_node.ctx
+            self.ctx = _singleton(ast_node.ctx)
         self.left = convert(type_map, ast_node.left)
         self.left_name = getName(ast_node.left)
         if type(self.left_name) is not str:
@@ -537,7 +676,7 @@ class BinOp(Node):
         if type(self.right_name) is not str:
             self.right_name = str(self.right_name)
         self.right = convert(type_map, ast_node.right)
-        self.op = ast_node.op
+        self.op = _singleton(ast_node.op)
         self.op_name = self.op.__class__.__name__
 
     def check(self: 'BinOp') -> BaseType:
@@ -893,8 +1032,6 @@ class TryFinally(Node):
 class Raise(Node):
     def __init__(self: 'Raise', type_map: Dict, ast_node: AST) -> None:
         super().__init__(type_map, ast_node)
-        self.exc = ast_node.exc if ast_node.exc else data_types.NoneType
-        self.cause = ast_node.cause if ast_node.cause else data_types.NoneType
 
     def check(self: 'Raise') -> BaseType:
         setLineNo(self.lineno)
@@ -933,7 +1070,7 @@ class UnaryOp(Node):
         super().__init__(type_map, ast_node)
         
         self.operand = convert(type_map, ast_node.operand)
-        self.op = ast_node.op
+        self.op = _singleton(ast_node.op)
 
     def check(self: 'UnaryOp') -> BaseType:
         # For Performance, we cache the node's return result. 
@@ -986,10 +1123,10 @@ class Compare(Node):
     def __init__(self: 'Compare', type_map: Dict, ast_node: AST) -> None:
         super().__init__(type_map, ast_node)
         self.left = convert(type_map, ast_node.left)
-        self.comparators = [comp for comp in ast_node.comparators]
+        # the comparators are checked by the node, they aren't fields visited by the node visitors.
         self.comps = [convert(type_map, comp) \
-            for comp in self.comparators]
-        self.ops = ast_node.ops
+            for comp in ast_node.comparators]
+        self.ops = [_singleton(op) for op in ast_node.ops]
 
     def check(self: 'Compare') -> BaseType:
         # For Performance, we cache the node's return result. 
@@ -1305,7 +1442,6 @@ class YieldFrom(Node):
 class Lambda(Node):
     def __init__(self: 'Lambda', type_map: Dict, ast_node: AST) -> None:
         super().__init__(type_map, ast_node)
-        self.args = ast_node.args 
         self.defaults = None 
         # function parameters: 
         # default, positional, variable, keyword# 
@@ -1351,19 +1487,18 @@ class Lambda(Node):
         return "lambda"
 
 # check the index node, it's in the attribute node.
-class Index(Node):
+class Index(StepNode):
+    __slots__ = ('value', )
+
     def __init__(self: 'Index', type_map: Dict, ast_node: AST) -> None:
         super().__init__(type_map, ast_node)
         self.value = convert(type_map, ast_node.value)
 
-    def check(self: 'Index') -> BaseType:
-        # For Performance, we cache the node's return result. 
-        # If the checked result self._ckd_result is not None, then we return it directly.
-        if self._ckd_result is not None:
-            return self._ckd_result
+    # check the node, the operands are yielded to the worklist driver.
+    def steps(self: 'Index') -> Generator:
         
         setLineNo(self.lineno)
-        check_type = self.value.check()
+        check_type = yield self.value
         #check_type = _get_type_from_ns(check_type)
         check_type = _get_type_from_ns(check_type)
         if not isinstance(check_type, data_types.Any):
@@ -1446,19 +1581,18 @@ starred expression
 b = [1,2,3]
 a,*c = b
 '''
-class Starred(Node):
+class Starred(StepNode):
+    __slots__ = ('value', 'ctx')
+
     def __init__(self: 'Starred', type_map: Dict, ast_node: AST) -> None:
         super().__init__(type_map, ast_node)
         self.value = convert(type_map, ast_node.value)
-        self.ctx = ast_node.ctx
+        self.ctx = _singleton(ast_node.ctx)
 
-    def check(self: 'Starred') -> BaseType:
-        # For Performance, we cache the node's return result. 
-        # If the checked result self._ckd_result is not None, then we return it directly.
-        if self._ckd_result is not None:
-            return self._ckd_result
+    # check the node, the operands are yielded to the worklist driver.
+    def steps(self: 'Starred') -> Generator:
         
-        value = self.value.check()
+        value = yield self.value
         setLineNo(self.lineno)
         if hasattr(self.value, 'prob_type') \
             and not isinstance(self.value, data_types.Any):
@@ -1480,7 +1614,6 @@ a = b'assdf'
 class Bytes(Node):
     def __init__(self: 'Bytes', type_map: Dict, ast_node: AST) -> None:
         super().__init__(type_map, ast_node)
-        self.node = ast_node
 
     def check(self: 'Bytes') -> BaseType:
         setLineNo(self.lineno)
@@ -1496,7 +1629,6 @@ a = ...
 class Ellipsis(Node):
     def __init__(self: 'Ellipsis', type_map: Dict, ast_node: AST) -> None:
         super().__init__(type_map, ast_node)
-        self.node = ast_node
 
     def check(self: 'Ellipsis') -> BaseType:
         setLineNo(self.lineno)
@@ -1587,26 +1719,24 @@ def _get_value_type(v_type: BaseType) -> BaseType:
     return v_t
 
 # check the attribute, such as attribute reference. It's tedious to check, and it relates to attribute error checking.
-class Attribute(Node):
+class Attribute(StepNode):
+    __slots__ = ('value', 'attr', 'ctx', '_append')
+
     def __init__(self: 'Attribute', type_map: Dict, ast_node: AST) -> None:
         super().__init__(type_map, ast_node)
         self.value = convert(type_map, ast_node.value)
         self.attr = ast_node.attr
-        self.ctx = ast_node.ctx
+        self.ctx = _singleton(ast_node.ctx)
 
-    def check(self: 'Attribute') -> BaseType:
-        # For Performance, we cache the node's return result. 
-        # If the checked result self._ckd_result is not None, then we return it directly.
-        
-        if self._ckd_result is not None:
-            return self._ckd_result
+    # check the node, the operands are yielded to the worklist driver.
+    def steps(self: 'Attribute') -> Generator:
         
         from .config import getFileName, getLineNo, getBName
         if self.lineno == -1 and self.value.lineno > 0:
             self.lineno = self.value.lineno
         setCurNode(self.value)
         self.value._ckd_result = None
-        value_type = self.value.check()
+        value_type = yield self.value
         value_type = _get_type_from_ns(value_type)
         setLineNo(self.lineno)
         
@@ -1640,11 +1770,17 @@ class Attribute(Node):
                     and hasattr(v_type, 'elts') \
                     and hasattr(self, '_append'):
                     args = self._append
-                    
+                    # the unions are shared, a new union gets the appended types.
+                    if isinstance(v_type, types.Union):
+                        self._ckd_result = v_type.appended([_get_type_from_ns(arg) for arg in args])
+                        return self._ckd_result
                     for arg in args:
                         #arg = _get_type_from_ns(arg)
                         arg = _get_type_from_ns(arg)
                         v_type.elts.append(arg)
+                    # the appended elements are bounded like the literal ones.
+                    if isinstance(v_type, (types.List, types.Set)):
+                        v_type.elts, v_type.prob = types.boundElements(v_type.elts, v_type.prob)
                     self._ckd_result = v_type
                     return self._ckd_result
                 if isinstance(attr_type, data_types.Any)\
@@ -1704,10 +1840,12 @@ class Attribute(Node):
 
 # check the name node. we always get the identifier type by the name.
 class Name(Node):
+    __slots__ = ('id', 'ctx', 'func_call')
+
     def __init__(self: 'Name', type_map: Dict, ast_node: AST) -> None:
         super().__init__(type_map, ast_node)
         self.id = ast_node.id
-        self.ctx = ast_node.ctx
+        self.ctx = _singleton(ast_node.ctx)
 
     def check(self: 'Name') -> BaseType:
         # For Performance, we cache the node's return result. 
@@ -1761,6 +1899,8 @@ class Name(Node):
 
 # Check attribute exists object.
 def _has_attr(_obj: BaseType, _attr: str) -> bool:
+    if isinstance(_obj, types.Class):
+        return _obj.has_attribute(_attr)
     if hasattr(_obj, 'attributes') and _attr in _obj.attributes:
         return True
     return False
@@ -1947,7 +2087,9 @@ def _append_call(target, args):
     
 # call node checking including builtin function and function node call checking. 
 # It's tedious and we need to handle the recursion checking.
-class Call(Node):
+class Call(StepNode):
+    __slots__ = ('func', 'args', 'keywords')
+
     def __init__(self: 'Call', type_map: Dict, ast_node: AST) -> None:
         if hasattr(ast_node, "starargs") \
             and hasattr(ast_node, "kwargs"):
@@ -1961,11 +2103,8 @@ class Call(Node):
         self.args = [convert(type_map, expr) for expr in ast_node.args]
         self.keywords = [convert(type_map, kw) for kw in ast_node.keywords]
 
-    def check(self: 'Call') -> BaseType:
-        # For Performance, we cache the node's return result. 
-        # If the checked result self._ckd_result is not None, then we return it directly.
-        if self._ckd_result is not None:
-            return self._ckd_result
+    # check the node, the operands are yielded to the worklist driver.
+    def steps(self: 'Call') -> Generator:
         
         from .config import getFileName, getLineNo
         
@@ -1979,7 +2118,7 @@ class Call(Node):
                 self._ckd_result = True
                 return True
 
-        func = self.func.check()
+        func = yield self.func
         func = _get_type_from_ns(func)
         #from . import config
         # check the hasattr method.
@@ -2004,8 +2143,10 @@ class Call(Node):
         
         if self.lineno == -1 and self.func.lineno > 0:
             self.lineno = self.func.lineno
-        args = [[arg.check(), arg.prob \
-            if hasattr(arg, 'prob') else 0.5] for arg in self.args]
+        args = []
+        for arg in self.args:
+            arg_type = yield arg
+            args.append([arg_type, arg.prob if hasattr(arg, 'prob') else 0.5])
         for _arg in args:
             probs.append(_arg[1])
         tmp_arg = []
@@ -2038,7 +2179,9 @@ class Call(Node):
 
             tmp_arg.append(args[index])
         args = tmp_arg
-        keywords = [kw.check() for kw in self.keywords]
+        keywords = []
+        for kw in self.keywords:
+            keywords.append((yield kw))
         if keywords:
             for kw in keywords:
                 prob = kw.prob if hasattr(kw, 'prob') else 0.5
@@ -2131,18 +2274,17 @@ class Call(Node):
                '(' + ', '.join(repr(x) for x in self.args) + ')'
 
 # check the expression, we only check the value node.
-class Expr(Node):
+class Expr(StepNode):
+    __slots__ = ('value', )
+
     def __init__(self: 'Expr', type_map: Dict, ast_node: AST) -> None:
         super().__init__(type_map, ast_node)
         self.value = convert(type_map, ast_node.value)
-    def check(self: 'Expr') -> BaseType:
-        # For Performance, we cache the node's return result. 
-        # If the checked result self._ckd_result is not None, then we return it directly.
-        if self._ckd_result is not None:
-            return self._ckd_result
+    # check the node, the operands are yielded to the worklist driver.
+    def steps(self: 'Expr') -> Generator:
         
         setCurNode(self.value)
-        result = self.value.check()
+        result = yield self.value
         #result = _get_type_from_ns(result)
         result = _get_type_from_ns(result)
         setLineNo(self.lineno)
@@ -2161,6 +2303,8 @@ class Expr(Node):
 
 # check the return statement, and return the value field.
 class Return(Node):
+    __slots__ = ('value', )
+
     def __init__(self: 'Return', type_map: Dict, ast_node: AST) -> None:
         super().__init__(type_map, ast_node)
         self.value = convert(type_map, ast_node.value)
@@ -2185,12 +2329,13 @@ class Return(Node):
 
 # Annotation Assignment statement checking.
 class AnnAssign(Node):
+    _ast_fields = ('target', 'annotation', 'value')
+
     def __init__(self: 'AnnAssign', type_map: Dict, ast_node: AST) -> None:
         super().__init__(type_map, ast_node)
         self.target = convert(type_map, ast_node.target)
         self.annotation = convert(type_map, ast_node.annotation)
         self.value = convert(type_map, ast_node.value)
-        self._ast_fields = ('target', 'annotation', 'value')
 
     def check(self: 'AnnAssign') -> BaseType:
         # For Performance, we cache the node's return result. 
@@ -2220,6 +2365,9 @@ class AnnAssign(Node):
 
 # Check the assignment statement. For the instance field reference, we need to update the class attributes.
 class Assign(Node):
+    __slots__ = ('targets', 'value')
+    _ast_fields = ('target', 'value')
+
     def __init__(self: 'Assign', type_map: Dict, ast_node: AST) -> None:
         # TODO handle multiple targets
 
@@ -2227,7 +2375,8 @@ class Assign(Node):
         self.targets = [convert(type_map, target) \
             for target in ast_node.targets]
         self.value = convert(type_map, ast_node.value)
-        self._ast_fields = ('target', 'value')
+        if any(isinstance(target, (Tuple, List)) for target in self.targets):
+            _set_unpacked(self.value)
 
     def check(self: 'Assign') -> BaseType:
         # For Performance, we cache the node's return result. 
@@ -2274,6 +2423,8 @@ class Assign(Node):
 
 # check the AugAssigment statement, var += 1
 class AugAssign(Node):
+    _ast_fields = ('target', 'op', 'value')
+
     def __init__(self: 'AugAssign', type_map: Dict, ast_node: AST) -> None:
         # TODO handle multiple targets
 
@@ -2281,11 +2432,10 @@ class AugAssign(Node):
         
         self.target = convert(type_map, ast_node.target)
         self.value = convert(type_map, ast_node.value)
-        self.op = ast_node.op
+        self.op = _singleton(ast_node.op)
         self.op_name = ast_node.op.__class__.__name__
         if self.op_name == 'Mult':
             self.op_name = 'Mul'
-        self._ast_fields = ('target', 'op', 'value')
 
     def check(self: 'AugAssign') -> BaseType:
         # For Performance, we cache the node's return result. 
@@ -2342,18 +2492,17 @@ class Pass(Node):
         return 'pass'
 
 # check the not node, we return bool type directly.
-class Not(Node):
+class Not(StepNode):
+    __slots__ = ('value', )
+
     def __init__(self: 'Not', type_map: Dict, ast_node: AST) -> None:
         super().__init__(type_map, ast_node)
         self.value = convert(type_map, ast_node.value)
 
-    def check(self: 'Not') -> BaseType:
-        # For Performance, we cache the node's return result. 
-        # If the checked result self._ckd_result is not None, then we return it directly.
-        if self._ckd_result is not None:
-            return self._ckd_result
+    # check the node, the operand is yielded to the worklist driver.
+    def steps(self: 'Not') -> Generator:
         self.value._not = True
-        self.value.check()
+        yield self.value
 
         setLineNo(self.lineno)
         self._ckd_result = data_types.Bool()
@@ -2364,24 +2513,22 @@ class Not(Node):
         return 'not ' + repr(self.value)
 
 # we return bool type directly.
-class BoolOp(Node):
+class BoolOp(StepNode):
+    __slots__ = ('op', 'values_type')
+
     def __init__(self: 'BoolOp', type_map: Dict, ast_node: AST) -> None:
         super().__init__(type_map, ast_node)
-        self.op = ast_node.op
-        self.values = [value for value in ast_node.values]
+        self.op = _singleton(ast_node.op)
+        # the values are checked by the node, they aren't fields visited by the node visitors.
         self.values_type = [convert(type_map, value) \
             for value in ast_node.values]
 
-    def check(self: 'BoolOp') -> BaseType:
-        # For Performance, we cache the node's return result. 
-        # If the checked result self._ckd_result is not None, then we return it directly.
-        if self._ckd_result is not None:
-            return self._ckd_result
-        
+    # check the node, the values are yielded to the worklist driver.
+    def steps(self: 'BoolOp') -> Generator:
         # Here we should visit the self.values_type
         for value in self.values_type:
             if hasattr(value, 'check'):
-                value.check()
+                yield value
         setLineNo(self.lineno)
         # TODO return intersection van types?
         self._ckd_result = data_types.Bool()
@@ -2390,25 +2537,23 @@ class BoolOp(Node):
 
     def __repr__(self: 'BoolOp') -> str:
         op_name = ' {} '.format(self.op)
-        return '(' + op_name.join(repr(val) for val in self.values) + ')'
+        return '(' + op_name.join(repr(val) for val in self.values_type) + ')'
 
 # check the in node. we need to check the element and container.
-class In(Node):
+class In(StepNode):
+    __slots__ = ('element', 'container')
+
     def __init__(self: 'In', type_map: Dict, ast_node: AST) -> None:
         super().__init__(type_map, ast_node)
         self.element = convert(type_map, ast_node.element)
         self.container = convert(type_map, ast_node.container)
 
-    def check(self: 'In') -> BaseType:
-        # For Performance, we cache the node's return result. 
-        # If the checked result self._ckd_result is not None, then we return it directly.
-        if self._ckd_result is not None:
-            return self._ckd_result
-        
-        element = self.element.check()
+    # check the node, the operands are yielded to the worklist driver.
+    def steps(self: 'In') -> Generator:
+        element = yield self.element
         #element = _get_type_from_ns(element)
         element = _get_type_from_ns(element)
-        container = self.container.check()
+        container = yield self.container
         #container = _get_type_from_ns(container)
         container = _get_type_from_ns(container)
         setLineNo(self.lineno)
@@ -2434,6 +2579,10 @@ class For(Node):
         super().__init__(type_map, ast_node)
         self.target = convert(type_map, ast_node.target)
         self.iter = convert(type_map, ast_node.iter)
+        if isinstance(self.target, (Tuple, List)) \
+            and isinstance(self.iter, (Tuple, List)):
+            for el in self.iter.elts:
+                _set_unpacked(el)
         self.body = [convert(type_map, stmt) \
             for stmt in ast_node.body]
         self.orelse = [convert(type_map, clause) \
@@ -2497,6 +2646,10 @@ class AsyncFor(Node):
         super().__init__(type_map, ast_node) 
         self.target = convert(type_map, ast_node.target) 
         self.iter = convert(type_map, ast_node.iter) 
+        if isinstance(self.target, (Tuple, List)) \
+            and isinstance(self.iter, (Tuple, List)):
+            for el in self.iter.elts:
+                _set_unpacked(el)
         self.body = [convert(type_map, stmt) \
             for stmt in ast_node.body] 
         self.orelse = [convert(type_map, clause) \
@@ -2548,6 +2701,8 @@ class AsyncFor(Node):
 
 # check the if statement, and we need to check the body for some special condition.
 class If(Node):
+    __slots__ = ('test', 'body', 'orelse')
+
     def __init__(self: 'If', type_map: Dict, ast_node: AST) -> None:
         super().__init__(type_map, ast_node)
         self.test = convert(type_map, ast_node.test)
@@ -2667,6 +2822,8 @@ class IfExp(Node):
 
 # check constan node, and return the types directly.
 class NameConstant(Node):
+    __slots__ = ('value', )
+
     def __init__(self: 'NameConstant', type_map: Dict, ast_node: AST) -> None:
         super().__init__(type_map, ast_node)
         self.value = ast_node.value
@@ -2755,6 +2912,8 @@ class Continue(Node):
 
 # check the num node, and we return builtin type directly.
 class Num(Node):
+    __slots__ = ('n', 'number_type')
+
     def __init__(self: 'Num', type_map: Dict, ast_node: AST) -> None:
         super().__init__(type_map, ast_node)
         self.n = ast_node.n
@@ -2798,7 +2957,7 @@ class Import(Node):
         import sys
         from . import config
         for name in self.names:
-            mod = imports_handler.checkimport(name, sys.path)
+            mod = imports_handler.checkimport(name, getSearchPath())
             self._ckd_result = mod
             if name in self.asnames:
                 self.type_map.add_module(self.asnames[name], mod)
@@ -2872,23 +3031,12 @@ class ImportFrom(Node):
                 for pth in path:
                     filepath = os.path.sep.join([searchpath, pth])
 
-                    mod_type = imports_handler.checkimport(filepath, sys.path)
+                    mod_type = imports_handler.checkimport(filepath, getSearchPath())
                     
                     if not isinstance(mod_type, Any):
                         for name in self.names:
                             if name == '*':
-                                for key, value in mod_type.items():
-                                    proba = 1.0
-                                    if isinstance(value, list) \
-                                        and len(value) == 2:
-                                        proba = value[1]
-                                        value = value[0]
-                                    
-                                    from .config import setImportFrom, getImportFrom
-                                    tmpImp = getImportFrom()
-
-                                    self.type_map.add_variable(key, value, 1.0)
-                                    setImportFrom(tmpImp)
+                                self.type_map.add_star_import(mod_type)
                             else:
                                 proba = 1.0 if name in mod_type else 0.0
                                 value = mod_type[name] if name in mod_type else Any()
@@ -2901,7 +3049,7 @@ class ImportFrom(Node):
                     else:
                         for name in self.names:
                             filepath = os.path.sep.join([filepath, name])
-                            mod_type = imports_handler.checkimport(filepath, sys.path)
+                            mod_type = imports_handler.checkimport(filepath, getSearchPath())
                             #self._ckd_result = mod_type
                             if not isinstance(mod_type, Any):
                                 if name in self.asnames:
@@ -2915,7 +3063,7 @@ class ImportFrom(Node):
                 path = [searchpath.split(os.path.sep)[-1]]
                 for name in self.names:
                     filepath = os.path.sep.join([searchpath, name])
-                    mod_type = imports_handler.checkimport(filepath, sys.path)
+                    mod_type = imports_handler.checkimport(filepath, getSearchPath())
                     #self._ckd_result = mod_type
                     if not isinstance(mod_type, Any) \
                         and name in mod_type.keys():
@@ -2933,15 +3081,15 @@ class ImportFrom(Node):
                 self._ckd_result = data_types.Any()
                 return self._ckd_result
          
-        root_dir = get_path(path[0], path, sys.path)
+        root_dir = get_path(path[0], path, getSearchPath())
         search_path = path[0] if root_dir is False or root_dir == "" else os.path.sep.join([root_dir, path[0]])
-        #p_type = imports_handler.checkimport(path[0], sys.path)
-        p_type = imports_handler.checkimport(search_path, sys.path)
+        #p_type = imports_handler.checkimport(path[0], getSearchPath())
+        p_type = imports_handler.checkimport(search_path, getSearchPath())
 
         root_dir = os.path.sep.join([root_dir, path[0]])
         for pth in path[1:]:
             root_dir = os.path.sep.join([root_dir, pth])
-            next_type = imports_handler.checkimport(path[0], sys.path)
+            next_type = imports_handler.checkimport(path[0], getSearchPath())
             p_type = next_type
         
         mod = p_type
@@ -2967,27 +3115,24 @@ class ImportFrom(Node):
 class Assert(Node):
     def __init__(self: 'Assert', type_map: Dict, ast_node: AST) -> None:
         super().__init__(type_map, ast_node)
-        self.msg = ast_node.msg
-        self.test = ast_node.test
 
     def check(self: 'Assert') -> BaseType:
         setLineNo(self.lineno)
         return data_types.None_()
 
 # check the tuple statment, and return builtin tuple type instead.
-class Tuple(Node):
+class Tuple(StepNode):
+    __slots__ = ('elts', 'ctx', '_literal_sample')
+
     def __init__(self: 'Tuple', type_map: Dict, ast_node: AST) -> None:
         super().__init__(type_map, ast_node)
-        # check the elements of Tuple type.
+        # check the elements of Tuple type, a huge literal tuple is summarized by its sample.
         self.elts = [convert(type_map, el) \
-            for el in ast_node.elts]
-        self.ctx = ast_node.ctx
+            for el in _literal_elements(ast_node)]
+        self.ctx = _singleton(ast_node.ctx)
 
-    def check(self: 'Assert') -> BaseType:
-        # For Performance, we cache the node's return result. 
-        # If the checked result self._ckd_result is not None, then we return it directly.
-        if self._ckd_result is not None:
-            return self._ckd_result
+    # check the node, the operands are yielded to the worklist driver.
+    def steps(self: 'Tuple') -> Generator:
         
         setLineNo(self.lineno)
         # we change the Tuple __init__(type_map, elements)
@@ -2998,9 +3143,11 @@ class Tuple(Node):
         else:
             probs = []
         if isinstance(self.ctx, ast.Load):
-            el_types = [el.check() for el in self.elts]
+            el_types = []
+            for el in self.elts:
+                el_types.append((yield el))
             setLineNo(self.lineno)
-            
+            el_types, probs = types.boundElements(el_types, probs, True)
             self._ckd_result = types.Tuple(self.type_map, el_types, probs)
             return self._ckd_result
             #return types.Tuple(self.type_map, el_types, probs)
@@ -3016,25 +3163,27 @@ class Tuple(Node):
         return '(' + ', '.join(repr(el) for el in self.elts) + ')'
 
 # check the set statement, similar with list statement.
-class Set(Node):
+class Set(StepNode):
+    __slots__ = ('elts', '_literal_sample')
+
     def __init__(self: 'Set', type_map: Dict, ast_node: AST) -> None:
         super().__init__(type_map, ast_node)
         self.elts = [convert(type_map, el) \
-            for el in ast_node.elts]
+            for el in _literal_elements(ast_node)]
 
-    def check(self: 'Set') -> BaseType:
-        # For Performance, we cache the node's return result. 
-        # If the checked result self._ckd_result is not None, then we return it directly.
-        if self._ckd_result is not None:
-            return self._ckd_result
+    # check the node, the operands are yielded to the worklist driver.
+    def steps(self: 'Set') -> Generator:
         
         if self.elts: 
             probs = [el.prob if hasattr(el, 'prob') else 1 / len(self.elts) \
                 for el in self.elts] 
         else: 
             probs = []
-        el_types = [el.check() for el in self.elts]
+        el_types = []
+        for el in self.elts:
+            el_types.append((yield el))
         setLineNo(self.lineno)
+        el_types, probs = types.boundElements(el_types, probs)
         self._ckd_result = types.Set(self.type_map, el_types, probs)
         return self._ckd_result
         #return types.Set(self.type_map, el_types, probs)
@@ -3045,18 +3194,17 @@ class Set(Node):
         return '{' + ', '.join(repr(el) for el in self.elts) + '}'
 
 # check the list statement, similar with tuple.
-class List(Node):
+class List(StepNode):
+    __slots__ = ('elts', 'ctx', '_literal_sample', '_unpacked')
+
     def __init__(self: 'List', type_map: Dict, ast_node: AST) -> None:
         super().__init__(type_map, ast_node)
         self.elts = [convert(type_map, el) \
-            for el in ast_node.elts]
-        self.ctx = ast_node.ctx
+            for el in _literal_elements(ast_node)]
+        self.ctx = _singleton(ast_node.ctx)
 
-    def check(self: 'List') -> BaseType:
-        # For Performance, we cache the node's return result. 
-        # If the checked result self._ckd_result is not None, then we return it directly.
-        if self._ckd_result is not None:
-            return self._ckd_result
+    # check the node, the operands are yielded to the worklist driver.
+    def steps(self: 'List') -> Generator:
         
         setLineNo(self.lineno)
         if self.elts: 
@@ -3065,8 +3213,14 @@ class List(Node):
         else: 
             probs = []
         if isinstance(self.ctx, (ast.Load, ast.Store)):
-            el_types = [el.check() for el in self.elts]
+            el_types = []
+            for el in self.elts:
+                el_types.append((yield el))
             setLineNo(self.lineno)
+            # the element types of a stored list are the targets, they're unpacked by their positions.
+            # A list unpacked into the targets is bounded like a tuple.
+            if isinstance(self.ctx, ast.Load):
+                el_types, probs = types.boundElements(el_types, probs, hasattr(self, '_unpacked'))
             self._ckd_result = types.List(self.type_map, el_types, probs)
             return self._ckd_result
             #return types.List(self.type_map, el_types, probs)
@@ -3079,29 +3233,39 @@ class List(Node):
     def __repr__(self: 'List') -> str:
         return '[' + ', '.join(repr(el) for el in self.elts) + ']'
 
+# mark the list literal unpacked into targets, its element types are kept by their positions.
+def _set_unpacked(node: Node) -> None:
+    if isinstance(node, List):
+        node._unpacked = True
+
 # check the dict statement.
-class Dict(Node):
+class Dict(StepNode):
+    __slots__ = ('keys', 'values', '_literal_sample')
+
     def __init__(self: 'Dict', type_map: Dict, ast_node: AST) -> None:
         super().__init__(type_map, ast_node)
+        keys, values = _literal_items(ast_node)
         self.keys = [convert(type_map, k) \
-            for k in ast_node.keys]
+            for k in keys]
         self.values = [convert(type_map, v) \
-            for v in ast_node.values]
+            for v in values]
 
-    def check(self: 'Dict') -> BaseType:
-        # For Performance, we cache the node's return result. 
-        # If the checked result self._ckd_result is not None, then we return it directly.
-        if self._ckd_result is not None:
-            return self._ckd_result
+    # check the node, the operands are yielded to the worklist driver.
+    def steps(self: 'Dict') -> Generator:
         
         if self.values: 
             probs = [el.prob if hasattr(el, 'prob') else 1 / len(self.values) \
                 for el in self.values] 
         else: 
             probs = []
-        k_types = [k.check() for k in self.keys]
-        v_types = [v.check() for v in self.values]
+        k_types = []
+        for k in self.keys:
+            k_types.append((yield k))
+        v_types = []
+        for v in self.values:
+            v_types.append((yield v))
         setLineNo(self.lineno)
+        k_types, v_types, probs = types.boundItems(k_types, v_types, probs)
         self._ckd_result = types.Dict(self.type_map, k_types, v_types, probs)
         return self._ckd_result
         #return types.Dict(self.type_map, k_types, v_types,probs)
@@ -3114,6 +3278,8 @@ class Dict(Node):
 
 # check the self-defined statement variable declaration.
 class VarDecl(Node):
+    _ast_fields = ('target', 'annotation', 'value')
+
     def __init__(self: 'VarDecl', type_map: Dict, ast_node: AST) -> None:
         if len(ast_node.targets) > 1:
             raise NotYetSupported("VarDecl assignment with multiple targets")
@@ -3122,7 +3288,6 @@ class VarDecl(Node):
         self.target = convert(type_map, ast_node.targets[0])
         self.annotation = convert(type_map, ast_node.annotation)
         self.value = convert(type_map, ast_node.value)
-        self._ast_fields = ('target', 'annotation', 'value')
     def check(self: 'VarDecl') -> BaseType:
         # For Performance, we cache the node's return result. 
         # If the checked result self._ckd_result is not None, then we return it directly.
@@ -3141,6 +3306,8 @@ class VarDecl(Node):
 
 # check the self-defined constant declaration.
 class ConstDecl(Node):
+    _ast_fields = ('target', 'annotation', 'value')
+
     def __init__(self: 'ConstDecl', type_map: Dict, ast_node: AST) -> None:
         if len(ast_node.targets) > 1:
             raise NotYetSupported("ConstDecl assignment with multiple targets")
@@ -3149,7 +3316,6 @@ class ConstDecl(Node):
         self.target = convert(type_map, ast_node.targets[0])
         self.annotation = convert(type_map, ast_node.annotation)
         self.value = convert(type_map, ast_node.value)
-        self._ast_fields = ('target', 'annotation', 'value')
 
     def check(self: 'ConstDecl') -> BaseType:
         # For Performance, we cache the node's return result. 
@@ -3169,13 +3335,14 @@ class ConstDecl(Node):
 
 # check the self-defined type definition statement.
 class TypeDef(Node):
+    _ast_fields = ('target', 'value')
+
     def __init__(self: 'TypeDef', type_map: Dict, ast_node: AST) -> None:
         # TODO handle multiple targets
 
         super().__init__(type_map, ast_node)
         self.target = convert(type_map, ast_node.target)
         self.value = convert(type_map, ast_node.value)
-        self._ast_fields = ('target', 'value')
 
     def check(self: 'TypeDef') -> BaseType:
         # For Performance, we cache the node's return result. 
@@ -3193,20 +3360,18 @@ class TypeDef(Node):
         return repr(self.target) + ' = ' + repr(self.value)
 
 # check the subscript statement, we need to check the value and slice.
-class Subscript(Node):
+class Subscript(StepNode):
+    __slots__ = ('value', 'slice', 'ctx', 'elts', '_assign')
+
     def __init__(self: 'Subscript', type_map: Dict, ast_node: AST) -> None:
         # TODO handle multiple targets
         super().__init__(type_map, ast_node)
         self.value = convert(type_map, ast_node.value)
         self.slice = convert(type_map, ast_node.slice)
-        self.ctx = ast_node.ctx
+        self.ctx = _singleton(ast_node.ctx)
 
-    def check(self: 'Subscript') -> BaseType:
-        # For Performance, we cache the node's return result. 
-        # If the checked result self._ckd_result is not None, then we return it directly.
-        if self._ckd_result is not None:
-            return self._ckd_result
-        
+    # check the node, the operands are yielded to the worklist driver.
+    def steps(self: 'Subscript') -> Generator:
         setLineNo(self.lineno)
         if isinstance(self.ctx, ast.Load):
             # check different kinds of slice.
@@ -3219,7 +3384,7 @@ class Subscript(Node):
                     elts = elts.elts
                 self.elts = elts
             if isinstance(self.slice, Slice):
-                elts = self.slice.check()
+                elts = yield self.slice
                 #elts = _get_type_from_ns(elts)
                 elts = _get_type_from_ns(elts)
                 self.elts = elts.elts if hasattr(elts, 'elts') else elts
@@ -3237,7 +3402,7 @@ class Subscript(Node):
                 el_types = []
                 for el in self.elts:
                     if not isinstance(el, Str):
-                        el_type = el.check()
+                        el_type = yield el
                     else:
                         el_type = self.type_map.find(el.s)
                     #el_type = _get_type_from_ns(el_type)
@@ -3260,7 +3425,7 @@ class Subscript(Node):
                 el_types = []
                 for el in self.elts:
                     if not isinstance(el, Str):
-                        el_type = el.check()
+                        el_type = yield el
                     else:
                         el_type = self.type_map.find(el.s)
                     el_type = _get_type_from_ns(el_type)
@@ -3276,7 +3441,9 @@ class Subscript(Node):
                     probs = [el.prob if hasattr(el, 'prob') else 1 / len(self.elts) for el in self.elts]  
                 else:  
                     probs = [] 
-                el_types = [el.check() for el in self.elts]
+                el_types = []
+                for el in self.elts:
+                    el_types.append((yield el))
                 try:
                     setLineNo(self.lineno)
                     self._ckd_result = types.Tuple(self.type_map, el_types, probs)
@@ -3291,7 +3458,9 @@ class Subscript(Node):
                         for el in self.elts]
                 else:   
                     probs = []
-                el_types = [el.check() for el in self.elts]
+                el_types = []
+                for el in self.elts:
+                    el_types.append((yield el))
                 try:
                     setLineNo(self.lineno)
                     
@@ -3306,7 +3475,9 @@ class Subscript(Node):
                         for el in self.elts]
                 else:   
                     probs = []
-                el_types = [el.check() for el in self.elts]
+                el_types = []
+                for el in self.elts:
+                    el_types.append((yield el))
                 try:
                      #    setLineNo(self.lineno)
                      self._ckd_result = types.List(self.type_map, el_types, probs)
@@ -3328,8 +3499,12 @@ class Subscript(Node):
                         for el in values]
                 else:     
                     probs = []
-                k_types = [k.check() for k in keys]
-                v_types = [v.check() for v in values]
+                k_types = []
+                for k in keys:
+                    k_types.append((yield k))
+                v_types = []
+                for v in values:
+                    v_types.append((yield v))
                 setLineNo(self.lineno)
                 self._ckd_result = types.Dict(self.type_map, k_types, v_types, probs)
                 return self._ckd_result
@@ -3341,7 +3516,7 @@ class Subscript(Node):
                 temp = _get_type_from_ns(temp)
                 if not isinstance(temp, data_types.Any)\
                     and isinstance(self.slice, Index):
-                    index = self.slice.check()
+                    index = yield self.slice
                     index = _get_type_from_ns(index)
                     if (index is data_types.Int \
                         or isinstance(index, data_types.Int))\
@@ -3379,11 +3554,11 @@ class Subscript(Node):
                 return self._ckd_result
                 #return temp
             elif isinstance(self.value, Subscript):
-                temp = self.value.check()
+                temp = yield self.value
                 temp = _get_type_from_ns(temp)
                 if not isinstance(temp, data_types.Any)\
                     and isinstance(self.slice, Index): 
-                    index = self.slice.check()
+                    index = yield self.slice
                     index = _get_type_from_ns(index)
                     if isinstance(index, data_types.Int)\
                         and hasattr(temp, 'elts') \
@@ -3410,7 +3585,7 @@ class Subscript(Node):
                 temp = _get_type_from_ns(temp)
                 if not isinstance(temp, data_types.Any)\
                     and isinstance(self.slice, Index):
-                    index = self.slice.check()
+                    index = yield self.slice
                     index = _get_type_from_ns(index)
                 from .types import Dict as DictType
                 if isinstance(temp, DictType):
@@ -3482,6 +3657,8 @@ class JoinedStr(Node):
 
 # check the str node, and return builtin type directly.
 class Str(Node):
+    __slots__ = ('s', )
+
     def __init__(self: 'Str', type_map: Dict, ast_node: AST) -> None:
         super().__init__(type_map, ast_node)
         self.s = ast_node.s
@@ -3509,9 +3686,13 @@ class FormattedValue(Node):
 
 # check the arg node of the function node.
 class arg(Node):
+    __slots__ = ('arg', 'annotation')
+
     def __init__(self: 'arg', type_map: Dict, ast_node: AST) -> None:
         super().__init__(type_map, ast_node)
         self.arg = ast_node.arg
+        self.annotation = convert(type_map, ast_node.annotation) \
+            if getattr(ast_node, 'annotation', None) is not None else None
 
     def check(self: 'arg') -> BaseType:
         setLineNo(self.lineno)
@@ -3520,20 +3701,19 @@ class arg(Node):
         return repr(self.arg)
 
 # check keyword node of the function node.
-class keyword(Node):
+class keyword(StepNode):
+    __slots__ = ('arg', 'value')
+
     def __init__(self: 'keyword', type_map: Dict, ast_node: AST) -> None:
         super().__init__(type_map, ast_node)
         self.arg = ast_node.arg
         self.value = convert(type_map, ast_node.value)
 
-    def check(self: 'keyword') -> Tuple:
-        # For Performance, we cache the node's return result. 
-        # If the checked result self._ckd_result is not None, then we return it directly.
-        if self._ckd_result is not None:
-            return self._ckd_result
+    # check the node, the operands are yielded to the worklist driver.
+    def steps(self: 'keyword') -> Generator:
         
         arg = self.arg
-        value = self.value.check()
+        value = yield self.value
         value = _get_type_from_ns(value)
         setLineNo(self.lineno)
         self._ckd_result = (arg, value)
@@ -3565,24 +3745,277 @@ class Await(Node):
     def __repr__(self: 'Await') -> str:
         return 'await'
 
+# the expressions that nest, such as method call chains. Their nested expressions are converted
+# before them with an explicit stack, and the converted nodes are kept by ast node until the parent takes them.
+# The operators and the comparisons are method calls after desugaring, not and in are insuline nodes.
+NESTED_EXPRS: AnyType = {ast.Call, ast.Attribute, ast.Subscript, ast.Index, ast.BinOp, ast.UnaryOp,
+    ast.BoolOp, ast.Compare, ast.Tuple, ast.List, ast.Set, ast.Dict, ast.Starred, ast.keyword,
+    insuline.Not, insuline.In}
+CONVERTED: AnyType = {}
+
+# the pass run on the function bodies converted after their module, such as adding the inferred types.
+BODY_PASS: AnyType = None
+
+def setBodyPass(body_pass: AnyType) -> None:
+    global BODY_PASS
+    BODY_PASS = body_pass
+
+def getBodyPass() -> AnyType:
+    return BODY_PASS
+
+# the state a definition is converted in, its body is converted later in the same state.
+def _conversion_state(type_map: Dict) -> AnyType:
+    from .coordinator.typemap import getTypeMap
+    return (type_map.current_namespace, config.getFileName(), getTypeMap(),
+        getSearchPath(), config.getImportLevel(), BODY_PASS)
+
+# the statements of a function body that add names when they are converted, they are converted with the definition.
+DEFINITION_STMTS: AnyType = {ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.ImportFrom}
+# the fields of the compound statements that hold statements.
+BLOCK_FIELDS: AnyType = ('body', 'orelse', 'handlers', 'finalbody')
+
+# convert the definitions and from-imports of the function body, including those in its blocks.
+# They add their names when the function is defined as if its whole body were converted then.
+def _convert_definitions(type_map: Dict, stmts: List) -> AnyType:
+    definitions = {}
+    todo = list(reversed(stmts))
+    while todo:
+        stmt = todo.pop()
+        if stmt.__class__ in DEFINITION_STMTS:
+            definitions[stmt] = convert(type_map, stmt)
+            continue
+        for field in BLOCK_FIELDS:
+            block = getattr(stmt, field, None)
+            if isinstance(block, list):
+                todo.extend(reversed(block))
+    return definitions
+
+# convert the function body statements in the state of the definition, then run the body pass of its module.
+# The definitions converted with the function are taken as they are.
+def _convert_body(type_map: Dict, stmts: List, state: AnyType, definitions: AnyType) -> List:
+    from . import search_path
+    from .coordinator.typemap import getTypeMap, setTypeMap
+    namespace, file_name, coord_map, path, level, body_pass = state
+    tmp_ns = type_map.current_namespace
+    tmpFileName = config.getFileName()
+    tmpLineNo = config.getLineNo()
+    tmp_map = getTypeMap()
+    tmp_path = getSearchPath()
+    tmpLevel = config.getImportLevel()
+    tmp_pass = getBodyPass()
+    type_map.current_namespace = namespace
+    config.setFileName(file_name)
+    setTypeMap(coord_map)
+    search_path.setSearchPath(path)
+    config.setImportLevel(level)
+    setBodyPass(body_pass)
+    CONVERTED.update(definitions)
+    try:
+        body = [convert(type_map, stmt) for stmt in stmts]
+        if body_pass is not None:
+            body_pass(body)
+    finally:
+        for stmt in definitions:
+            CONVERTED.pop(stmt, None)
+        type_map.current_namespace = tmp_ns
+        config.setFileName(tmpFileName)
+        config.setLineNo(tmpLineNo)
+        setTypeMap(tmp_map)
+        search_path.setSearchPath(tmp_path)
+        config.setImportLevel(tmpLevel)
+        setBodyPass(tmp_pass)
+    return body
+
 # convert ast to our nodes, then we can add interface and fields.
 def convert(type_map: Dict, node: AST) -> BaseType:
-    class_name = node.__class__.__name__
+    if node.__class__ in NESTED_EXPRS:
+        converted = CONVERTED.pop(node, None)
+        if converted is not None:
+            return converted
+        _convert_nested(type_map, node)
+    elif node.__class__ in DEFINITION_STMTS:
+        converted = CONVERTED.pop(node, None)
+        if converted is not None:
+            return converted
+    return _constructor(node)(type_map, node)
+
+def _constructor(node: AST) -> AnyType:
     try:
-        # Try to convert to a node
-        class_ = globals()[class_name]
-        return class_(type_map, node)
+        return NODE_TABLE[node.__class__]
     except KeyError:
-        if class_name in globals():
-            class_ = globals()[class_name]
-            return class_(type_map, node)
-        try:
-            # Try to convert to a builtin type
-            class_ = getattr(data_types, class_name)
-            return class_()
-        except AttributeError:
-            _except_handler()
-            raise NotYetSupported('node', node)
+        return _fallback_constructor(node)
+
+# convert the nested expressions of the node, from the innermost one.
+def _convert_nested(type_map: Dict, node: AST) -> None:
+    nested = []
+    todo = [node]
+    while todo:
+        for child in _nested_children(todo.pop()):
+            if child.__class__ in NESTED_EXPRS:
+                nested.append(child)
+                todo.append(child)
+    try:
+        for child in reversed(nested):
+            CONVERTED[child] = _constructor(child)(type_map, child)
+    except Exception:
+        for child in nested:
+            CONVERTED.pop(child, None)
+        raise
+
+# the literal containers with more elements are summarized if their elements are constants or literals of constants.
+# The elements of the same shape have the same type, only the first element of each shape is converted and checked.
+MIN_SUMMARIZED_ELEMENTS: int = 64
+# the distinct element shapes of a summarized container.
+MAX_SUMMARIZED_SHAPES: int = 8
+# the elements and the nesting of a literal element's shape.
+MAX_SHAPE_ELEMENTS: int = 16
+MAX_SHAPE_DEPTH: int = 4
+SUMMARY_STATS: AnyType = {'containers': 0, 'skipped': 0}
+
+def getSummaryStats() -> AnyType:
+    return dict(SUMMARY_STATS)
+
+CONSTANT_NODES: AnyType = (ast.Str, ast.Bytes, ast.Ellipsis)
+# the unary operators are method calls once the syntactic sugar is replaced, such as x.__neg__().
+UNARY_METHODS: AnyType = {'__%s__' % op for op in UNARYOP_TRANSLATION.values()}
+
+def setMinSummarizedElements(elements: int) -> None:
+    global MIN_SUMMARIZED_ELEMENTS
+    MIN_SUMMARIZED_ELEMENTS = elements
+
+def getMinSummarizedElements() -> int:
+    return MIN_SUMMARIZED_ELEMENTS
+
+# return the shape of the literal element, or None if it isn't a constant or a literal of constants.
+def _literal_shape(node: AST, depth: int = 0) -> AnyType:
+    cls = node.__class__
+    if cls is ast.Num:
+        return (cls, type(node.n))
+    if cls is ast.NameConstant:
+        return (cls, type(node.value))
+    if cls in CONSTANT_NODES:
+        return cls
+    if depth >= MAX_SHAPE_DEPTH:
+        return None
+    if cls is ast.UnaryOp:
+        operand = _literal_shape(node.operand, depth + 1)
+        return None if operand is None else (cls, node.op.__class__, operand)
+    if cls is ast.Call:
+        func = node.func
+        if node.args or node.keywords \
+            or func.__class__ is not ast.Attribute or func.attr not in UNARY_METHODS:
+            return None
+        operand = _literal_shape(func.value, depth + 1)
+        return None if operand is None else (cls, func.attr, operand)
+    if cls in (ast.Tuple, ast.List, ast.Set):
+        if len(node.elts) > MAX_SHAPE_ELEMENTS \
+            or cls is not ast.Set and not isinstance(node.ctx, ast.Load):
+            return None
+        shapes = tuple(_literal_shape(elt, depth + 1) for elt in node.elts)
+        return None if None in shapes else (cls, shapes)
+    if cls is ast.Dict:
+        if len(node.keys) > MAX_SHAPE_ELEMENTS \
+            or None in node.keys:
+            return None
+        shapes = tuple(_literal_shape(elt, depth + 1) for elt in node.keys + node.values)
+        return None if None in shapes else (cls, shapes)
+    return None
+
+# return the sampled elements of the literal container, the first element of each shape,
+# or None if the container isn't summarized. The items of a dict are sampled as key and value pairs.
+def _literal_sample(node: AST) -> AnyType:
+    sample = getattr(node, '_literal_sample', False)
+    if sample is not False:
+        return sample
+    sample = None
+    if node.__class__ is ast.Dict:
+        elements = list(zip(node.keys, node.values))
+    elif node.__class__ in (ast.List, ast.Tuple, ast.Set) \
+        and (node.__class__ is ast.Set or isinstance(node.ctx, ast.Load)):
+        elements = node.elts
+    else:
+        elements = ()
+    if MIN_SUMMARIZED_ELEMENTS >= 0 \
+        and len(elements) > MIN_SUMMARIZED_ELEMENTS:
+        sample = _sample_shapes(elements, node.__class__ is ast.Dict)
+    node._literal_sample = sample
+    return sample
+
+# return the first element of each shape, or None if an element isn't a literal or there are too many shapes.
+def _sample_shapes(elements: AnyType, items: bool) -> AnyType:
+    shapes = {}
+    for element in elements:
+        if items:
+            if element[0] is None:
+                return None
+            shape = (_literal_shape(element[0]), _literal_shape(element[1]))
+            if None in shape:
+                return None
+        else:
+            shape = _literal_shape(element)
+            if shape is None:
+                return None
+        if shape not in shapes:
+            if len(shapes) == MAX_SUMMARIZED_SHAPES:
+                return None
+            shapes[shape] = element
+    SUMMARY_STATS['containers'] += 1
+    SUMMARY_STATS['skipped'] += len(elements) - len(shapes)
+    return list(shapes.values())
+
+# return the child nodes converted with the node, only the sampled elements of a summarized container.
+def _nested_children(node: AST) -> AnyType:
+    sample = _literal_sample(node) \
+        if node.__class__ in (ast.List, ast.Tuple, ast.Set, ast.Dict) else None
+    if sample is None:
+        return ast.iter_child_nodes(node)
+    if node.__class__ is ast.Dict:
+        return [child for item in sample for child in item]
+    return sample
+
+# return the elements of the literal container to be converted.
+def _literal_elements(node: AST) -> AnyType:
+    sample = _literal_sample(node)
+    return node.elts if sample is None else sample
+
+# return the keys and the values of the literal dict to be converted.
+def _literal_items(node: AST) -> AnyType:
+    sample = _literal_sample(node)
+    if sample is None:
+        return node.keys, node.values
+    return [key for key, _ in sample], [value for _, value in sample]
+
+# return the constructor of a node that isn't in the dispatch table, such as a node that's already converted.
+def _fallback_constructor(node: AnyType) -> AnyType:
+    CONVERT_STATS['fallbacks'] += 1
+    constructor = _node_constructor(node.__class__.__name__)
+    if constructor is None:
+        CONVERT_STATS['unsupported'] += 1
+        raise NotYetSupported('node', node)
+    return constructor
+
+# return the constructor of the named node, our node classes first and then the builtin types.
+def _node_constructor(class_name: str) -> AnyType:
+    if class_name in globals():
+        return globals()[class_name]
+    if hasattr(data_types, class_name):
+        class_ = getattr(data_types, class_name)
+        return lambda type_map, node: class_()
+    return None
+
+# build the dispatch table from the AST classes to the node constructors.
+def _build_node_table() -> Dict:
+    table = {}
+    # the missing keyword-only defaults are None.
+    table[type(None)] = _node_constructor('NoneType')
+    todo = [ast.AST]
+    while todo:
+        ast_class = todo.pop()
+        todo.extend(ast_class.__subclasses__())
+        constructor = _node_constructor(ast_class.__name__)
+        if constructor is not None:
+            table[ast_class] = constructor
+    return table
 
 # set the node's lineno, using when we report logging information
 from . import config
@@ -3794,19 +4227,8 @@ def convertAnnotation(annotation: Node, type_map: Dict) -> BaseType:
 
 # prevent recursion function call.
 def _recursive_funccall(func: BaseType, args: List, probs: List) -> BaseType:
-    from . import recursion
-    flag = recursion.getRecFunc(func.name)
-    if flag == 2:
-        flag = recursion.setRecFunc(func.name)
-    if flag:
-        recursion.setRecFunc(func.name, False)
-        result = func.check_call(args, probs)
-        recursion.setRecFunc(func.name)
-    else:
-        result = func.return_type \
-            if hasattr(func, 'return_type') \
-            else func.check_call(args, probs)
-    return result
+    from .recursion import _recursive_funccall
+    return _recursive_funccall(func, args, probs)
 
 # get annotation type and probability.
 def getAnnoInstance(anno: UnionType[List, Node]) -> Tuple:
@@ -3907,3 +4329,10 @@ def _typeassign(target: Node, value: Node, type_map: Dict, *probs: Tuple) -> Bas
     else:
         raise NotYetSupported('assignment to', target)
     return value_type
+
+# the node classes are defined, the dispatch table of convert is built once.
+NODE_TABLE: AnyType = _build_node_table()
+CONVERT_STATS: AnyType = {'fallbacks': 0, 'unsupported': 0, 'bodies': 0}
+
+def getConvertStats() -> AnyType:
+    return dict(CONVERT_STATS)
@@ -1,35 +1,57 @@
-# This module is for handling recursion call checking, 
+# This module is for handling recursion call checking,
 # such as functions call , methods call.
-from typing import Dict, List, Any as AnyType, Union
+# The recursive functions are found from the call graph of the module. The summaries of a
+# strongly connected component are computed together on the call that enters it, with a
+# bounded fixed-point iteration of the component. The functions called out of the component
+# are lower components, they're checked to the end within the pass, callees first.
+import ast
+import builtins
+import logging
+from typing import Dict, List, Set, Tuple, Optional, Any as AnyType, Union
 
-from .types import BaseType
+from .types import BaseType, Union as UnionType
 
+AST = ast.AST
+
+# passes of the fixed-point iteration of a recursive function.
+MAX_PASSES: int = 3
+
+# the functions being checked, keyed by their definitions.
 recursive_function: Dict = {}
+# the definitions (file, lineno, col_offset, name) of the functions in call graph cycles and
+# their components, the definitions on one line are told apart by their columns and names.
+COMPONENTS: Dict[Tuple[str, int, int, str], Tuple] = {}
 
-# return current function.
-def getRecFunc() -> BaseType:
-    return recursive_function
+PASS_STATS: Dict[str, int] = {'components': 0, 'passes': 0}
+
+def setMaxPasses(passes: int) -> None:
+    global MAX_PASSES
+    MAX_PASSES = passes
+
+def getMaxPasses() -> int:
+    return MAX_PASSES
+
+def getStats() -> Dict[str, int]:
+    return dict(PASS_STATS)
+
+# return the key of the function definition, the types created from one definition share the body.
+def funcKey(func: BaseType) -> Tuple:
+    body = getattr(func, 'body', None)
+    if isinstance(body, list):
+        return ('def', id(body))
+    return (type(func).__name__, getattr(func, 'name', None), id(func))
 
 # set function that may be in recursion.
-def setRecFunc(func_name: str, flag: bool = True) -> bool:
-    '''
-    if func_name in recursive_function.keys():
-        return recursive_function[func_name]
-    else:
-        recursive_function[func_name] = True
-    '''
-    if not func_name in recursive_function.keys():
-        recursive_function[func_name] = flag
-    # temp = recursive_function[func_name]
-    recursive_function[func_name] = flag
+def setRecFunc(key: Tuple, flag: bool = True) -> bool:
+    recursive_function[key] = flag
     return flag
 
-# return function according to the function name.
-def getRecFunc(func_name: str) -> Union[int, BaseType]:
-    if not func_name in recursive_function.keys():
+# return whether the function isn't being checked, 2 if it was never checked.
+def getRecFunc(key: Tuple) -> Union[int, bool]:
+    if not key in recursive_function.keys():
         return 2
     else:
-        return recursive_function[func_name]
+        return recursive_function[key]
 
 # initial the recursive function map.
 def clear() -> None:
@@ -37,23 +59,243 @@ def clear() -> None:
     recursive_function = {}
 
 # getter and setter of the recursive function map.
-def get() -> BaseType:
+def get() -> Dict:
     return recursive_function
 
 def set(rec_results: Dict) -> None:
     global recursive_function
     recursive_function = rec_results
 
-# prevent recursion function call. 
-def _recursive_funccall(func: BaseType, args: List, probs: List) -> BaseType: 
-    flag = getRecFunc(func.name) 
-    if flag == 2: 
-        flag = setRecFunc(func.name) 
-    if flag: 
-        setRecFunc(func.name, False) 
-        result = func.check_call(args, probs) 
-        setRecFunc(func.name) 
-    else: 
+# return the recursive component of the function in its module call graph, None if it isn't recursive.
+def component(func: BaseType) -> Optional[Tuple]:
+    return COMPONENTS.get((getattr(func, 'location', None), getattr(func, 'lineno', None),
+        getattr(func, 'col_offset', None), getattr(func, 'name', None)))
+
+# return whether the function is in a cycle of its module call graph.
+def isRecursive(func: BaseType) -> bool:
+    return component(func) is not None
+
+# return the node of the definition in the call graph.
+def _defKey(func_def: AST) -> Tuple[int, int, str]:
+    return (func_def.lineno, func_def.col_offset, func_def.name)
+
+# collect the definitions called by name in the function body, nested definitions are separate nodes.
+def _callees(func_def: AST) -> Set[str]:
+    names = builtins.set()
+    todo = list(func_def.body)
+    while todo:
+        node = todo.pop()
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            continue
+        if isinstance(node, ast.Call):
+            func = node.func
+            if isinstance(func, ast.Name):
+                names.add(func.id)
+            # method calls through self and cls.
+            elif isinstance(func, ast.Attribute) \
+                and isinstance(func.value, ast.Name) \
+                and func.value.id in ('self', 'cls'):
+                names.add(func.attr)
+        todo.extend(ast.iter_child_nodes(node))
+    return names
+
+# return the definitions in the body of the node, without the ones nested in them.
+def _nested_defs(node: AST) -> List[AST]:
+    defs = []
+    todo = list(reversed(getattr(node, 'body', [])))
+    while todo:
+        child = todo.pop()
+        if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            defs.append(child)
+            continue
+        todo.extend(ast.iter_child_nodes(child))
+    return defs
+
+# build the call graph of the module, the nodes are the (lineno, col_offset, name) of the definitions.
+def callGraph(tree: AST) -> Dict[Tuple, Set[Tuple]]:
+    graph: Dict[Tuple, Set[Tuple]] = {}
+    todo = [(tree, {})]
+    while todo:
+        node, visible = todo.pop()
+        # the names of the enclosing scopes and the definitions in this one.
+        local = dict(visible)
+        defs = _nested_defs(node)
+        for func_def in defs:
+            if not isinstance(func_def, ast.ClassDef):
+                local[func_def.name] = _defKey(func_def)
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            graph[_defKey(node)] = {local[name] for name in _callees(node) if name in local}
+        todo.extend((func_def, local) for func_def in defs)
+    return graph
+
+# return the strongly connected components of the graph, callees before callers.
+def sccs(graph: Dict[Tuple, Set[Tuple]]) -> List[List[Tuple]]:
+    index: Dict[Tuple, int] = {}
+    low: Dict[Tuple, int] = {}
+    stack: List[Tuple] = []
+    on_stack: Set[Tuple] = builtins.set()
+    components: List[List[Tuple]] = []
+    counter = 0
+    for root in graph:
+        if root in index:
+            continue
+        work = [(root, iter(graph[root]))]
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            node, children = work[-1]
+            child = next(children, None)
+            if child is not None:
+                if child not in index:
+                    index[child] = low[child] = counter
+                    counter += 1
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(graph.get(child, ()))))
+                elif child in on_stack:
+                    low[node] = min(low[node], index[child])
+                continue
+            work.pop()
+            if work:
+                low[work[-1][0]] = min(low[work[-1][0]], low[node])
+            if low[node] == index[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == node:
+                        break
+                components.append(component)
+    return components
+
+# mark the recursive functions of the module, self-recursive ones and the ones in cycles.
+def analyze(file: str, tree: AST) -> None:
+    graph = callGraph(tree)
+    for component in sccs(graph):
+        if len(component) > 1 \
+            or component[0] in graph[component[0]]:
+            members = tuple(sorted((file, ) + key for key in component))
+            for member in members:
+                COMPONENTS[member] = members
+
+# the fixed-point iteration of a recursive component. The functions of the component are checked
+# once per pass, their recursive calls in the pass read the summaries of the earlier pass.
+class Iteration(object):
+    def __init__(self: 'Iteration', component: Tuple) -> None:
+        self.component = component
+        # the functions checked in the pass and the ones whose check is done.
+        self.started: Dict[Tuple, BaseType] = {}
+        self.finished: Set[Tuple] = builtins.set()
+        # the summaries read before they're computed in the pass, and whether a summary changed.
+        self.reads = 0
+        self.changed = False
+        # the last result of each function of the component.
+        self.results: Dict[Tuple, AnyType] = {}
+
+    # start the next pass, the functions checked in the previous one are checked again.
+    def start_pass(self: 'Iteration') -> None:
+        for func in self.started.values():
+            func._reset_body()
+        self.started = {}
+        self.finished = builtins.set()
+        self.reads = 0
+        self.changed = False
+        PASS_STATS['passes'] += 1
+
+    def enter(self: 'Iteration', func: BaseType) -> None:
+        self.started[funcKey(func)] = func
+
+    def exit(self: 'Iteration', func: BaseType, result: AnyType) -> None:
+        self.finished.add(funcKey(func))
+        self.results[funcKey(func)] = result
+
+    # return the result of the recursive call whose signature isn't summarized, the last result
+    # of the function, or the empty type that the unions drop before the function returns.
+    def provisional(self: 'Iteration', func: BaseType) -> AnyType:
+        result = self.results.get(funcKey(func))
+        return result if result is not None else UnionType(func.type_map, [])
+
+    # return whether the function is checked in the pass and its summary is final for the pass.
+    def isStarted(self: 'Iteration', func: BaseType) -> bool:
+        return funcKey(func) in self.started
+
+    def isFinished(self: 'Iteration', func: BaseType) -> bool:
+        return funcKey(func) in self.finished
+
+    def __enter__(self: 'Iteration') -> 'Iteration':
+        ITERATIONS[self.component] = self
+        PASS_STATS['components'] += 1
+        return self
+
+    def __exit__(self: 'Iteration', *exc: AnyType) -> None:
+        del ITERATIONS[self.component]
+
+# the iterations of the components being computed.
+ITERATIONS: Dict[Tuple, Iteration] = {}
+
+# return the iteration of the component of the function, None if it isn't being computed.
+def iteration(func: BaseType) -> Optional[Iteration]:
+    if not ITERATIONS:
+        return None
+    members = component(func)
+    return ITERATIONS.get(members) if members is not None else None
+
+# log filter of the fixed-point passes, a message logged by an earlier pass isn't logged again.
+# The records are logged as they come, the ones of the first pass and the new ones of the later passes.
+class PassLog(logging.Filter):
+    def __init__(self: 'PassLog') -> None:
+        super().__init__()
+        # the messages of the earlier passes and of the current one.
+        self.seen: Set[str] = builtins.set()
+        self.current: Set[str] = builtins.set()
+
+    def filter(self: 'PassLog', record: logging.LogRecord) -> bool:
+        message = record.getMessage()
+        if message in self.seen:
+            return False
+        self.current.add(message)
+        return True
+
+    # start the next pass, the messages of the current one are repeats from then on.
+    def next_pass(self: 'PassLog') -> None:
+        self.seen |= self.current
+        self.current = builtins.set()
+
+    # filter the records of the root handlers while the passes are checked.
+    def __enter__(self: 'PassLog') -> 'PassLog':
+        self.handlers = list(logging.getLogger().handlers)
+        for handler in self.handlers:
+            handler.addFilter(self)
+        return self
+
+    def __exit__(self: 'PassLog', *exc: AnyType) -> None:
+        for handler in self.handlers:
+            handler.removeFilter(self)
+
+# prevent recursion function call.
+def _recursive_funccall(func: BaseType, args: List, probs: List) -> BaseType:
+    key = funcKey(func)
+    flag = getRecFunc(key)
+    if flag == 2:
+        flag = setRecFunc(key)
+    if flag:
+        setRecFunc(key, False)
+        try:
+            result = func.check_call(args, probs)
+        finally:
+            setRecFunc(key)
+    elif hasattr(func, 'summaries'):
+        # a recursive call uses the summary of the pass being computed.
+        current = iteration(func)
+        if current is not None:
+            current.reads += 1
+        found, result = func.summarized(args, probs)
+        if not found:
+            result = func.return_type if current is None else current.provisional(func)
+    else:
         result = func.return_type \
                 if hasattr(func, 'return_type') \
                 else func.check_call(args, probs)
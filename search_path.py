@@ -0,0 +1,69 @@
+# immutable module search paths for the imports handler.
+# The search paths are computed once per package root and handed to the resolver,
+# so the checker doesn't mutate the interpreter's sys.path while checking.
+import itertools
+from typing import Dict, Iterable, Tuple, Any as AnyType
+
+# every new search path gets a new version, resolution caches are keyed on it.
+_VERSIONS = itertools.count()
+
+# ordered and deduplicated tuple of directories.
+class SearchPath(tuple):
+    def __new__(cls: type, paths: Iterable[str] = ()) -> 'SearchPath':
+        seen = set()
+        unique = []
+        for path in paths:
+            if path not in seen:
+                seen.add(path)
+                unique.append(path)
+        self = super().__new__(cls, unique)
+        self.version = next(_VERSIONS)
+        self._derived = {}
+        return self
+
+    # return the search path with the directory inserted at index.
+    def insert(self: 'SearchPath', index: int, path: str) -> 'SearchPath':
+        key = ('insert', index, path)
+        if key not in self._derived:
+            self._derived[key] = SearchPath(self[:index] + (path, ) + self[index:])
+        return self._derived[key]
+
+    # return the search path with the directories appended.
+    def extend(self: 'SearchPath', paths: Iterable[str]) -> 'SearchPath':
+        paths = tuple(paths)
+        key = ('extend', paths)
+        if key not in self._derived:
+            self._derived[key] = SearchPath(self + paths)
+        return self._derived[key]
+
+    def __eq__(self: 'SearchPath', other: AnyType) -> bool:
+        return self is other
+
+    def __hash__(self: 'SearchPath') -> int:
+        return self.version
+
+    def __repr__(self: 'SearchPath') -> str:
+        return 'SearchPath(v{}, {})'.format(self.version, list(self))
+
+# search path of the checked project, set once by the entry.
+BASE_PATH: SearchPath = SearchPath()
+# search path of the file being checked.
+SEARCH_PATH: SearchPath = BASE_PATH
+
+def setBasePath(path: SearchPath) -> None:
+    global BASE_PATH
+    BASE_PATH = path
+
+def getBasePath() -> SearchPath:
+    return BASE_PATH
+
+def setSearchPath(path: SearchPath) -> None:
+    global SEARCH_PATH
+    SEARCH_PATH = path
+
+def getSearchPath() -> SearchPath:
+    return SEARCH_PATH
+
+# return the search path of the file, the file directory is searched after the script directory.
+def forDirectory(directory: str) -> SearchPath:
+    return BASE_PATH.insert(1, directory)
@@ -0,0 +1,119 @@
+# function summaries, the checked results of a function call per abstract signature of the arguments.
+# A function body is checked once per distinct signature instead of once per call or once for all calls.
+from collections import OrderedDict
+from typing import Dict, List, Tuple, Optional, Any as AnyType
+
+# summaries kept per function, the least recently used one is dropped.
+SUMMARY_SIZE: int = 8
+# the elements of compound types that are part of the signature.
+MAX_ELTS: int = 8
+MAX_DEPTH: int = 3
+
+SUMMARY_STATS: Dict[str, int] = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+# the signature of a function body that hasn't been checked yet.
+UNCHECKED: object = object()
+
+# at least one summary is kept, the recursive calls are checked with it.
+def setSummarySize(size: int) -> None:
+    global SUMMARY_SIZE
+    SUMMARY_SIZE = max(size, 1)
+
+def getSummarySize() -> int:
+    return SUMMARY_SIZE
+
+def getStats() -> Dict[str, int]:
+    return dict(SUMMARY_STATS)
+
+# return the identity of the function or class, its definition site. The type objects of a definition
+# are created again per lookup and the ids of the dropped ones are reused, so they aren't keyed by id.
+# An object without a definition can't be identified, its abstraction can't be hashed and the call
+# isn't summarized, the results with it are compared by identity.
+def _identity(obj: AnyType) -> AnyType:
+    site = getattr(obj, 'site', None)
+    if site is not None:
+        return (type(obj), site)
+    if obj is None or isinstance(obj, type):
+        return obj
+    return [id(obj)]
+
+# abstract the argument, types are abstracted by their classes and the probabilities are rounded.
+def _abstract(arg: AnyType, depth: int = 0) -> AnyType:
+    if arg is None or isinstance(arg, (bool, int, str)):
+        return arg
+    if isinstance(arg, float):
+        return round(arg, 2)
+    if isinstance(arg, type):
+        return arg
+    if depth >= MAX_DEPTH:
+        return type(arg)
+    depth += 1
+    if isinstance(arg, (list, tuple)):
+        return (type(arg), len(arg)) + tuple(_abstract(elt, depth) for elt in arg[:MAX_ELTS])
+    if isinstance(arg, dict):
+        return (dict, len(arg)) + tuple((_abstract(key, depth), _abstract(value, depth)) \
+                for key, value in list(arg.items())[:MAX_ELTS])
+    # instances are abstracted by their classes, methods by their functions and objects,
+    # functions and classes by their definitions.
+    if hasattr(arg, 'class_'):
+        return (type(arg), _identity(arg.class_))
+    if hasattr(arg, 'object_') \
+        and hasattr(arg, 'function'):
+        return (type(arg), _abstract(arg.function, depth), _abstract(arg.object_, depth))
+    elts = getattr(arg, 'elts', None)
+    if isinstance(elts, (list, tuple)):
+        return (type(arg), _abstract(elts, depth), _abstract(getattr(arg, 'prob', None), depth))
+    if hasattr(arg, 'key_types'):
+        return (type(arg), _abstract(arg.key_types, depth), _abstract(arg.value_types, depth))
+    # the builtin functions are identified by their signatures, the intersections by their types.
+    if hasattr(arg, 'param_types'):
+        return (type(arg), arg.name, _abstract(arg.param_types, depth), _abstract(arg.return_type, depth))
+    if isinstance(getattr(arg, 'types', None), tuple):
+        return (type(arg), _abstract(arg.types, depth))
+    if hasattr(arg, 'check_call'):
+        return _identity(arg)
+    return type(arg)
+
+# return the abstract signature of the call, None if it can't be hashed.
+def signature(args: AnyType, probs: Tuple) -> Optional[Tuple]:
+    key = (_abstract(args), _abstract(probs))
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+# return whether the two results have the same abstraction, used for the fixed point of recursive functions.
+def sameSummary(old: AnyType, new: AnyType) -> bool:
+    return _abstract(old) == _abstract(new)
+
+# bounded LRU of the call results of one function.
+class Summaries(object):
+    def __init__(self: 'Summaries') -> None:
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    # return whether the signature is summarized and its result.
+    def lookup(self: 'Summaries', key: Tuple) -> Tuple[bool, AnyType]:
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            SUMMARY_STATS['hits'] += 1
+            return True, self.entries[key]
+        self.misses += 1
+        SUMMARY_STATS['misses'] += 1
+        return False, None
+
+    # return whether the signature is summarized and its result, without counting the lookup.
+    def peek(self: 'Summaries', key: Tuple) -> Tuple[bool, AnyType]:
+        if key in self.entries:
+            return True, self.entries[key]
+        return False, None
+
+    def store(self: 'Summaries', key: Tuple, result: AnyType) -> None:
+        self.entries[key] = result
+        self.entries.move_to_end(key)
+        while len(self.entries) > SUMMARY_SIZE:
+            self.entries.popitem(last=False)
+            SUMMARY_STATS['evictions'] += 1
@@ -0,0 +1,663 @@
+"""Regression tests of the checker, the test files are checked by the command line checker."""
+
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import unittest
+from typing import Dict, Tuple
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# the typeshed stubs are looked up next to the package, the checker exits without them.
+def _typeshed_dir() -> str:
+    for path in [os.path.dirname(PACKAGE_DIR)] + sys.path:
+        candidate = os.path.join(path or os.curdir, 'typeshed_3')
+        if os.path.isdir(candidate):
+            return os.path.abspath(candidate)
+    return ''
+
+TYPESHED_DIR = _typeshed_dir()
+
+# the tests of the checker's functions import it as the PyProb package, like the command line checker runs.
+PACKAGE_PARENT = tempfile.TemporaryDirectory()
+os.symlink(PACKAGE_DIR, os.path.join(PACKAGE_PARENT.name, 'PyProb'))
+sys.path.append(PACKAGE_PARENT.name)
+
+# check the source as the module m.py, return the output of the checker and its log.
+# The other modules are written next to it, by their file names.
+def check(source: str, *options: str, modules: Dict[str, str] = None) -> Tuple[str, str]:
+    return _run(source, options, modules)[:2]
+
+# check the source like check, return the results listing the checked and the skipped modules.
+def checkResults(source: str, *options: str, modules: Dict[str, str] = None) -> str:
+    return _run(source, options, modules)[2]
+
+def _run(source: str, options: Tuple[str, ...], modules: Dict[str, str]) -> Tuple[str, str, str]:
+    with tempfile.TemporaryDirectory() as work_dir:
+        os.symlink(PACKAGE_DIR, os.path.join(work_dir, 'PyProb'))
+        os.symlink(TYPESHED_DIR, os.path.join(work_dir, 'typeshed_3'))
+        os.mkdir(os.path.join(work_dir, 'ProbResults'))
+        for name, text in dict(modules or {}, **{'m.py': source}).items():
+            os.makedirs(os.path.dirname(os.path.join(work_dir, name)), exist_ok=True)
+            with open(os.path.join(work_dir, name), 'w') as module:
+                module.write(text)
+        env = dict(os.environ, PYTHONPATH=work_dir, PYTHONHASHSEED='0')
+        process = subprocess.run([sys.executable, '-W', 'ignore', '-m', 'PyProb',
+            '--import-depth', '0'] + list(options) + ['m.py'], cwd=work_dir, env=env,
+            stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True)
+        with open(os.path.join(work_dir, 'm_logger.log')) as log, \
+            open(os.path.join(work_dir, 'ProbResults', 'm_results.txt')) as results:
+            return process.stdout, log.read(), results.read()
+
+# the errors logged for the line of the module, the namespace errors write the line in their own format.
+def errors(log: str, lineno: int, module: str = 'm.py') -> list:
+    location = re.compile(r"{}'(:| at line line: ){}\b".format(re.escape(module), lineno))
+    return [line for line in log.splitlines()
+        if 'ERROR' in line and location.search(line)]
+
+
+# The nested expressions are checked by the worklist driver, the error of the innermost operand
+# is reported without exhausting the interpreter stack.
+@unittest.skipUnless(TYPESHED_DIR, 'the typeshed stubs are not found')
+class DeepNestingTest(unittest.TestCase):
+    def assertInnermostError(self: 'DeepNestingTest', expression: str) -> None:
+        output, log = check('n = 1\ns = "x"\na = [[1]]\nb = {}\n'.format(expression))
+        self.assertNotIn('Traceback', output)
+        self.assertTrue(errors(log, 4), log)
+
+    def test_binary_operators(self: 'DeepNestingTest') -> None:
+        self.assertInnermostError('n.foo' + ' + n' * 3000)
+
+    def test_method_chain(self: 'DeepNestingTest') -> None:
+        self.assertInnermostError('n.foo' + '.strip()' * 2000)
+
+    def test_unary_operators(self: 'DeepNestingTest') -> None:
+        self.assertInnermostError('-' * 1000 + 'n.foo')
+
+    def test_comparisons(self: 'DeepNestingTest') -> None:
+        self.assertInnermostError('n.foo' + ' < n' * 2000)
+
+    def test_subscripts(self: 'DeepNestingTest') -> None:
+        self.assertInnermostError('a[n.foo]' + '[0]' * 3000)
+
+    def test_not(self: 'DeepNestingTest') -> None:
+        self.assertInnermostError('not ' * 1000 + 'n.foo')
+
+    def test_boolean_operators(self: 'DeepNestingTest') -> None:
+        self.assertInnermostError('n and (n or (' * 40 + 'n.foo' + '))' * 40)
+
+    def test_in(self: 'DeepNestingTest') -> None:
+        self.assertInnermostError('1 in (' * 80 + 'n.foo' + ')' * 80)
+
+    def test_literals(self: 'DeepNestingTest') -> None:
+        self.assertInnermostError('[' * 80 + 'n.foo' + ']' * 80)
+
+    # the nested operands are checked in one evaluation of the statement.
+    def test_one_evaluation(self: 'DeepNestingTest') -> None:
+        output, log = check('n = 1\nx = n' + ' + n' * 3000 + '\n', '-d')
+        self.assertIn("check driver: {'evaluations': 1, 'max_depth': 6000}", output)
+
+
+# The imported modules are checked one top-level definition at a time, the definitions that aren't
+# accessed are never checked. The accessed names have the same types as in the eager checking.
+@unittest.skipUnless(TYPESHED_DIR, 'the typeshed stubs are not found')
+class LazyImportTest(unittest.TestCase):
+    helper = ('def used():\n    return 1\nx = 1\nx = "s"\n'
+        'def unused():\n    y = 1\n    y = "s"\nunused()\n')
+    source = 'from helper import used\nr = used()\nr = "s"\n'
+
+    def test_accessed_definition(self: 'LazyImportTest') -> None:
+        _output, log = check(self.source, '--import-depth', '-1', modules={'helper.py': self.helper})
+        self.assertTrue(errors(log, 3), log)
+        self.assertFalse(errors(log, 4, 'helper.py'), log)
+        self.assertFalse(errors(log, 7, 'helper.py'), log)
+
+    def test_eager_imports(self: 'LazyImportTest') -> None:
+        _output, log = check(self.source, '--import-depth', '-1', '--eager-imports',
+            modules={'helper.py': self.helper})
+        self.assertTrue(errors(log, 3), log)
+        self.assertTrue(errors(log, 4, 'helper.py'), log)
+        self.assertTrue(errors(log, 7, 'helper.py'), log)
+
+
+# The imported modules are registered once, the builtin modules are also cached by name.
+@unittest.skipUnless(TYPESHED_DIR, 'the typeshed stubs are not found')
+class ImportTest(unittest.TestCase):
+    def test_repeated_builtin_import(self: 'ImportTest') -> None:
+        _output, log = check('import string\nimport string as s2\n'
+            'x = string.ascii_letters\nx = 1\ny = s2.ascii_letters\ny = 1\n', '--import-depth', '-1')
+        self.assertTrue(errors(log, 4), log)
+        self.assertTrue(errors(log, 6), log)
+
+    def test_failed_import(self: 'ImportTest') -> None:
+        output, _log = check('import helper\nimport helper as h2\n', '-d', '--import-depth', '-1',
+            modules={'helper.py': 'def f(:\n    pass\n'})
+        self.assertIn("registered modules: {'pending': 0, 'in-progress': 0, 'done': 1, 'failed': 1}", output)
+
+
+# The imports are resolved on immutable search paths, the interpreter's sys.path isn't changed.
+class SearchPathTest(unittest.TestCase):
+    def test_resolution_cache(self: 'SearchPathTest') -> None:
+        from PyProb.imports_handler import resolveFiles, RESOLVED_FILES
+        from PyProb.search_path import SearchPath
+        with tempfile.TemporaryDirectory() as first, tempfile.TemporaryDirectory() as second:
+            for directory in (first, second):
+                open(os.path.join(directory, 'resolved.py'), 'w').close()
+            path = SearchPath([first, first])
+            self.assertEqual(tuple(path), (first, ))
+            self.assertIs(path.insert(0, second), path.insert(0, second))
+            self.assertEqual(resolveFiles('resolved', path), [os.path.join(first, 'resolved.py')])
+            self.assertIn((path, 'resolved'), RESOLVED_FILES)
+            # a cached resolution isn't looked up on the disk again.
+            RESOLVED_FILES[(path, 'resolved')] = ['cached']
+            self.assertEqual(resolveFiles('resolved', path), ['cached'])
+            self.assertEqual(resolveFiles('resolved', path.insert(0, second)),
+                [os.path.join(second, 'resolved.py'), os.path.join(first, 'resolved.py')])
+
+    def test_interpreter_module(self: 'SearchPathTest') -> None:
+        from PyProb.imports_handler import importModule
+        from PyProb.search_path import SearchPath
+        with tempfile.TemporaryDirectory() as directory:
+            with open(os.path.join(directory, 'pyprob_path_probe.py'), 'w') as module:
+                module.write('import sys\nSEEN_PATH = list(sys.path)\n')
+            syspath = list(sys.path)
+            try:
+                module = importModule('pyprob_path_probe', SearchPath([directory]))
+            finally:
+                sys.modules.pop('pyprob_path_probe', None)
+            self.assertEqual(module.SEEN_PATH, syspath)
+            self.assertEqual(sys.path, syspath)
+            with self.assertRaises(ModuleNotFoundError):
+                importModule('pyprob_path_probe', SearchPath())
+
+
+# The import policies skip the imported sources, their names are Any and the results list the reasons.
+@unittest.skipUnless(TYPESHED_DIR, 'the typeshed stubs are not found')
+class ImportPolicyTest(unittest.TestCase):
+    modules = {'helper.py': 'x = 1\n', 'pkg/__init__.py': '', 'pkg/sub.py': 'x = 1\n'}
+    source = 'from helper import x\nx = "s"\nfrom pkg.sub import x as y\ny = "s"\n'
+
+    def test_import_depth(self: 'ImportPolicyTest') -> None:
+        results = checkResults(self.source, modules=self.modules)
+        self.assertIn('helper.py\nSkipped! (import depth 0)', results)
+        _output, log = check(self.source, modules=self.modules)
+        self.assertFalse(errors(log, 2), log)
+        _output, log = check(self.source, '--import-depth', '-1', modules=self.modules)
+        self.assertTrue(errors(log, 2), log)
+
+    def test_skip_package(self: 'ImportPolicyTest') -> None:
+        results = checkResults(self.source, '--import-depth', '-1', '--skip-package', 'pkg', modules=self.modules)
+        self.assertIn('sub.py\nSkipped! (package pkg)', results)
+        self.assertIn('helper.py\nChecked!', results)
+        _output, log = check(self.source, '--import-depth', '-1', '--skip-package', 'pkg', modules=self.modules)
+        self.assertTrue(errors(log, 2), log)
+        self.assertFalse(errors(log, 4), log)
+
+    def test_project_imports(self: 'ImportPolicyTest') -> None:
+        results = checkResults('import string\n' + self.source, '--import-depth', '-1', '--project-imports',
+            modules=self.modules)
+        self.assertIn('string.py\nSkipped! (outside project)', results)
+        self.assertIn('helper.py\nChecked!', results)
+
+
+# The names of the enclosing scopes are looked up by the cached depth of the defining scope,
+# a write of a new name to an enclosing scope invalidates the cached lookups under it.
+class NamespaceTest(unittest.TestCase):
+    def test_cached_lookup(self: 'NamespaceTest') -> None:
+        from PyProb.namespace import Namespace, getLookupStats
+        top = Namespace('global', None)
+        top['x'] = 1
+        scopes = [top]
+        for depth in range(20):
+            scopes.append(Namespace('f{}'.format(depth), scopes[-1]))
+        inner = scopes[-1]
+        self.assertIs(inner.lookup('x'), top)
+        hits = getLookupStats()['hits']
+        self.assertIs(inner.lookup('x'), top)
+        self.assertEqual(getLookupStats()['hits'], hits + 1)
+        # updating the name keeps the cached lookup.
+        top['x'] = 2
+        self.assertIs(inner.lookup('x'), top)
+        self.assertEqual(getLookupStats()['hits'], hits + 2)
+        # the new name of an outer scope shadows the global name.
+        misses = getLookupStats()['misses']
+        scopes[5]['x'] = 3
+        self.assertIs(inner.lookup('x'), scopes[5])
+        self.assertEqual(getLookupStats()['misses'], misses + 1)
+        del scopes[5]['x']
+        self.assertIs(inner.lookup('x'), top)
+        self.assertIsNone(inner.lookup('y'))
+
+    def test_copy_on_write(self: 'NamespaceTest') -> None:
+        from PyProb.namespace import Namespace
+        top = Namespace('global', None)
+        context = Namespace('f.<locals>', top)
+        call = context.copy_on_write()
+        nested = Namespace('g.<locals>', call)
+        self.assertIsNone(nested.lookup('x'))
+        context['x'] = 1
+        self.assertIs(nested.lookup('x'), call)
+        call['x'] = 2
+        self.assertEqual(context['x'], 1)
+        self.assertEqual(nested.lookup('x')['x'], 2)
+
+
+# The function calls are summarized per abstract signature of the arguments, the least recently
+# used summaries are dropped past the summary size.
+@unittest.skipUnless(TYPESHED_DIR, 'the typeshed stubs are not found')
+class SummaryTest(unittest.TestCase):
+    source = 'def f(x):\n    return x\na = f(1)\na = "s"\nb = f("s")\nb = 1\nc = f(1)\nc = "s"\n'
+
+    def test_signatures(self: 'SummaryTest') -> None:
+        output, log = check(self.source, '-d')
+        self.assertTrue(errors(log, 4), log)
+        self.assertTrue(errors(log, 6), log)
+        self.assertTrue(errors(log, 8), log)
+        self.assertIn("function summaries: {'hits': 1, 'misses': 3, 'evictions': 0}", output)
+
+    def test_eviction(self: 'SummaryTest') -> None:
+        output, log = check(self.source, '-d', '--summary-size', '1')
+        self.assertTrue(errors(log, 8), log)
+        self.assertIn("function summaries: {'hits': 0, 'misses': 4, 'evictions': 2}", output)
+
+    # the type objects are created again per lookup, they're keyed by their definitions.
+    def test_definition_keys(self: 'SummaryTest') -> None:
+        from PyProb import summary
+
+        class Defined(object):
+            def __init__(self: 'Defined', site: tuple) -> None:
+                self.site = site
+
+        class Object(object):
+            def __init__(self: 'Object', class_: Defined) -> None:
+                self.class_ = class_
+
+        class Callable(object):
+            def check_call(self: 'Callable', args: list, *probs: tuple) -> None:
+                pass
+
+        site = ('m.py', 1, 'C')
+        self.assertEqual(summary.signature([Object(Defined(site))], ()),
+            summary.signature([Object(Defined(site))], ()))
+        self.assertNotEqual(summary.signature([Object(Defined(site))], ()),
+            summary.signature([Object(Defined(('m.py', 2, 'C')))], ()))
+        # an object without a definition isn't summarized.
+        self.assertIsNone(summary.signature([Callable()], ()))
+
+
+# The recursive components of the call graph are checked together, the passes of the component
+# read the summaries of the earlier pass until they don't change.
+@unittest.skipUnless(TYPESHED_DIR, 'the typeshed stubs are not found')
+class RecursionTest(unittest.TestCase):
+    def test_mutual_recursion(self: 'RecursionTest') -> None:
+        output, log = check('def even(n):\n    if n == 0:\n        return True\n    return odd(n - 1)\n'
+            'def odd(n):\n    if n == 0:\n        return False\n    return even(n - 1)\n'
+            'r = even(4)\nr = 1\n', '-d', '--reachable-only')
+        self.assertIn("recursive components: {'components': 1, 'passes': 2}", output)
+        self.assertIn("'r':type:ProbType{<class 'PyProb.builtins.data_types.Bool'>:1.0} with type:type.inttype",
+            '\n'.join(errors(log, 10)))
+
+
+# The nodes are converted through the dispatch table of their AST classes, a node only falls back
+# to the lookup by its class name when it's already converted.
+@unittest.skipUnless(TYPESHED_DIR, 'the typeshed stubs are not found')
+class ConvertTest(unittest.TestCase):
+    def test_dispatch_table(self: 'ConvertTest') -> None:
+        import ast
+        from PyProb import nodes
+        self.assertIs(nodes.NODE_TABLE[ast.BinOp], nodes.BinOp)
+        self.assertIs(nodes.NODE_TABLE[ast.ClassDef], nodes.ClassDef)
+        self.assertIn(ast.Num, nodes.NODE_TABLE)
+
+    def test_no_fallbacks(self: 'ConvertTest') -> None:
+        output, log = check('def f(a, *args, b=2, **kw):\n'
+            '    return [i * 2 for i in range(a) if i] + list({k: v for k, v in kw.items()})\n'
+            'z = lambda q: q + 1\ns = {1, 2} | {3}\nt = (1, "a")[0] if z(1) else -1\n'
+            'del s\nf(2)\n', '-d')
+        self.assertNotIn('Traceback', output)
+        self.assertIn("node conversions: {'fallbacks': 0, 'unsupported': 0, 'bodies': 1}", output)
+
+    # the name of the exception handler is converted before its body.
+    def test_converted_fallback(self: 'ConvertTest') -> None:
+        output, log = check('try:\n    x = 1\nexcept OSError as e:\n    x = str(e)\n', '-d')
+        self.assertIn("node conversions: {'fallbacks': 1, 'unsupported': 0,", output)
+
+
+# The subtype relation between the builtin data types is read from the precomputed table, and the
+# conversions of the instances are memoized by their classes.
+class SubtypeTest(unittest.TestCase):
+    def test_table_hits(self: 'SubtypeTest') -> None:
+        from PyProb import util1
+        from PyProb.builtins import data_types
+        before = util1.getSubtypeStats()
+        self.assertTrue(util1.issub(data_types.Float(), data_types.Int()))
+        self.assertFalse(util1.issub(data_types.Int(), data_types.Float()))
+        self.assertFalse(util1.issub(data_types.Str(), data_types.Int()))
+        self.assertTrue(util1.issub(data_types.Bool(), data_types.Any()))
+        after = util1.getSubtypeStats()
+        self.assertEqual(after['hits'] - before['hits'], 4)
+        self.assertEqual(after['misses'], before['misses'])
+
+    # the table agrees with the ranks of the builtin data types.
+    def test_table_ranks(self: 'SubtypeTest') -> None:
+        from PyProb import util1
+        for left in util1.data_type[1:]:
+            for right in util1.data_type[1:]:
+                lrank, rrank = util1.RANKS[left], util1.RANKS[right]
+                self.assertEqual(util1.SUBTYPE_TABLE[(left, right)],
+                    lrank >= rrank and (lrank < 5 or rrank > 4), (left, right))
+
+    def test_memoized_conversions(self: 'SubtypeTest') -> None:
+        from PyProb import util1
+        from PyProb.builtins import data_types
+        self.assertIs(util1.convertType(data_types.Int()), data_types.IntType)
+        conversions = util1.getSubtypeStats()['conversions']
+        self.assertIs(util1.convertType(data_types.Int()), data_types.IntType)
+        self.assertEqual(util1.getSubtypeStats()['conversions'], conversions)
+
+
+# The unions of the same members and probabilities are interned, the derived unions are new ones.
+class UnionInternTest(unittest.TestCase):
+    def test_equal_unions(self: 'UnionInternTest') -> None:
+        from PyProb import types
+        from PyProb.builtins import data_types
+        union = types.Union(None, [data_types.Int(), data_types.Str()], [0.25, 0.75])
+        hits = types.getUnionStats()['hits']
+        self.assertIs(types.Union(None, [data_types.Str(), data_types.Int()], [0.75, 0.25]), union)
+        self.assertEqual(types.getUnionStats()['hits'], hits + 1)
+        self.assertIsNot(types.Union(None, [data_types.Int(), data_types.Str()], [0.5, 0.5]), union)
+
+    def test_derived_union(self: 'UnionInternTest') -> None:
+        from PyProb import types
+        from PyProb.builtins import data_types
+        union = types.Union(None, [data_types.Int(), data_types.Str()], [0.25, 0.75])
+        elts, prob = union.elts, union.prob
+        derived = union.appended([data_types.Float()])
+        self.assertIsNot(derived, union)
+        self.assertEqual(len(derived.elts), 3)
+        self.assertIs(union.elts, elts)
+        self.assertEqual(union.prob, prob)
+        with self.assertRaises(ValueError):
+            union.probs[0] = 1.0
+        self.assertIs(types.Union(None, [data_types.Int(), data_types.Str()], [0.25, 0.75]), union)
+
+    # the members and the probabilities of a shared union can't be replaced.
+    def test_read_only(self: 'UnionInternTest') -> None:
+        from PyProb import types
+        from PyProb.builtins import data_types
+        union = types.Union(None, [data_types.Bytes(), data_types.Str()], [0.5, 0.5])
+        with self.assertRaises(AttributeError):
+            union.elts = (data_types.Bytes(), )
+        with self.assertRaises(AttributeError):
+            union.prob = (1.0, )
+        self.assertIs(types.Union(None, [data_types.Bytes(), data_types.Str()], [0.5, 0.5]), union)
+
+
+# The frequent type classes keep their fields in slots, their objects don't have a dict.
+class TypeSlotsTest(unittest.TestCase):
+    def test_no_dict(self: 'TypeSlotsTest') -> None:
+        from PyProb import types
+        from PyProb.builtins import data_types
+        intersection = types.Intersection(None, data_types.Int(), data_types.Str())
+        self.assertFalse(hasattr(intersection, '__dict__'))
+        self.assertEqual(len(intersection.types), 2)
+
+    def test_slotted_classes(self: 'TypeSlotsTest') -> None:
+        from PyProb import types
+        from PyProb.builtins.functions import BuiltinFunction
+        for class_ in (types.Function, types.Method, types.ExceptType, types.Intersection, BuiltinFunction):
+            self.assertEqual(class_.__dictoffset__, 0, class_)
+
+
+# The frequent node classes keep their fields in slots, the converted nodes don't have a dict.
+class NodeSlotsTest(unittest.TestCase):
+    def test_converted_nodes(self: 'NodeSlotsTest') -> None:
+        import ast
+        from PyProb import nodes
+        from PyProb.namespace import Namespace, TypeMap
+        type_map = TypeMap(Namespace('global', None))
+        assign = nodes.convert(type_map, ast.parse('x = y').body[0])
+        function = nodes.convert(type_map, ast.parse('def f(a):\n    if a:\n        return a.b[0]\n'
+            '    return g(a)\n').body[0])
+        if_, return_ = function.body
+        converted = [assign, assign.targets[0], assign.value, function, if_, if_.test,
+            if_.body[0], if_.body[0].value, if_.body[0].value.value, return_, return_.value]
+        self.assertEqual([type(node).__name__ for node in converted], ['Assign', 'Name', 'Name',
+            'FunctionDef', 'If', 'Name', 'Return', 'Subscript', 'Attribute', 'Return', 'Call'])
+        for node in converted:
+            self.assertFalse(hasattr(node, '__dict__'), node)
+
+
+# The class attributes are resolved along the C3 linearization, in a diamond the sibling base
+# comes before the common base.
+@unittest.skipUnless(TYPESHED_DIR, 'the typeshed stubs are not found')
+class ClassResolutionTest(unittest.TestCase):
+    def test_diamond(self: 'ClassResolutionTest') -> None:
+        output, log = check('class A(object):\n    def f(self):\n        return 1\n'
+            'class B(A):\n    pass\nclass C(A):\n    def f(self):\n        return "s"\n'
+            'class D(B, C):\n    pass\nx = D().f()\nx = 1\ny = B().f()\ny = "s"\n', '-d')
+        self.assertIn("'x':type:type.strtype with type:type.inttype", '\n'.join(errors(log, 12)))
+        self.assertIn("'y':type:type.inttype with type:type.strtype", '\n'.join(errors(log, 14)))
+        self.assertIn("class attribute lookups: {'hits': 4, 'misses': 6, 'linearizations': 4}", output)
+
+
+# The builtin data types share one object per type, the writes of its attributes are dropped
+# and counted. A mutable object of the type is private.
+class FlyweightTest(unittest.TestCase):
+    def test_shared(self: 'FlyweightTest') -> None:
+        from PyProb.builtins import data_types
+        self.assertIs(data_types.Int(), data_types.Int())
+        self.assertIs(data_types.IntType(), data_types.IntType())
+        self.assertTrue(data_types.isFlyweight(data_types.Str()))
+
+    def test_dropped_write(self: 'FlyweightTest') -> None:
+        from PyProb.builtins import data_types
+        shared = data_types.Any()
+        dropped = data_types.getFlyweightStats()['dropped']
+        shared.set_attribute('v', data_types.Int())
+        self.assertEqual(data_types.getFlyweightStats()['dropped'], dropped + 1)
+        self.assertIs(data_types.Any(), shared)
+        self.assertNotIn('v', shared.attributes)
+
+    def test_mutable(self: 'FlyweightTest') -> None:
+        from PyProb.builtins import data_types
+        private = data_types.Any.mutable()
+        self.assertIsNot(private, data_types.Any())
+        self.assertFalse(data_types.isFlyweight(private))
+        dropped = data_types.getFlyweightStats()['dropped']
+        private.set_attribute('v', data_types.Int())
+        self.assertEqual(data_types.getFlyweightStats()['dropped'], dropped)
+        self.assertIn('v', private.attributes)
+        self.assertNotIn('v', data_types.Any().attributes)
+
+    @unittest.skipUnless(TYPESHED_DIR, 'the typeshed stubs are not found')
+    def test_checked_write(self: 'FlyweightTest') -> None:
+        output, log = check('def f(a):\n    a.v = 1\n    return a.v\nr = f(g)\n', '-d')
+        self.assertIn("builtin flyweights: {", output)
+        self.assertIn("'dropped': 1}", output)
+
+
+# The function bodies are converted on their first use. The annotated functions are checked at
+# their definitions, unless only the called functions are checked.
+@unittest.skipUnless(TYPESHED_DIR, 'the typeshed stubs are not found')
+class LazyBodyTest(unittest.TestCase):
+    source = ('def g(a: int) -> int:\n    y = 1\n    y = "s"\n    return a\n'
+        'def k(a: int) -> int:\n    z = 1\n    z = "s"\n    return a\nk(1)\n')
+
+    def test_eager_definitions(self: 'LazyBodyTest') -> None:
+        output, log = check(self.source)
+        self.assertTrue(errors(log, 3), log)
+        self.assertTrue(errors(log, 7), log)
+
+    def test_reachable_only(self: 'LazyBodyTest') -> None:
+        output, log = check(self.source, '--reachable-only')
+        self.assertFalse(errors(log, 3), log)
+        self.assertTrue(errors(log, 7), log)
+
+    # the body of an async function that isn't called isn't converted.
+    def test_async_bodies(self: 'LazyBodyTest') -> None:
+        output, log = check('async def f(a):\n    x = 1\n    x = "s"\n    return a\n'
+            'async def h(a):\n    w = 1\n    w = "s"\n    return a\nr = f(1)\n', '-d')
+        self.assertIn("node conversions: {'fallbacks': 0, 'unsupported': 0, 'bodies': 1}", output)
+        self.assertTrue(errors(log, 3), log)
+        self.assertFalse(errors(log, 7), log)
+
+
+# The work beyond a budget degrades to Any, a note is logged for the function.
+@unittest.skipUnless(TYPESHED_DIR, 'the typeshed stubs are not found')
+class BudgetTest(unittest.TestCase):
+    def test_function_nodes(self: 'BudgetTest') -> None:
+        body = ''.join('    x{} = 1\n'.format(i) for i in range(50))
+        source = 'def f():\n' + body + '    return x0\ny = f()\ny = "s"\n'
+        _output, log = check(source)
+        self.assertTrue(errors(log, 54), log)
+        _output, log = check(source, '--max-function-nodes', '10')
+        self.assertIn("[BudgetExceeded] budget:nodes limit:10 function:'f'", log)
+        self.assertFalse(errors(log, 54), log)
+
+    def test_call_depth(self: 'BudgetTest') -> None:
+        _output, log = check('def f():\n    return 1\ndef g():\n    return f()\n'
+            'z = g()\nz = "s"\ny = f()\ny = "s"\n', '--max-call-depth', '1')
+        self.assertIn("[BudgetExceeded] budget:calls limit:1 function:'f'", log)
+        self.assertFalse(errors(log, 6), log)
+        self.assertTrue(errors(log, 8), log)
+
+
+# The attributes of the union members are resolved on every member, calling the union calls
+# every callable member. The attributes of the classes are cached per checked module.
+class MemberAttributeTest(unittest.TestCase):
+    @unittest.skipUnless(TYPESHED_DIR, 'the typeshed stubs are not found')
+    def test_union_call(self: 'MemberAttributeTest') -> None:
+        output, log = check('import random\nclass C(object):\n    def __init__(self):\n        self.v = 1\n'
+            'class B(object):\n    upper = C\ndef h():\n    if random.random() > 0.5:\n        return "s"\n'
+            '    return B()\nr = h().upper()\nr = 1\n', '-d')
+        self.assertIn("'r':type:ProbType{<class 'PyProb.builtins.data_types.Str'>:0.5,C object:0.5}",
+            '\n'.join(errors(log, 12)))
+
+    def test_cleared(self: 'MemberAttributeTest') -> None:
+        from PyProb import types
+        from PyProb.builtins import data_types
+        union = types.Union(None, [data_types.Str(), data_types.Int()], [0.5, 0.5])
+        union.get_attribute('__add__')
+        before = types.getMemberAttributeStats()
+        union.get_attribute('__add__')
+        cached = types.getMemberAttributeStats()
+        self.assertEqual(cached['hits'], before['hits'] + 2)
+        types.clearMemberAttributes()
+        self.assertFalse(types.MEMBER_ATTRIBUTES)
+        union.get_attribute('__add__')
+        cleared = types.getMemberAttributeStats()
+        self.assertEqual(cleared['hits'], cached['hits'])
+        self.assertEqual(cleared['misses'], cached['misses'] + 2)
+
+
+# The unions keep their most probable members with the pruning options, the dropped members aren't reported.
+@unittest.skipUnless(TYPESHED_DIR, 'the typeshed stubs are not found')
+class UnionPruningTest(unittest.TestCase):
+    source = ('import random\ndef h():\n    if random.random() > 0.5:\n        return "s"\n'
+        '    if random.random() > 0.5:\n        return 1\n    return None\nr = h()\nr.upper()\n')
+
+    def test_unpruned(self: 'UnionPruningTest') -> None:
+        output, log = check(self.source, '-d')
+        self.assertIn("pruned unions: {'unions': 0,", output)
+        self.assertEqual(len(errors(log, 9)), 2, log)
+
+    def test_top_k(self: 'UnionPruningTest') -> None:
+        output, log = check(self.source, '-d', '--union-top-k', '1')
+        self.assertIn("pruned unions: {'unions': 1, 'members': 2,", output)
+        self.assertFalse(errors(log, 9), log)
+
+    def test_min_prob(self: 'UnionPruningTest') -> None:
+        output, log = check(self.source, '-d', '--union-min-prob', '0.4')
+        self.assertIn("pruned unions: {'unions': 1, 'members': 2,", output)
+        self.assertFalse(errors(log, 9), log)
+
+
+# The binary operators between unions check every pair of the members at once, the consistent
+# results are grouped by their types with the summed probabilities of their pairs.
+class UnionBinopTest(unittest.TestCase):
+    def test_members(self: 'UnionBinopTest') -> None:
+        from PyProb import types, util
+        from PyProb.builtins import data_types
+        left = types.Union(None, [data_types.Int(), data_types.Bool(), data_types.Str()], [0.5, 0.3, 0.2])
+        right = types.Union(None, [data_types.Float(), data_types.Str()], [0.6, 0.4])
+        before = util.getBinopStats()
+        result = util.binop_check(left, right, '__add__')
+        self.assertEqual(result.elts, (data_types.FloatType, data_types.StrType))
+        # the float results of int and bool, 0.3 + 0.18, and the str result, 0.08.
+        self.assertAlmostEqual(result.prob[0], 0.48 / 0.56)
+        self.assertAlmostEqual(result.prob[1], 0.08 / 0.56)
+        after = util.getBinopStats()
+        self.assertEqual(after['table'], before['table'] + 6)
+        self.assertEqual(after['slow'], before['slow'])
+
+    def test_class_with_instance(self: 'UnionBinopTest') -> None:
+        from PyProb import types, util
+        from PyProb.builtins import data_types
+        union = types.Union(None, [data_types.Int, data_types.Str()], [0.5, 0.5])
+        self.assertIs(util.binop_check(union, data_types.Int(), '__add__'), data_types.Int)
+
+    def test_inconsistent(self: 'UnionBinopTest') -> None:
+        from PyProb import types, util
+        from PyProb.builtins import data_types
+        union = types.Union(None, [data_types.Int(), data_types.Float()], [0.5, 0.5])
+        self.assertEqual(util._union_binop(union, data_types.Str(), '__add__'), 'TypeError')
+
+
+# The binary operators between the builtin data types are looked up in the result table, the other
+# operands take the slow path.
+@unittest.skipUnless(TYPESHED_DIR, 'the typeshed stubs are not found')
+class BinopTableTest(unittest.TestCase):
+    def test_table_hits(self: 'BinopTableTest') -> None:
+        output, log = check('a = 1 + 2.0\nb = "s" + "t"\nc = 1 + "s"\nd = [1] + [2]\n', '-d')
+        self.assertIn("binary operator checks: {'table': 3, 'slow': 1}", output)
+        self.assertFalse(errors(log, 1), log)
+        self.assertFalse(errors(log, 2), log)
+        self.assertTrue(errors(log, 3), log)
+
+    # the table holds the results of the slow path.
+    def test_table_results(self: 'BinopTableTest') -> None:
+        from PyProb import util
+        for op_name, table in util.binop_table.items():
+            for lidx, ltype in enumerate(util.builtin_types):
+                for ridx, rtype in enumerate(util.builtin_types):
+                    self.assertEqual(repr(table[lidx][ridx]), repr(util._converted_binop(ltype, rtype, op_name)))
+
+
+# The element types of the list literals are deduplicated unless the literal is unpacked by position.
+@unittest.skipUnless(TYPESHED_DIR, 'the typeshed stubs are not found')
+class ElementTypesTest(unittest.TestCase):
+    def test_unpacked_list(self: 'ElementTypesTest') -> None:
+        _output, log = check('a, b, c = [1, 1, "x"]\n'
+            'for d, e, f in [[1, 1, "x"]]:\n    pass\n[g, h, i] = [1, 1, "x"]\n')
+        self.assertNotIn('ERROR', log)
+
+    def test_unbounded(self: 'ElementTypesTest') -> None:
+        _output, log = check('a, b, c = [1, 1, "x"]\n', '--max-element-types', '-1')
+        self.assertNotIn('ERROR', log)
+
+
+# The large literals of constants are checked from one element of each shape.
+@unittest.skipUnless(TYPESHED_DIR, 'the typeshed stubs are not found')
+class LiteralSummaryTest(unittest.TestCase):
+    def test_summarized(self: 'LiteralSummaryTest') -> None:
+        elements = ', '.join('{}, "{}"'.format(i, i) for i in range(50))
+        source = 'big = [{}]\nfor v in big:\n    v.upper()\n'.format(elements)
+        output, log = check(source, '-d')
+        self.assertIn("summarized literals: {'containers': 1, 'skipped': 98}", output)
+        self.assertTrue(errors(log, 2), log)
+        output, log = check(source, '-d', '--summarize-literals', '-1')
+        self.assertIn("summarized literals: {'containers': 0, 'skipped': 0}", output)
+        self.assertTrue(errors(log, 2), log)
+
+    def test_constant_elements(self: 'LiteralSummaryTest') -> None:
+        elements = ', '.join(str(i) for i in range(100))
+        output, log = check('big = [{}]\nfor v in big:\n    v.upper()\n'.format(elements), '-d')
+        self.assertIn("summarized literals: {'containers': 1, 'skipped': 99}", output)
+        self.assertTrue(errors(log, 3), log)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -10,8 +10,13 @@ import logging
 from typing import Dict as DictType, Set as SetType, Any as AnyType, List as ListType, Tuple as TupleType, Union as UnionType, Optional as OptionalType
 
 from .exceptions import (NoSuchAttribute, NotCallable, NotYetSupported, WrongArgumentsLength)
+from . import summary
+from . import budget
+import copy
 import functools
 import sys
+import weakref
+import numpy as np
 import collections
 import operator
 debug = logging.debug
@@ -36,14 +41,162 @@ base_op_methods: SetType[str] = {
 }  # type: Final
 
 FUNCTION_FLAG: bool = False
+
+# layered attribute table of a type object.
+# The object's own attributes are stored in the dict, the shared layers are looked up after them
+# and never written. The values of a fresh table are copied on first read, so they keep their own state.
+# The table of a shared object doesn't keep the copies, every read gets its own.
+class Attributes(dict):
+    __slots__ = ('layers', 'fresh', 'memo')
+
+    def __init__(self: 'Attributes', layers: TupleType = (), fresh: bool = False, memo: bool = True) -> None:
+        super().__init__()
+        self.layers = layers
+        self.fresh = fresh
+        self.memo = memo
+
+    # add the shared layer, it shadows the layers added before it.
+    def add_layer(self: 'Attributes', layer: DictType) -> None:
+        self.layers = (layer, ) + self.layers
+
+    # return a table with the same layers and a copy of the own attributes.
+    def derive(self: 'Attributes') -> 'Attributes':
+        table = Attributes(self.layers, self.fresh, self.memo)
+        dict.update(table, self)
+        return table
+
+    def __missing__(self: 'Attributes', name: str) -> AnyType:
+        for layer in self.layers:
+            if name in layer:
+                value = layer[name]
+                if self.fresh:
+                    value = _fresh_copy(value)
+                    if self.memo:
+                        dict.__setitem__(self, name, value)
+                return value
+        raise KeyError(name)
+
+    def __contains__(self: 'Attributes', name: str) -> bool:
+        if dict.__contains__(self, name):
+            return True
+        for layer in self.layers:
+            if name in layer:
+                return True
+        return False
+
+    def get(self: 'Attributes', name: str, default: AnyType = None) -> AnyType:
+        try:
+            return self[name]
+        except KeyError:
+            return default
+
+    def setdefault(self: 'Attributes', name: str, default: AnyType = None) -> AnyType:
+        if name not in self:
+            self[name] = default
+        return self[name]
+
+    # a shared attribute is removed from the materialized copy of the table.
+    def pop(self: 'Attributes', name: str, *default: AnyType) -> AnyType:
+        if not dict.__contains__(self, name) \
+            and name in self:
+            self.materialize()
+        return dict.pop(self, name, *default)
+
+    def __delitem__(self: 'Attributes', name: str) -> None:
+        if not dict.__contains__(self, name) \
+            and name in self:
+            self.materialize()
+        dict.__delitem__(self, name)
+
+    # copy the attributes of the shared layers into the table.
+    def materialize(self: 'Attributes') -> None:
+        for name in list(self):
+            if not dict.__contains__(self, name):
+                dict.__setitem__(self, name, self[name])
+        self.layers = ()
+
+    def __iter__(self: 'Attributes') -> AnyType:
+        yield from dict.__iter__(self)
+        seen = set(dict.keys(self))
+        for layer in self.layers:
+            for name in layer:
+                if name not in seen:
+                    seen.add(name)
+                    yield name
+
+    def __len__(self: 'Attributes') -> int:
+        if not self.layers:
+            return dict.__len__(self)
+        return sum(1 for _ in self)
+
+    def __bool__(self: 'Attributes') -> bool:
+        return dict.__len__(self) > 0 or any(self.layers)
+
+    def keys(self: 'Attributes') -> ListType:
+        return list(self)
+
+    def values(self: 'Attributes') -> ListType:
+        return [self[name] for name in self]
+
+    def items(self: 'Attributes') -> ListType:
+        return [(name, self[name]) for name in self]
+
+    def copy(self: 'Attributes') -> DictType:
+        return dict(self.items())
+
+# return a copy of the shared attribute value for a fresh table.
+# Classes and interned unions are values, the other types get their own state.
+def _fresh_copy(value: AnyType) -> AnyType:
+    if isinstance(value, type) \
+        or isinstance(value, Union) \
+        or not isinstance(value, BaseType):
+        return value
+    clone = copy.copy(value)
+    attributes = getattr(value, 'attributes', None)
+    if isinstance(attributes, Attributes):
+        clone.attributes = attributes.derive()
+    elif isinstance(attributes, dict):
+        clone.attributes = dict(attributes)
+    for name in ('elts', 'key_types', 'value_types'):
+        field = getattr(value, name, None)
+        if isinstance(field, list):
+            setattr(clone, name, list(field))
+    return clone
+
+# add the shared layer to the attributes of the type object.
+# The class namespaces look the layers up as fallbacks, plain dicts get a copy.
+def _add_layer(attributes: DictType, layer: DictType) -> None:
+    if isinstance(attributes, Attributes):
+        attributes.add_layer(layer)
+    elif hasattr(attributes, 'add_fallback'):
+        if not any(table is layer for table in attributes.fallbacks):
+            attributes.add_fallback(layer)
+    else:
+        attributes.update(layer)
+
+# the fields shared by the type objects and the checker nodes, the type map and the cached check result.
+class Checkable(object):
+    __slots__ = ('type_map', '_ckd_result')
+
 # Base class of our builtin types, and we define common interface such as get_attribute and set_attribute.
-class BaseType:
+# attributes and prob aren't slots of the base class, the builtin type classes are used as types and are
+# looked up for them. So are Class, Union and the container classes, their fields stay in the instance
+# dict, the other frequent type classes list all their fields in slots.
+class BaseType(Checkable):
+    __slots__ = ('__weakref__', )
+    # the definition site of the type object, the summaries key the arguments on it.
+    site = None
+
     def __init__(self: 'BaseType', type_map: DictType, attributes: DictType = None) -> None:
         self.type_map = type_map
-        self.attributes = attributes or {}
         self.prob = -1
         from .comp_types_attrs import basic_attributes
-        self.attributes.update(basic_attributes)
+        if not attributes:
+            # the basic attributes are shared, the object only stores its own attributes.
+            self.attributes = Attributes((basic_attributes, ))
+        else:
+            self.attributes = attributes
+            _add_layer(self.attributes, basic_attributes)
 
         # Cache the check_call return result to avoid duplicate function call.
         self._ckd_result = None
@@ -74,7 +227,8 @@ class BaseType:
                     logging.error("[AttributeError] %r has no attribute [%r] in file:[[%r:%d]] <<%f>>",\
                          self, name, config.getFileName(), config.getLineNo(), 1 - prob)
                 self.set_attribute(name, Any())
-                return self.attributes[name]
+                # the shared builtin objects don't keep the written attributes.
+                return self.attributes.get(name, Any())
             modname = config.getFileName().split(sep)[-1] 
             if modname in sys.builtin_module_names or \
             modname.startswith('_frozen'): 
@@ -151,6 +305,8 @@ class Module(BaseType):
 
 # excepttype of the except clauses.
 class ExceptType(BaseType):
+    __slots__ = ('attributes', 'prob')
+
     def __init__(self: 'ExceptType', type_map: DictType) -> None:
         super().__init__(type_map)
 
@@ -214,17 +370,23 @@ def _merge_return_type(rt: BaseType, rtlists: ListType):
 
 # Function type of the Function node in the nodes module.
 class Function(BaseType):
+    __slots__ = ('attributes', 'prob', 'func_def', 'context', 'name', 'location', 'lineno',
+        'col_offset', 'params', 'ptargs', 'defaults', 'kw_defaults', 'kwarg', 'kwonlyargs',
+        'vararg', 'dec_list', 'anno_args', 'func_params', 'return_anno_type', 'return_type',
+        'return_flag', 'stmts_return_flag', 'lastReturn', 'summaries', '_classname')
+
     def __init__(self: 'Function', func_def: AST, type_map: DictType) -> None:
         super().__init__(type_map)
         # save neccesary fields of the function node.
         from .comp_types_attrs import function_attributes
-        self.attributes.update(function_attributes)
+        self.attributes.add_layer(function_attributes)
         
         self.name = func_def.name
         self.location = func_def.location
         self.params = func_def.params
+        self.func_params = list(func_def.params)
         self.ptargs = func_def.ptargs
-        self.body = func_def.body
+        self.func_def = func_def
         self.defaults = func_def.defaults
         self.kwarg = func_def.kwarg
         self.kwonlyargs = func_def.kwonlyargs
@@ -232,23 +394,152 @@ class Function(BaseType):
         self.vararg = func_def.vararg
         self.context = type_map.build_context_for(self.name)
         self.return_type = func_def.return_type
-        self.returns = func_def.returns
         self.dec_list = func_def.dec_list
         self.return_anno_type = func_def.return_anno_type
         self.return_flag = func_def.return_flag
         self.lastReturn = func_def.lastReturn
         self.anno_args = func_def.anno_args
         self.lineno = func_def.lineno
+        self.col_offset = func_def.col_offset
         self.stmts_return_flag = func_def.stmts_return_flag
         if hasattr(func_def, '_classname'):
             self._classname = func_def._classname
+        self.summaries = summary.Summaries()
 
-    def check_call(self: 'Function', args: ListType, *probs: TupleType) -> AnyType:
-        # For performance, we cache the check_call result.
-        # If the checked result self._ckd_result is not None, we return it directly.
-        if self._ckd_result is not None:
-            return self._ckd_result
+    @property
+    def site(self: 'Function') -> TupleType:
+        return (self.location, self.lineno, self.col_offset, self.name)
+
+    # the body statements of the function node, it converts them on the first use.
+    @property
+    def body(self: 'Function') -> ListType:
+        return self.func_def.body
 
+    # For performance, we summarize the check_call results per abstract signature of the arguments.
+    def check_call(self: 'Function', args: ListType, *probs: TupleType) -> AnyType:
+        key = summary.signature(args, probs)
+        if key is not None:
+            from . import recursion
+            current = recursion.iteration(self)
+            if current is None \
+                or current.isFinished(self):
+                found, result = self.summaries.lookup(key)
+                if found:
+                    return result
+            elif current.isStarted(self):
+                # the recursive call in a pass of the component reads the summary of the earlier pass,
+                # the summaries of the functions not checked in the pass yet aren't used.
+                current.reads += 1
+                found, result = self.summaries.lookup(key)
+                return result if found else current.provisional(self)
+        if not budget.ACTIVE:
+            return self._summary_call(key, args, *probs)
+        # the call beyond the work budgets degrades to Any.
+        from .builtins.data_types import Any
+        if not budget.enterCall(self):
+            return Any()
+        try:
+            result = self._summary_call(key, args, *probs)
+        finally:
+            exceeded = budget.exitCall()
+        if exceeded:
+            result = Any()
+            if key is not None:
+                self.summaries.store(key, result)
+        return result
+
+    # check the call and store its summary.
+    # The body nodes cache the results of the previous call, they're cleared unless the previous call
+    # had the same signature. A call without a signature can't be compared, it always clears them.
+    # The signature is kept on the function node, the copies of the function share its body.
+    def _summary_call(self: 'Function', key: AnyType, args: ListType, *probs: TupleType) -> AnyType:
+        previous = getattr(self.func_def, '_body_signature', summary.UNCHECKED)
+        if previous is not summary.UNCHECKED \
+            and (key is None or key != previous):
+            self._reset_body()
+        self.func_def._body_signature = key
+        if key is not None:
+            from . import recursion
+            current = recursion.iteration(self)
+            if current is not None:
+                result = self._pass_call(current, key, args, *probs)
+                self.func_def._body_signature = key
+                return result
+            component = recursion.component(self)
+            if component is not None:
+                result = self._fixed_point(component, key, args, *probs)
+                self.func_def._body_signature = key
+                return result
+        result = self._check_call(args, *probs)
+        # a nested call of the function may have checked the body with its own signature.
+        self.func_def._body_signature = key
+        if key is not None:
+            self.summaries.store(key, result)
+        return result
+
+    # return the summary of the call without checking the function.
+    def summarized(self: 'Function', args: ListType, *probs: TupleType) -> TupleType:
+        key = summary.signature(args, probs)
+        if key is None:
+            return False, None
+        return self.summaries.lookup(key)
+
+    # check the recursive component of the function until its summaries don't change.
+    # The recursive calls get the summaries of the previous pass, starting from the empty type
+    # that the unions of the returned types drop. A component that never returns gets the return type.
+    def _fixed_point(self: 'Function', component: TupleType, key: TupleType, args: ListType, *probs: TupleType) -> AnyType:
+        from . import recursion
+        result = Union(self.type_map, [])
+        self.summaries.store(key, result)
+        # the passes report the same errors, they're logged once.
+        with recursion.PassLog() as log, recursion.Iteration(component) as current:
+            for idx in range(recursion.getMaxPasses()):
+                if idx:
+                    log.next_pass()
+                current.start_pass()
+                pass_args = list(args) if isinstance(args, list) else args
+                current.enter(self)
+                new_result = self._check_call(pass_args, *probs)
+                current.exit(self, new_result)
+                self.summaries.store(key, new_result)
+                # the pass didn't read a summary before computing it, or none of them changed.
+                if not current.reads \
+                    or not current.changed \
+                    and summary.sameSummary(result, new_result):
+                    break
+                result = new_result
+        if isinstance(new_result, Union) \
+            and not new_result.elts:
+            new_result = self.return_type
+            self.summaries.store(key, new_result)
+        return new_result
+
+    # check the function once in the pass of its component, the change of its summary
+    # makes the component checked again.
+    def _pass_call(self: 'Function', current: AnyType, key: TupleType, args: ListType, *probs: TupleType) -> AnyType:
+        found, previous = self.summaries.peek(key)
+        if not found:
+            self.summaries.store(key, Union(self.type_map, []))
+        current.enter(self)
+        result = self._check_call(args, *probs)
+        current.exit(self, result)
+        if not found \
+            or not summary.sameSummary(previous, result):
+            current.changed = True
+        self.summaries.store(key, result)
+        return result
+
+    # clear the cached check results of the body nodes.
+    def _reset_body(self: 'Function') -> None:
+        todo = list(self.body)
+        while todo:
+            node = todo.pop()
+            node._ckd_result = None
+            todo.extend(node.iter_child_nodes())
+
+    def _check_call(self: 'Function', args: ListType, *probs: TupleType) -> AnyType:
+        # the varargs and keyword-only parameters are added while checking a call.
+        self.params = list(self.func_params)
         from .nodes import Ellipsis, Expr, FunctionDef
         from .config import getFileName, getLineNo, setFileName
         from .error_condition import _filename_checking
@@ -263,8 +554,7 @@ class Function(BaseType):
             if isinstance(stmt, Ellipsis) \
                 or isinstance(stmt.value, Ellipsis):
                 setFileName(tmpFileName)
-                self._ckd_result = self.return_anno_type
-                return self._ckd_result
+                return self.return_anno_type
                 #return self.return_anno_type
         # handle the function arguemnts and parameters.
         tmp_args = args
@@ -291,8 +581,7 @@ class Function(BaseType):
                     logging.error(f"[Type Error]: argument: {arg_name} with type:{arg_type} not in parameters:{self.params} in file:{getFileName()}:{getLineNo()}")
                     setFileName(tmpFileName)
                     
-                    self._ckd_result = Any()
-                    return self._ckd_result
+                    return Any()
                     #return Any()
        
         if len(self.ptargs) < len(args) \
@@ -304,8 +593,7 @@ class Function(BaseType):
                 from .builtins.data_types import Any
                 logging.error(f"[Type Error]: positional arg:{[_a.arg for _a in self.ptargs]} is {len(self.ptargs)}, but passes {len(args)} in file:{getFileName()}:{getLineNo()}")
                 setFileName(tmpFileName)
-                self._ckd_result = Any()
-                return self._ckd_result
+                return Any()
                 #return Any()
         tmp_args = args
         # Different kinds of arguemnts.
@@ -331,8 +619,7 @@ class Function(BaseType):
                 logging.error("[MISPATCH ARGS NUM]wrong arguments length while calling function:%r,, param:%d, args:%d", self.name, len(self.params),\
                              len(args))
                 setFileName(tmpFileName)
-                self._ckd_result = self.return_type
-                return self._ckd_result
+                return self.return_type
                 #return self.return_type
         param_map = {}
         if self.defaults is not None:
@@ -437,7 +724,9 @@ class Function(BaseType):
         idx = 0
 
         for stmt in self.body:
-            
+            # the statements are counted in the nodes budget too, the rest of the body isn't checked beyond it.
+            if budget.ACTIVE and budget.exceeded():
+                break
             if isinstance(stmt, Assign):
                 # For assign statement, we don't cache the result.
                 stmt._ckd_result = None
@@ -501,11 +790,9 @@ class Function(BaseType):
             self.return_type = return_type
         elif len(ret_lists) > 1:
             setFileName(tmpFileName)
-            self._ckd_result = Union(self.type_map, ret_lists)
-            return self._ckd_result
+            return Union(self.type_map, ret_lists)
         setFileName(tmpFileName)
-        self._ckd_result = self.return_type
-        return self._ckd_result
+        return self.return_type
         #return self.return_type
 
     def __repr__(self: 'Function') -> str:
@@ -571,23 +858,108 @@ class LambdaFunction(BaseType):
         temp = '' if len(self.params) == 0 else ','.join([arg.arg+':'+repr(arg.retic_type) for arg in self.params])
         return self.name + '('+ temp +')'
 
+CLASS_STATS: DictType[str, int] = {'hits': 0, 'misses': 0, 'linearizations': 0}
+
+def getClassStats() -> DictType[str, int]:
+    return dict(CLASS_STATS)
+
+# return whether the class table defines the name itself. The shared builtin layers
+# are the attributes of the implicit object base, they are searched after the bases.
+def _defines(table: DictType, name: str) -> bool:
+    data = getattr(table, 'data', table)
+    if dict.__contains__(data, name):
+        return True
+    from .comp_types_attrs import basic_attributes, class_attributes
+    for layer in getattr(table, 'fallbacks', None) or getattr(table, 'layers', ()):
+        if layer is not basic_attributes \
+            and layer is not class_attributes \
+            and name in layer:
+            return True
+    return False
+
+# return whether the two lists hold the same objects, the classes are compared by identity.
+def _same_objects(items: ListType, others: OptionalType[ListType]) -> bool:
+    return others is not None \
+        and len(items) == len(others) \
+        and all(item is other for item, other in zip(items, others))
+
+# return the key a base is compared by, the other type objects of a base name are created per lookup.
+def _base_key(base: AnyType) -> AnyType:
+    return base if isinstance(base, Class) else type(base)
+
+# return the stamp of the attribute table of the class, it changes when the table gets or loses a name.
+def _table_stamp(cls: AnyType) -> AnyType:
+    table = cls.attributes
+    stamp = table.stamp() if hasattr(table, 'stamp') else 0
+    return (stamp, getattr(cls, '_attr_version', 0))
+
+# merge the linearizations of the bases, the C3 rule of the python classes.
+# Return None if the hierarchy is inconsistent.
+def _c3_merge(sequences: ListType[ListType]) -> OptionalType[ListType]:
+    sequences = [list(seq) for seq in sequences if seq]
+    result = []
+    while sequences:
+        for seq in sequences:
+            head = seq[0]
+            # the classes are compared by identity, Class equality is by python type.
+            if not any(cls is head for other in sequences for cls in other[1:]):
+                break
+        else:
+            return None
+        result.append(head)
+        for seq in sequences:
+            if seq[0] is head:
+                del seq[0]
+        sequences = [seq for seq in sequences if seq]
+    return result
+
+# the attributes a class gives to its instances, resolved through the class MRO.
+class _Inherited(object):
+    __slots__ = ('class_', )
+
+    def __init__(self: '_Inherited', class_: 'Class') -> None:
+        self.class_ = class_
+
+    def __contains__(self: '_Inherited', name: str) -> bool:
+        return self.class_.has_attribute(name)
+
+    def __getitem__(self: '_Inherited', name: str) -> AnyType:
+        return self.class_.lookup(name)
+
+    def __iter__(self: '_Inherited') -> AnyType:
+        seen = set()
+        for cls in self.class_.mro():
+            for name in cls.attributes:
+                if name not in seen:
+                    seen.add(name)
+                    yield name
+
+    def __bool__(self: '_Inherited') -> bool:
+        return True
+
 # type of the class node in the nodes module, we need to handle the base classes.
 class Class(BaseType):
     def __init__(self: 'Class', class_def: OptionalType[AST] = None, type_map: OptionalType[DictType] = None, class_namespace: OptionalType[DictType] = None):
         super().__init__(type_map, class_namespace)
         
         from .comp_types_attrs import class_attributes
-        self.attributes.update(class_attributes)
-        if class_namespace:
-            self.attributes.update(class_attributes)
+        _add_layer(self.attributes, class_attributes)
         self.BASES = False
+        # the linearization of the class with the bases and their linearizations it was merged from,
+        # and the class of it defining each looked up name with the stamps of the searched tables.
+        self._mro = None
+        self._mro_bases = None
+        self._mro_lines = None
+        self._linearizing = False
+        self._owners = {}
+        self._owners_stamps = None
+        # bumped when the class gets a new attribute through set_attribute.
+        self._attr_version = 0
         if class_def and type_map and class_namespace:
             self.name = class_def.name
             self.body = class_def.body
             self.bases = class_def.bases
-            # update the attributes of the baseclasses.
-            from .util1 import _update_class_attributes_from_bases
-            _update_class_attributes_from_bases(self, self.bases, self.type_map)
+            self.site = (class_def.location, class_def.lineno, class_def.name)
             if len(self.bases) == 0:
                 self.BASES = True
         else:
@@ -623,14 +995,15 @@ class Class(BaseType):
         try:
             # TODO explicit __new__ call
             from . import recursion
-            flag = recursion.getRecFunc(self.name + "__init__")
+            init_key = recursion.funcKey(self) + ('__init__', )
+            flag = recursion.getRecFunc(init_key)
             if flag == 2:
-                flag = recursion.setRecFunc(self.name + "__init__")
+                flag = recursion.setRecFunc(init_key)
             if flag:
-                recursion.setRecFunc(self.name + "__init__", False)
+                recursion.setRecFunc(init_key, False)
                 #import sys                                   
                 instance.call_magic_method('__init__', args, *probs)
-                recursion.setRecFunc(self.name + "__init__")
+                recursion.setRecFunc(init_key)
                 self._ckd_result = instance
                 return self._ckd_result
                 #return instance
@@ -647,32 +1020,119 @@ class Class(BaseType):
         return self._ckd_result
         #return instance
     
+    # return the base classes found in the scope of the class definition.
+    def base_classes(self: 'Class') -> ListType:
+        if not self.bases or not self.type_map:
+            return []
+        from .util1 import _get_type_from_ns
+        type_map = self.type_map
+        current = type_map.current_namespace
+        scope = getattr(self.attributes, 'parent', None)
+        if scope is not None:
+            type_map.current_namespace = scope
+        try:
+            bases = []
+            for base in self.bases:
+                base_name = base.id if hasattr(base, 'id') else repr(base)
+                base_class = _get_type_from_ns(type_map.find(base_name))
+                if base_class is not self \
+                    and not isinstance(base_class, type) \
+                    and hasattr(base_class, 'attributes'):
+                    bases.append(base_class)
+            return bases
+        finally:
+            type_map.current_namespace = current
+
+    # return the C3 linearization of the class, the class first.
+    # The bases that aren't classes are kept in their place, an inconsistent hierarchy
+    # is searched depth first. The linearization is kept while the bases resolve to the same
+    # classes and their linearizations are kept, so a class is only linearized again
+    # when its own bases or the hierarchy above it change.
+    def mro(self: 'Class') -> ListType:
+        # a class met again while it's linearized is a base of itself.
+        if self._linearizing:
+            return self._mro or [self]
+        self._linearizing = True
+        try:
+            bases = self.base_classes()
+            lines = [base.mro() if isinstance(base, Class) else [base] for base in bases]
+            class_lines = [line for base, line in zip(bases, lines) if isinstance(base, Class)]
+            if self._mro is not None \
+                and _same_objects([_base_key(base) for base in bases], self._mro_bases) \
+                and _same_objects(class_lines, self._mro_lines):
+                return self._mro
+            if self._mro is None:
+                self._mro = [self]
+            mro = _c3_merge([[self]] + lines + [bases])
+            if mro is None:
+                mro = [self]
+                for line in lines:
+                    mro.extend(cls for cls in line if not any(cls is seen for seen in mro))
+            CLASS_STATS['linearizations'] += 1
+            self._mro = mro
+            self._mro_bases = [_base_key(base) for base in bases]
+            self._mro_lines = class_lines
+            self._owners = {}
+            self._owners_stamps = None
+            return mro
+        finally:
+            self._linearizing = False
+
+    # return the class of the MRO that defines the name, None if it's only a builtin attribute or missing.
+    # The cached owners are dropped when an attribute table of the MRO gets or loses a name.
+    def resolve(self: 'Class', name: str) -> OptionalType[BaseType]:
+        mro = self.mro()
+        stamps = tuple(_table_stamp(cls) for cls in mro)
+        if stamps != self._owners_stamps:
+            self._owners = {}
+            self._owners_stamps = stamps
+        owners = self._owners
+        if name in owners:
+            CLASS_STATS['hits'] += 1
+            return owners[name]
+        CLASS_STATS['misses'] += 1
+        owner = None
+        for cls in mro:
+            if _defines(cls.attributes, name):
+                owner = cls
+                break
+        owners[name] = owner
+        return owner
+
+    # return the attribute of the class or the first base defining it, raise KeyError if it's missing.
+    def lookup(self: 'Class', name: str) -> AnyType:
+        owner = self.resolve(name)
+        if owner is None:
+            return self.attributes[name]
+        return owner.attributes[name]
+
+    def has_attribute(self: 'Class', name: str) -> bool:
+        return self.resolve(name) is not None or name in self.attributes
+
+    # copy the inherited attributes into the class table, only done on request.
+    def copy_inherited(self: 'Class') -> None:
+        for cls in self.mro()[1:]:
+            for name in cls.attributes.keys():
+                if name not in self.attributes:
+                    self.attributes[name] = cls.attributes[name]
+
+    # a new class attribute drops the owners cached by the class and its subclasses.
+    def set_attribute(self: 'Class', name: str, value: AnyType) -> None:
+        if name not in self.attributes:
+            self._attr_version += 1
+        self.attributes[name] = value
+
     # override the get_attribute, we need to check the class attributes reference.
     def get_attribute(self: 'Class', name: str, *probs: TupleType) -> AnyType:
         try: 
             if name == 'attributes': 
                 return self.attributes
-            return self.attributes[name] 
+            return self.lookup(name)
         except KeyError: 
             from .builtins.data_types import Any, Str
             from .config import getFileName, getLineNo
             from .error_condition import _class_attr_error_checking
             from .import error_cache, config
-            if not self.BASES: 
-                from .util1 import _update_class_attributes_from_bases
-                _update_class_attributes_from_bases(self, self.bases, self.type_map)
-                self.BASES = True
-            #if self.bases is not None:
-            #    for base in self.bases:                      
-            #        base_name = base.id if hasattr(base, 'id') else base 
-            #        base_class = self.type_map.find(base_name) 
-            #        base_class = _get_type(base_class) 
-            #        if hasattr(base_class, 'attributes'):
-            #            for key in base_class.attributes.keys():
-            #                if key not in self.attributes:
-            #                    self.attributes[key] = base_class.attributes[key]
-            if name in self.attributes:
-                return self.attributes[name]
             if probs:
                 prob = _get_prob(probs)
             else:
@@ -709,8 +1169,11 @@ class Class(BaseType):
 class Instance(BaseType):
     def __init__(self: 'Instance', class_: Class = None, type_map: DictType = None) -> None:
         if class_ and not isinstance(class_, str):
-            super().__init__(type_map, class_.attributes.copy())
-            self.attributes.update(class_.attributes)
+            # the class attributes are shared, the instance only stores its own attributes.
+            # the attributes of a class are resolved through its MRO.
+            super().__init__(type_map)
+            self.attributes.add_layer(_Inherited(class_) \
+                    if isinstance(class_, Class) else class_.attributes)
         self.class_ = class_
             
     def call_magic_method(self: 'Instance', name: str, args: ListType, *probs: TupleType) -> 'Instance':
@@ -820,6 +1283,8 @@ class Instance(BaseType):
 # Method type of the isntance method, and we need to pass an instance obejct as the self parameter.
 class Method(BaseType):
     """A method is represented as a wrapper around a function within a class"""
+    __slots__ = ('attributes', 'prob', 'function', 'object_')
+
     def __init__(self: 'Method', type_map: DictType, object_: Instance, function: Function) -> None:
         super().__init__(type_map)
         self.object_ = object_
@@ -870,7 +1335,7 @@ class Tuple(BaseType):
     def __init__(self: 'Tuple', type_map: OptionalType[DictType] = None, elements: ListType = [], prob: ListType = []) -> None:
         super().__init__(type_map)
         from .comp_types_attrs import tuple_attributes
-        self.attributes.update(tuple_attributes)
+        self.attributes.add_layer(tuple_attributes)
 
         self.elts = elements
         self.index = 0
@@ -914,61 +1379,270 @@ def _unhash_check(elt: UnionType[ListType, DictType, TupleType]) -> bool:
         return True
     return False
 
+# interned unions, a union is dropped from the table when it's not used anymore.
+# The keys hold the ids of the type map and the members, the union holds them, so an id isn't reused
+# while its key is in the table.
+UNIONS: weakref.WeakValueDictionary = weakref.WeakValueDictionary()
+UNION_STATS: DictType[str, int] = {'hits': 0, 'misses': 0}
+
+def getUnionStats() -> DictType[str, int]:
+    return dict(UNION_STATS)
+
+# return the key of the union member, the builtin data types are equal by their classes.
+def _member_key(elt: AnyType) -> AnyType:
+    from .builtins.data_types import BuiltinDataType, BuiltinDataInstance
+    if isinstance(elt, type):
+        return elt
+    if isinstance(elt, (BuiltinDataType, BuiltinDataInstance)):
+        return type(elt)
+    return id(elt)
+
+# attributes of the class and builtin members of the unions, by the member's class and the attribute name.
+# The attributes of a class don't depend on the instance, the member isn't instantiated again.
+# Every resolution gets its own copy, the copies keep their own state like the attribute tables' reads.
+# The attributes are cached per checked module, they may hold the type map of the module.
+MEMBER_ATTRIBUTES: DictType[TupleType, AnyType] = {}
+MEMBER_ATTRIBUTE_STATS: DictType[str, int] = {'hits': 0, 'misses': 0, 'uncached': 0}
+
+def clearMemberAttributes() -> None:
+    MEMBER_ATTRIBUTES.clear()
+
+def getMemberAttributeStats() -> DictType[str, int]:
+    return dict(MEMBER_ATTRIBUTE_STATS)
+
+# return the attribute of the union member with the member's probability.
+def _member_attribute(elt: AnyType, name: str, prob: float) -> AnyType:
+    from .builtins.data_types import isFlyweight
+    key = None
+    if isinstance(elt, type) or isFlyweight(elt):
+        key = (_member_key(elt), name)
+        attr = MEMBER_ATTRIBUTES.get(key)
+        if attr is not None:
+            MEMBER_ATTRIBUTE_STATS['hits'] += 1
+            return _prob_copy(_fresh_copy(attr), prob)
+    if isinstance(elt, type):
+        try:
+            elt = elt()
+        except TypeError:
+            pass
+    if not hasattr(elt, 'get_attribute'):
+        return None
+    attributes = getattr(elt, 'attributes', None)
+    # the missing attributes are reported on every resolution.
+    cacheable = key is not None \
+        and isinstance(attributes, dict) \
+        and name in attributes
+    attr = _get_type(elt.get_attribute(name, prob))
+    if not cacheable:
+        MEMBER_ATTRIBUTE_STATS['uncached'] += 1
+        return _prob_copy(attr, prob)
+    MEMBER_ATTRIBUTE_STATS['misses'] += 1
+    MEMBER_ATTRIBUTES[key] = attr
+    return _prob_copy(_fresh_copy(attr), prob)
+
+# set the probability of the attribute, the shared builtin objects get a private copy for it.
+# The union attributes are shared too, they're merged with the probability instead.
+def _prob_copy(attr: AnyType, prob: float) -> AnyType:
+    if attr and not isinstance(attr, Union):
+        from .builtins.data_types import isFlyweight
+        if isFlyweight(attr):
+            attr = type(attr).mutable()
+        attr.prob = prob
+    return attr
+
+# return the attributes of the union members and their probabilities.
+# The members are distinct, so every member's attribute is resolved once.
+def _member_attributes(union: 'Union', name: str) -> TupleType[ListType, ListType]:
+    attrs = []
+    weights = []
+    if not hasattr(union.prob, '__iter__'):
+        return attrs, weights
+    for elt, prob in zip(union.elts, union.prob):
+        attr = _member_attribute(elt, name, prob)
+        if attr is not None:
+            attrs.append(attr)
+            weights.append(prob)
+    return attrs, weights
+
+# the integer ids of the union members' types. The classes get small negative ids,
+# the other members are identified by their objects like their member keys.
+TYPE_IDS: DictType[AnyType, int] = {}
+
+# return the type id of the union member.
+def _type_id(elt: AnyType) -> int:
+    key = _member_key(elt)
+    if not isinstance(key, type):
+        return key
+    type_id = TYPE_IDS.get(key)
+    if type_id is None:
+        type_id = TYPE_IDS[key] = -len(TYPE_IDS) - 1
+    return type_id
+
+# return the deduplicated members of the union, their type ids and their normalized probabilities.
+# Nested unions are flattened, and the probabilities of the same members are added.
+# The members without probabilities have nan ones, the probabilities are uniform then.
+def _union_members(type_elements: ListType, prob: ListType) -> TupleType[ListType, np.ndarray, np.ndarray]:
+    from .builtins.data_types import Any, None_, NoneType, UnDefined
+    probs = prob if prob and len(prob) == len(type_elements) else [None] * len(type_elements)
+    members = []
+    id_chunks = []
+    prob_chunks = []
+    for elt, p in zip(type_elements, probs):
+        p = np.nan if p is None else p
+        if isinstance(elt, Intersection) and len(elt.types) == 1:
+            elt = elt.types[0]
+        # the members of a nested union are normalized already.
+        if isinstance(elt, Union):
+            members.extend(elt.elts)
+            id_chunks.append(elt.type_ids)
+            prob_chunks.append(p * elt.probs)
+            continue
+        # class Any and Any instance exists togather. we need to remove one.
+        if isinstance(elt, Any):
+            elt = Any
+        if isinstance(elt, (None_, NoneType)):
+            elt = NoneType
+        # skip the UnDefined type elt, it only for initialize the identifiers.
+        if isinstance(elt, UnDefined):
+            continue
+        members.append(elt)
+        id_chunks.append(np.array([_type_id(elt)], dtype=np.int64))
+        prob_chunks.append(np.array([p], dtype=np.float64))
+    if not members:
+        return [], np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+    ids = np.concatenate(id_chunks)
+    weights = np.concatenate(prob_chunks)
+    # the members in the order of their first occurrences, the same members' probabilities are summed.
+    type_ids, first, inverse = np.unique(ids, return_index=True, return_inverse=True)
+    order = np.argsort(first, kind='stable')
+    elts = [members[idx] for idx in first[order]]
+    type_ids = type_ids[order]
+    total = weights.sum()
+    if np.isnan(total) or not total:
+        weights = np.full(len(elts), 1/len(elts))
+    else:
+        weights = np.bincount(inverse, weights=weights)[order] / total
+    if PRUNING:
+        return _prune_members(elts, type_ids, weights)
+    return elts, type_ids, weights
+
+# the pruning of the union members, the unlikely members rarely change the reported errors.
+# the most probable members kept by a union, -1 means all of them.
+UNION_TOP_K: int = -1
+# the least probability of a kept member.
+UNION_MIN_PROB: float = 0.0
+# whether the unions are pruned.
+PRUNING: bool = False
+PRUNE_STATS: DictType[str, AnyType] = {'unions': 0, 'members': 0, 'mass': 0.0}
+
+def _update_pruning() -> None:
+    global PRUNING
+    PRUNING = UNION_TOP_K >= 0 or UNION_MIN_PROB > 0
+
+def setUnionTopK(top_k: int) -> None:
+    global UNION_TOP_K
+    UNION_TOP_K = top_k
+    _update_pruning()
+
+def getUnionTopK() -> int:
+    return UNION_TOP_K
+
+def setUnionMinProb(min_prob: float) -> None:
+    global UNION_MIN_PROB
+    UNION_MIN_PROB = min_prob
+    _update_pruning()
+
+def getUnionMinProb() -> float:
+    return UNION_MIN_PROB
+
+def getPruneStats() -> DictType[str, AnyType]:
+    return dict(PRUNE_STATS)
+
+# keep the top k members above the least probability, in their order, and renormalize the probabilities.
+# The most probable member is always kept, and the dropped probability mass is counted.
+def _prune_members(elts: ListType, type_ids: np.ndarray, probs: np.ndarray) -> TupleType[ListType, np.ndarray, np.ndarray]:
+    ranked = np.argsort(-probs, kind='stable')
+    kept = ranked[probs[ranked] >= UNION_MIN_PROB]
+    if not len(kept):
+        kept = ranked[:1]
+    if UNION_TOP_K >= 0:
+        kept = kept[:max(UNION_TOP_K, 1)]
+    if len(kept) == len(elts):
+        return elts, type_ids, probs
+    kept = np.sort(kept)
+    total = probs[kept].sum()
+    PRUNE_STATS['unions'] += 1
+    PRUNE_STATS['members'] += len(elts) - len(kept)
+    PRUNE_STATS['mass'] += float(1 - total)
+    return [elts[idx] for idx in kept], type_ids[kept], probs[kept] / total
+
 # Union type, for our checker, it's used as probabilistic types. We print ProbType instead of Union when we print the instance.
 class Union(BaseType):
     # if we use *type_elements, we may get a tuple not a list.
     # For example, Union([int, str]), elts = ([int, str],). So we need to use type_element instead *type_element.
-    
+
+    # For performance, a union is interned: the same members and probabilities return the same union.
+    # The members' type ids and probabilities are kept as arrays, the unions are combined with them.
+    # The members and their probabilities are read-only, elts and prob are views of them.
+    def __new__(cls: type, type_map: OptionalType[DictType] = None, type_elements: ListType = [], prob: ListType = []) -> 'Union':
+        elts, type_ids, probs = _union_members(type_elements, prob)
+        order = np.argsort(type_ids, kind='stable')
+        key = (id(type_map), type_ids[order].tobytes(), np.round(probs[order], 6).tobytes())
+        union = UNIONS.get(key)
+        if union is not None:
+            UNION_STATS['hits'] += 1
+            return union
+        UNION_STATS['misses'] += 1
+        union = super().__new__(cls)
+        union._key = key
+        union._hash = hash(key)
+        union._members = (elts, type_ids, probs)
+        UNIONS[key] = union
+        return union
+
     def __init__(self: 'Union', type_map: OptionalType[DictType] = None, type_elements: ListType = [], prob: ListType = []) -> None:
-        super().__init__(type_map)
-        self.elts = type_elements
-        tmp_elts = []
-        unhash = []
-        elt_length = range(len(self.elts))
-        from .builtins.data_types import Any, None_, NoneType, UnDefined
-        # Union type elts is complex, we need to handle it for different types.
-        for elt in self.elts:
-        #    elt = _get_type(elt)
-            if isinstance(elt, Any):
-                elt = Any
-            if isinstance(elt, (None_, NoneType)):
-                elt = NoneType
-            # skip the UnDefined type elt, it only for initialize the identifiers.
-            if isinstance(elt, UnDefined):
-                 continue
-            if _unhash_check(elt) or not hasattr(elt, '__hash__'):
-                unhash.append(elt)
-            elif isinstance(elt, Intersection) and len(elt.types) == 1:
-                tmp_elts.append(elt.types[0]) if not _unhash_check(elt.types[0]) else unhash.append(elt.types[0])
-            elif isinstance(elt, Union):
-                for _elt in elt.elts:
-                    if not _unhash_check(_elt):
-                        tmp_elts.append(_elt)
-                    else:
-                        unhash.append(_elt)
-            elif not isinstance(elt, dict):
-                tmp_elts.append(elt)
-            else:
-                unhash.append(elt)
-        # class Any and Any instance exists togather. we need to remove one.
-        try:
-            self.elts = list(set(tmp_elts))
-        except TypeError:
-            pass
-        if unhash:
-            self.elts.extend(unhash)
-        if self.elts: 
-            self.prob = [p/sum(prob) for p in prob] if prob and len(prob) == len(self.elts) else [1/len(self.elts)] * len(self.elts)
-        else: 
-            self.prob = []
+        # the interned union was initialized when it was created.
+        if not hasattr(self, '_members'):
+            return
+        # the fields of BaseType, but prob which is read from the probabilities.
+        from .comp_types_attrs import basic_attributes
+        self.type_map = type_map
+        self.attributes = Attributes((basic_attributes, ))
+        self._ckd_result = None
+        # the union is shared by its holders, its members and probabilities can't be changed.
+        elts, self.type_ids, self.probs = self._members
+        self.type_ids.flags.writeable = False
+        self.probs.flags.writeable = False
+        self._elts = tuple(elts)
+        del self._members
+
+    @property
+    def elts(self: 'Union') -> TupleType:
+        return self._elts
+
+    @property
+    def prob(self: 'Union') -> TupleType:
+        return tuple(self.probs.tolist())
+
+    # return the union with the types appended to its members, the union itself isn't changed.
+    def appended(self: 'Union', type_elements: ListType) -> 'Union':
+        return Union(self.type_map, list(self.elts) + list(type_elements), [])
+
+    def __hash__(self: 'Union') -> int:
+        return self._hash
+
+    def __eq__(self: 'Union', other: AnyType) -> bool:
+        return self is other \
+            or isinstance(other, Union) and self._hash == other._hash and self._key == other._key
+
+    def __ne__(self: 'Union', other: AnyType) -> bool:
+        return not self.__eq__(other)
 
     def __repr__(self: 'Union') -> str:
         cls_name = "ProbType"
         lbracket = "{"
         rbracket = "}"
         elt_repr = []
-        if not isinstance(self.prob, list):
-            self.prob = [self.prob]
         if self.prob:
             for el, prob in zip(self.elts, self.prob):
                 if isinstance(el, Instance):
@@ -992,48 +1666,46 @@ class Union(BaseType):
     def __iter__(self: 'Union') -> AnyType:
         for elt in self.elts:
             yield elt
-    # For probabilistic type, we return the type elt iterately.
+    # resolve the attribute on all the members at once. The attributes are merged into one union
+    # with the members' probabilities, the attribute of a single member is returned itself.
     def get_attribute(self: 'Union', name: str, *probs: TupleType) -> AnyType:
-        attrs = []
-        idx = 0
-
-        if hasattr(self.prob, '__iter__'):
-            for elt, prob in zip(self.elts, self.prob):
-                try:
-
-                     if isinstance(elt, type):
-                         elt = elt()
-                except TypeError as te:
-                    pass
-
-                from .config import setTypeProb
-                setTypeProb(self.prob[idx])
-                idx += 1
-                if hasattr(elt, 'get_attribute'):
-                    attr = elt.get_attribute(name, prob)
-                    attr = _get_type(attr)
-                    if attr: 
-                        attr.prob = prob
-                    attrs.append(attr)
-        
+        attrs, weights = _member_attributes(self, name)
         if not attrs:
             return super().get_attribute(name, probs)
-        else:
-            return attrs
+        if len(attrs) == 1:
+            return attrs[0]
+        return Union(None, attrs, weights)
     
     def istypeof(self: 'Union', object_: AnyType) -> bool:
         from .util1 import issub
         return issub(self, object_)
         
+    # call the union of the functions, such as the methods resolved on the members. The results are merged.
+    # The other callable members are called too, a class gives its instance. The other unions are returned as they are.
     def check_call(self: 'Union', args: ListType, *probs: TupleType) -> 'Union':
-        return self
+        from .builtins.functions import BuiltinFunction
+        functions = (BuiltinFunction, Function, Method)
+        if not any(isinstance(elt, functions) for elt in self.elts):
+            return self
+        from .recursion import _recursive_funccall
+        from .util1 import _get_type_from_ns
+        results = []
+        for elt in self.elts:
+            if isinstance(elt, BuiltinFunction):
+                result = elt.check_call(args, *probs)
+            elif isinstance(elt, type) or not hasattr(elt, 'check_call'):
+                result = elt
+            else:
+                result = _recursive_funccall(elt, args, probs[0] if probs else [])
+            results.append(_get_type_from_ns(result))
+        return Union(None, results, list(self.prob))
 
 # Set type of the self-defined type.
 class Set(BaseType):
     def __init__(self: 'Set', type_map: OptionalType[DictType] = None, type_elements: ListType = [], prob: ListType = []) -> None:
         super().__init__(type_map)
         from .comp_types_attrs import set_attributes
-        self.attributes.update(set_attributes)
+        self.attributes.add_layer(set_attributes)
         self.elts = type_elements
         self.index = 0
         if self.elts: 
@@ -1067,7 +1739,7 @@ class List(BaseType):
     def __init__(self: 'List', type_map: OptionalType[DictType] = None, type_elements: ListType = [], prob: ListType = []) -> None:
         super().__init__(type_map)
         from .comp_types_attrs import list_attributes
-        self.attributes.update(list_attributes)
+        self.attributes.add_layer(list_attributes)
         self.elts = type_elements
         self.index = 0
         if self.elts:
@@ -1106,6 +1778,102 @@ class List(BaseType):
     def check_call(self: 'List', args: ListType, *probs: TupleType) -> 'List':
         return self
 
+# the bounds of the container types' element types, -1 means unbounded.
+# the distinct element types of a list, set or dict, more are widened into one union element.
+MAX_ELEMENT_TYPES: int = 8
+# the members of the widened union, more are widened to Any.
+MAX_WIDENED_TYPES: int = 32
+# the elements of a tuple, they're unpacked by their positions. A longer tuple is bounded like a list.
+MAX_TUPLE_ELEMENTS: int = 64
+ELEMENT_STATS: DictType[str, int] = {'deduplicated': 0, 'widened': 0, 'any': 0}
+
+def setMaxElementTypes(element_types: int) -> None:
+    global MAX_ELEMENT_TYPES
+    MAX_ELEMENT_TYPES = element_types
+
+def getMaxElementTypes() -> int:
+    return MAX_ELEMENT_TYPES
+
+def getElementStats() -> DictType[str, int]:
+    return dict(ELEMENT_STATS)
+
+# return the canonical element types of the container and their probabilities.
+# The same element types are kept once with their highest probability, and the distinct types past the bound
+# are widened into one union element, or Any. The positional elements of a tuple are only bounded if it's too long.
+# An element's probability is the confidence in its own type, not a share of the container, so the probabilities
+# of the same type aren't added. The highest one is kept, it's the strongest evidence an element has the type.
+def boundElements(elts: ListType, probs: ListType, positional: bool = False) -> TupleType[ListType, ListType]:
+    elts = list(elts)
+    if MAX_ELEMENT_TYPES < 0 \
+        or positional and len(elts) <= MAX_TUPLE_ELEMENTS:
+        return elts, probs
+    probs = _element_probs(elts, probs)
+    kept: DictType[AnyType, int] = {}
+    bounded = []
+    bounded_probs = []
+    for elt, prob in zip(elts, probs):
+        key = _member_key(elt)
+        idx = kept.get(key)
+        if idx is None:
+            kept[key] = len(bounded)
+            bounded.append(elt)
+            bounded_probs.append(prob)
+        elif isinstance(prob, (int, float)) and isinstance(bounded_probs[idx], (int, float)):
+            bounded_probs[idx] = max(bounded_probs[idx], prob)
+    if len(bounded) < len(elts):
+        ELEMENT_STATS['deduplicated'] += 1
+    if len(bounded) <= MAX_ELEMENT_TYPES:
+        return bounded, bounded_probs
+    return _widen(bounded, bounded_probs)
+
+# return the canonical key and value types of the dict and the values' probabilities.
+def boundItems(key_types: ListType, value_types: ListType, probs: ListType) -> TupleType[ListType, ListType, ListType]:
+    key_types = list(key_types)
+    value_types = list(value_types)
+    if MAX_ELEMENT_TYPES < 0 \
+        or len(key_types) != len(value_types):
+        return key_types, value_types, probs
+    probs = _element_probs(value_types, probs)
+    kept: DictType[TupleType, int] = {}
+    bounded_keys = []
+    bounded_values = []
+    bounded_probs = []
+    for kt, vt, prob in zip(key_types, value_types, probs):
+        key = (_member_key(kt), _member_key(vt))
+        idx = kept.get(key)
+        if idx is None:
+            kept[key] = len(bounded_keys)
+            bounded_keys.append(kt)
+            bounded_values.append(vt)
+            bounded_probs.append(prob)
+        elif isinstance(prob, (int, float)) and isinstance(bounded_probs[idx], (int, float)):
+            bounded_probs[idx] = max(bounded_probs[idx], prob)
+    if len(bounded_keys) < len(key_types):
+        ELEMENT_STATS['deduplicated'] += 1
+    if len(bounded_keys) <= MAX_ELEMENT_TYPES:
+        return bounded_keys, bounded_values, bounded_probs
+    keys, _ = _widen(bounded_keys, bounded_probs)
+    values, value_probs = _widen(bounded_values, bounded_probs)
+    return keys, values, value_probs
+
+# return the probabilities of the elements, the elements appended without one get the average.
+def _element_probs(elts: ListType, probs: ListType) -> ListType:
+    probs = list(probs) if isinstance(probs, list) else []
+    if len(probs) < len(elts):
+        probs += [1/len(elts)] * (len(elts) - len(probs))
+    return probs[:len(elts)]
+
+# widen the distinct element types into one union element, or Any if there are too many of them.
+def _widen(elts: ListType, probs: ListType) -> TupleType[ListType, ListType]:
+    from .builtins.data_types import Any
+    numbers = all(isinstance(prob, (int, float)) and prob >= 0 for prob in probs)
+    prob = max(probs) if numbers else 1.0
+    if len(elts) > MAX_WIDENED_TYPES:
+        ELEMENT_STATS['any'] += 1
+        return [Any()], [prob]
+    ELEMENT_STATS['widened'] += 1
+    return [Union(None, elts, probs if numbers else [])], [prob]
+
 '''
 TypeError: 'Union' object is not subscriptable
 
@@ -1119,7 +1887,7 @@ class Dict(BaseType):
     def __init__(self: 'Dict', type_map: OptionalType[DictType] = None, k_types: ListType = [], v_types: ListType = [], prob: ListType = []) -> None:
         super().__init__(type_map)
         from .comp_types_attrs import dict_attributes
-        self.attributes.update(dict_attributes)
+        self.attributes.add_layer(dict_attributes)
         self.key_types = k_types
         self.value_types = v_types
         if self.value_types: 
@@ -1206,6 +1974,7 @@ def isTypeOf(target: BaseType, object_: BaseType) -> bool:
 
 # we merge the compound type elts.
 class Intersection(BaseType):
+    __slots__ = ('attributes', 'prob', 'types')
 
     def __init__(self: 'Intersection', type_map: DictType, *types: TupleType) -> None:
         super().__init__(type_map)
@@ -1,11 +1,12 @@
 # utility module of the binary operator checking.
 
-from typing import List as ListType, Dict as DictType, Tuple as TupleType, Any as AnyType, Union as UnionType
+from typing import List as ListType, Dict as DictType, Set as SetType, Tuple as TupleType, Any as AnyType, Union as UnionType
 
 from .builtins import data_types
 from .exceptions import NotYetSupported, NoSuchAttribute, NotIterable
-from .types import (Union, List, Set, Dict, Tuple, Intersection, BaseType)
+from .types import (Union, List, Set, Dict, Tuple, Intersection, BaseType, _type_id)
 import logging
+import numpy as np
 from .util1 import (getName, issub, convertType, mergeTypes)
 debug = logging.debug
 
@@ -25,9 +26,11 @@ data_type: ListType = [data_types.Any, data_types.BoolType, data_types.IntType,
              data_types.FloatType, data_types.ComplexType,
              data_types.BytesType, data_types.StrType]
 
+# the binary operators checked by their operator methods.
+op_list: SetType[str] = {'__add__', '__sub__', '__mul__', '__div__', '__truediv__', '__mod__', '__pow__'}
+
 # binary operator checking, and return the appropriate type of the result.
 def binop_check(left: BaseType, right: BaseType, op_name: str, left_prob: float = 0.95, right_prob: float = 0.95) -> AnyType:
-    op_list = ['__add__', '__sub__', '__mul__', '__div__', '__truediv__', '__mod__', '__pow__']
     if op_name in op_list:
         if isinstance(left, list) and len(left) == 2:
             t, p = left
@@ -39,39 +42,133 @@ def binop_check(left: BaseType, right: BaseType, op_name: str, left_prob: float
             left = left.types[0]
         if isinstance(right, Intersection) and len(right.types) == 1:
             right = right.types[0]
-        if not isinstance(right, type) \
-            and left is type(right):
-            return True
-        ltype = convertType(left)
-        rtype = convertType(right)
-        
-        lindex = -1
-        rindex = -1
-        if ltype in data_type:
-            lindex = data_type.index(ltype)
-        if rtype in data_type:
-            rindex = data_type.index(rtype)
-        if lindex >= 0 and rindex >= 0:
-            if lindex < 5 and rindex < 5 or lindex > 4 and rindex > 4:
-                return data_type[max(lindex, rindex)]
-        if not issub(ltype, rtype) and not issub(rtype, ltype) and not (ltype is data_types.NoneType or rtype is data_types.NoneType):
-            if _special_binop_check(op_name, ltype, rtype):
-                return data_types.Any()
-            from . import config
-            from . import error_cache
-            from .error_condition import _type_error_checking
-            terror_name = repr(ltype) + op_name + repr(rtype)
-            if _type_error_checking(config, error_cache, terror_name):
-                logging.error("[Type Error]: Expr left_type:%r(with prob:<<%f>>) %r rigth_type:%r(with prob:<<%f>>) in file: [[%r:%d]]",
-                     ltype, 1- left_prob, op_name, rtype, 1-right_prob, config.getFileName(), config.getLineNo())
-            return "TypeError"
+        if isinstance(left, Union) or isinstance(right, Union):
+            result = _union_binop(left, right, op_name)
         else:
-            temp = mergeTypes(ltype, rtype)
-            return temp
+            result = _binop_type(left, right, op_name)
+        if isinstance(result, str):
+            _report_binop(left, right, op_name, left_prob, right_prob)
+        return result
 
     else:
         return "Expression {} {} {} is not supported now".format(left, op_name, right)
 
+# return the result type of the binary operator, or "TypeError" if the operands aren't consistent.
+# The operators between the builtin data types are looked up in the result table.
+def _binop_type(left: BaseType, right: BaseType, op_name: str) -> AnyType:
+    if not isinstance(right, type) \
+        and left is type(right):
+        return True
+    ltype = convertType(left)
+    rtype = convertType(right)
+    lindex = builtin_index.get(ltype) if isinstance(ltype, type) else None
+    rindex = builtin_index.get(rtype) if isinstance(rtype, type) else None
+    if lindex is not None and rindex is not None:
+        BINOP_STATS['table'] += 1
+        return binop_table[op_name][lindex][rindex]
+    BINOP_STATS['slow'] += 1
+    return _converted_binop(ltype, rtype, op_name)
+
+# return the result type of the binary operator between the converted types.
+def _converted_binop(ltype: BaseType, rtype: BaseType, op_name: str) -> AnyType:
+    lindex = -1
+    rindex = -1
+    if ltype in data_type:
+        lindex = data_type.index(ltype)
+    if rtype in data_type:
+        rindex = data_type.index(rtype)
+    if lindex >= 0 and rindex >= 0:
+        if lindex < 5 and rindex < 5 or lindex > 4 and rindex > 4:
+            return data_type[max(lindex, rindex)]
+    if not issub(ltype, rtype) and not issub(rtype, ltype) and not (ltype is data_types.NoneType or rtype is data_types.NoneType):
+        if _special_binop_check(op_name, ltype, rtype):
+            return data_types.Any()
+        return "TypeError"
+    else:
+        temp = mergeTypes(ltype, rtype)
+        return temp
+
+# report the type error of the binary operator once.
+def _report_binop(left: BaseType, right: BaseType, op_name: str, left_prob: float, right_prob: float) -> None:
+    from . import config
+    from . import error_cache
+    from .error_condition import _type_error_checking
+    ltype = left if isinstance(left, Union) else convertType(left)
+    rtype = right if isinstance(right, Union) else convertType(right)
+    terror_name = repr(ltype) + op_name + repr(rtype)
+    if _type_error_checking(config, error_cache, terror_name):
+        logging.error("[Type Error]: Expr left_type:%r(with prob:<<%f>>) %r rigth_type:%r(with prob:<<%f>>) in file: [[%r:%d]]",
+             ltype, 1- left_prob, op_name, rtype, 1-right_prob, config.getFileName(), config.getLineNo())
+
+# return the members of the operand and their probabilities.
+def _operand_members(operand: BaseType) -> TupleType[ListType, np.ndarray]:
+    if isinstance(operand, Union):
+        return operand.elts, operand.probs
+    return [operand], np.ones(1)
+
+# return the indices of the members in the result tables, -1 for the members that aren't builtin data types.
+# The classes among the members get their ids and the instances their classes' ids, to find the pairs
+# of a class and its instance.
+def _table_indices(elts: ListType) -> TupleType[np.ndarray, np.ndarray, np.ndarray]:
+    indices = np.full(len(elts), -1, dtype=np.int64)
+    classes = np.zeros(len(elts), dtype=np.int64)
+    instances = np.full(len(elts), -1, dtype=np.int64)
+    for idx, elt in enumerate(elts):
+        converted = convertType(elt)
+        if isinstance(converted, type):
+            indices[idx] = builtin_index.get(converted, -1)
+        if isinstance(elt, type):
+            classes[idx] = id(elt)
+        else:
+            instances[idx] = id(type(elt))
+    return indices, classes, instances
+
+# binary operator checking of the probabilistic types, every pair of the members is checked once.
+# The results' probabilities are the outer product of the members' probabilities. The pairs of the
+# builtin data types are read from the result arrays at once, the other pairs are checked one by one.
+# The inconsistent pairs are dropped and the rest are grouped by their type ids into a union.
+# It's a TypeError only if no pair is consistent.
+def _union_binop(left: BaseType, right: BaseType, op_name: str) -> AnyType:
+    # the empty type of a recursive call whose summary isn't computed yet, the result is empty too.
+    for operand in (left, right):
+        if isinstance(operand, Union) \
+            and not operand.elts:
+            return operand
+    lelts, lprobs = _operand_members(left)
+    relts, rprobs = _operand_members(right)
+    lindices, lclasses, _ = _table_indices(lelts)
+    rindices, _, rinstances = _table_indices(relts)
+    pair_probs = np.outer(lprobs, rprobs)
+    # a class with its instance gives the class.
+    same = lclasses[:, None] == rinstances[None, :]
+    tabled = (lindices[:, None] >= 0) & (rindices[None, :] >= 0) & ~same
+    rows, cols = np.nonzero(tabled)
+    BINOP_STATS['table'] += len(rows)
+    results = np.empty(pair_probs.shape, dtype=object)
+    type_ids = np.zeros(pair_probs.shape, dtype=np.int64)
+    consistent = np.zeros(pair_probs.shape, dtype=bool)
+    lidx, ridx = lindices[rows], rindices[cols]
+    results[rows, cols] = binop_results[op_name][lidx, ridx]
+    type_ids[rows, cols] = binop_type_ids[op_name][lidx, ridx]
+    consistent[rows, cols] = binop_consistent[op_name][lidx, ridx]
+    rows, cols = np.nonzero(~tabled)
+    for row, col in zip(rows, cols):
+        result = lelts[row] if same[row, col] else _binop_type(lelts[row], relts[col], op_name)
+        if isinstance(result, str):
+            continue
+        results[row, col] = result
+        type_ids[row, col] = _type_id(result)
+        consistent[row, col] = True
+    if not consistent.any():
+        return "TypeError"
+    # the results in the order of their first pairs, the probabilities of the same types are summed.
+    results = results[consistent]
+    _, first, inverse = np.unique(type_ids[consistent], return_index=True, return_inverse=True)
+    order = np.argsort(first, kind='stable')
+    weights = np.bincount(inverse, weights=pair_probs[consistent])[order]
+    union = Union(None, list(results[first[order]]), weights.tolist())
+    return union.elts[0] if len(union.elts) == 1 else union
+
 # check that two type is consistent.
 def is_consistent(left: UnionType[ListType, BaseType], right: UnionType[ListType, BaseType]) -> bool:
     if isinstance(left, list) and len(left) == 2:
@@ -105,6 +202,37 @@ def _special_binop_check(op_name: str, ltype: BaseType, rtype: BaseType) -> AnyT
         return True
     return False
 
+# the builtin data types, the results of the binary operators between them are computed once.
+builtin_types: ListType = data_type + [data_types.NoneType, data_types.UnDefined]
+builtin_index: DictType[type, int] = {_type: idx for idx, _type in enumerate(builtin_types)}
+# the results of the binary operators by the operator, the left type's index and the right type's index.
+binop_table: DictType[str, ListType[ListType]] = {op_name: [[_converted_binop(ltype, rtype, op_name) \
+        for rtype in builtin_types] for ltype in builtin_types] for op_name in op_list}
+
+# the result tables as arrays, the results with their type ids and whether they're consistent.
+def _result_arrays(table: ListType[ListType]) -> TupleType[np.ndarray, np.ndarray, np.ndarray]:
+    size = len(builtin_types)
+    results = np.empty((size, size), dtype=object)
+    type_ids = np.zeros((size, size), dtype=np.int64)
+    consistent = np.zeros((size, size), dtype=bool)
+    for lidx, row in enumerate(table):
+        for ridx, result in enumerate(row):
+            results[lidx, ridx] = result
+            if not isinstance(result, str):
+                type_ids[lidx, ridx] = _type_id(result)
+                consistent[lidx, ridx] = True
+    return results, type_ids, consistent
+
+binop_results: DictType[str, np.ndarray] = {}
+binop_type_ids: DictType[str, np.ndarray] = {}
+binop_consistent: DictType[str, np.ndarray] = {}
+for _op_name, _table in binop_table.items():
+    binop_results[_op_name], binop_type_ids[_op_name], binop_consistent[_op_name] = _result_arrays(_table)
+BINOP_STATS: DictType[str, int] = {'table': 0, 'slow': 0}
+
+def getBinopStats() -> DictType[str, int]:
+    return dict(BINOP_STATS)
+
 # auxiliary function call checking.
 def function_check(func: AnyType, args: ListType, return_anno_type: BaseType) -> None:
     return_type = func.check_call(args)
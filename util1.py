@@ -6,7 +6,7 @@ AST = ast.AST
 from .builtins import data_types
 from .exceptions import NotYetSupported, NoSuchAttribute, NotIterable
 from .builtins.functions import BuiltinFunction
-from .types import (Union, List, Set, Dict, Tuple, BaseType, Class, Instance)
+from .types import (Union, List, Set, Dict, Tuple, BaseType, Class, Instance, boundElements)
 from .builtins.data_types import None_, NoneType
 import logging
 
@@ -16,6 +16,37 @@ str_types: ListType = [data_types.Any, data_types.Bytes, data_types.Str]
 data_type: ListType = [data_types.Any, data_types.BoolType, data_types.IntType,
              data_types.FloatType, data_types.ComplexType,
              data_types.BytesType, data_types.StrType]
+# rank of the builtin data types, a number type is a subtype of the ones with lower ranks.
+RANKS: DictType[type, int] = {cls: idx for idx, cls in enumerate(data_type)}
+_num_classes: tuple = tuple(num_types)
+_str_classes: tuple = tuple(str_types)
+
+# builtin conversions of the classes, the classes that aren't here convert to themselves.
+_CLASS_CONVERSIONS: DictType[type, type] = {None_: NoneType, NoneType: NoneType}
+for _idx, _cls in enumerate(str_types):
+    _CLASS_CONVERSIONS[_cls] = data_type[_idx + 4]
+# Any is in both kinds, it converts as a number type.
+for _idx, _cls in enumerate(num_types):
+    _CLASS_CONVERSIONS[_cls] = data_type[_idx]
+# conversions of the instances by their classes, the memoized results of _convert_instance.
+_INSTANCE_CONVERSIONS: DictType[type, AnyType] = {}
+_IDENTITY: object = object()
+
+# subtype relation between the builtin data types, Any and UnDefined.
+SUBTYPE_TABLE: DictType[TupleType[type, type], bool] = {}
+for _left in data_type + [data_types.UnDefined]:
+    for _right in data_type + [data_types.UnDefined]:
+        if _left in (data_types.Any, data_types.UnDefined) \
+            or _right in (data_types.Any, data_types.UnDefined):
+            SUBTYPE_TABLE[(_left, _right)] = True
+        else:
+            _lrank, _rrank = RANKS[_left], RANKS[_right]
+            SUBTYPE_TABLE[(_left, _right)] = _lrank >= _rrank and (_lrank < 5 or _rrank > 4)
+
+SUBTYPE_STATS: DictType[str, int] = {'hits': 0, 'misses': 0, 'conversions': 0}
+
+def getSubtypeStats() -> DictType[str, int]:
+    return dict(SUBTYPE_STATS)
 
 # return the module name, and remove the suffix.
 def getModuleName() -> str:
@@ -47,6 +78,14 @@ def issub(ftype: BaseType, subtype: BaseType) -> bool:
     right = convertType(subtype)
     if left is right:
         return True
+    # the relation between builtin data types is precomputed.
+    if isinstance(left, type) \
+        and isinstance(right, type):
+        flag = SUBTYPE_TABLE.get((left, right))
+        if flag is not None:
+            SUBTYPE_STATS['hits'] += 1
+            return flag
+    SUBTYPE_STATS['misses'] += 1
     # return True if one type is Any.
     if left is data_types.Any or right is data_types.Any or left is data_types.UnDefined or right is data_types.UnDefined or isinstance(left, data_types.UnDefined) or isinstance(right, data_types.UnDefined):
         return True
@@ -220,34 +259,42 @@ def issub(ftype: BaseType, subtype: BaseType) -> bool:
 
 """
 # return the class type of one object.
+# Classes are converted by table, and the conversion of an instance only depends on its class.
 def convertType(t: AnyType) -> BaseType:
-
     if t is True or t is False:
         return data_type[1]
-    if t is None or t is None_ or t is NoneType \
-            or isinstance(t, None_) or isinstance(t, NoneType):
+    if t is None:
+        return data_types.NoneType
+    if isinstance(t, type):
+        return _CLASS_CONVERSIONS.get(t, t)
+    converted = _INSTANCE_CONVERSIONS.get(type(t))
+    if converted is None:
+        SUBTYPE_STATS['conversions'] += 1
+        converted = _convert_instance(t)
+        if converted is t:
+            converted = _IDENTITY
+        _INSTANCE_CONVERSIONS[type(t)] = converted
+    return t if converted is _IDENTITY else converted
+
+# return the class type of the instance.
+def _convert_instance(t: AnyType) -> BaseType:
+    if isinstance(t, None_) or isinstance(t, NoneType):
         return data_types.NoneType
     if t in num_types:
         index = num_types.index(t)
         return data_type[index]
-    if isinstance(t, tuple(num_types)):
+    if isinstance(t, _num_classes):
         for idx in range(len(num_types)):
             if isinstance(t, num_types[idx]):
                 return data_type[idx]
     if t in str_types:
         index = str_types.index(t) + 4
         return data_type[index]
-    if isinstance(t, tuple(str_types)):
+    if isinstance(t, _str_classes):
         for idx in range(len(str_types)):
             if isinstance(t, str_types[idx]):
                 return data_type[idx + 4]
-    if type(t) in num_types:
-        index = num_types.index(type(t))
-        return data_type[index]
-    if type(t) in str_types:
-        index = str_types.index(type(t)) + 4
-        return data_type[index]
-    if type(t) in data_type:
+    if type(t) in RANKS:
         return type(t)
 
     return t
@@ -256,8 +303,8 @@ def convertType(t: AnyType) -> BaseType:
 def gettype(objtype: BaseType) -> BaseType:
     t = type(objtype)
 
-    if t in data_type:
-        index = data_type.index(t)
+    if t in RANKS:
+        index = RANKS[t]
         if index < 5:
             return num_types[index]
         else:
@@ -267,13 +314,14 @@ def gettype(objtype: BaseType) -> BaseType:
 # merge two same type into one type, we merge the elts instead.
 def mergeTypes(ltype: UnionType[Tuple, List, Dict], rtype: UnionType[Tuple, List, Dict]) -> BaseType:
     if isinstance(ltype, Tuple) and isinstance(rtype, Tuple):
-        new_elts = ltype.elts + rtype.elts
-        return Tuple(None, new_elts)
+        new_elts, probs = boundElements(ltype.elts + rtype.elts, [], True)
+        return Tuple(None, new_elts, probs)
     if isinstance(ltype, List) and isinstance(rtype, List):
-        return List(None, ltype.elts + rtype.elts)
+        new_elts, probs = boundElements(ltype.elts + rtype.elts, [])
+        return List(None, new_elts, probs)
     if isinstance(ltype, Set) and isinstance(rtype, Set):
-        new_elts = set(ltype.elts + rtype.elts)
-        return Set(None, new_elts)
+        new_elts, probs = boundElements(ltype.elts + rtype.elts, [])
+        return Set(None, new_elts, probs)
     if isinstance(ltype, Dict) and isinstance(rtype, Dict):
         new_elts = set(ltype.elts, rtype.elts)
         return Union(None, list(new_elts))
@@ -324,15 +372,3 @@ def _same_type(obj1: BaseType, obj2: BaseType) -> bool:
         obj2 = type(obj2) 
     return obj1 is obj2 
 
-def _update_class_attributes_from_bases(_cls: BaseType, bases: ListType, type_map: DictType) -> None:
-    if bases is None or isinstance(_cls, type):
-        return
-    for base in bases: 
-        base_name = base.id if hasattr(base, 'id') else repr(base) 
-        bclass = type_map.find(base_name) 
-        bclass = _get_type_from_ns(bclass)
-        if hasattr(bclass, 'attributes'):
-            for key in bclass.attributes.keys():
-                if key not in _cls.attributes:
-                    _cls.attributes[key] = bclass.attributes[key]
-    